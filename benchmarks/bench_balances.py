@@ -0,0 +1,79 @@
+"""Compares sequential getBalance calls (one fresh client per display, as before) with Wallets_CLI.get_sol_balances
+(getMultipleAccounts chunks sent concurrently on the pooled RPC_Manager client) against a local mock RPC.
+
+Usage: python benchmarks/bench_balances.py [--wallets 40] [--latency 0.05] [--repeat 3]"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from solana.rpc.async_api import AsyncClient
+from solders.keypair import Keypair
+from tabulate import tabulate
+
+import functions as f
+import main
+from mock_server import Mock_Server
+
+
+async def get_balances_sequential(rpc_url: str, pubkeys: list) -> dict:
+    client = AsyncClient(rpc_url)
+    try:
+        return {pubkey: (await client.get_balance(main.Pubkey.from_string(pubkey))).value for pubkey in pubkeys}
+    finally:
+        await client.close()
+
+
+async def get_balances_batched(rpc_url: str, pubkeys: list) -> dict:
+    return await main.Wallets_CLI.get_sol_balances(client=main.RPC_Manager.get_client(rpc_url), pubkeys=pubkeys)
+
+
+async def measure(get_balances, rpc_url: str, pubkeys: list, repeat: int, mock_server: Mock_Server) -> dict:
+    mock_server.stats.clear()
+    latencies = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        balances = await get_balances(rpc_url, pubkeys)
+        latencies.append(time.perf_counter() - start_time)
+    return {
+        'balances': balances,
+        'latency': min(latencies),
+        'requests': sum(mock_server.stats.values()) // repeat,
+    }
+
+
+async def run(wallets: int, latency: float, repeat: int):
+    mock_server = Mock_Server(latency=latency)
+    mock_server.start()
+    # RPC_Manager reads the endpoint settings from config.json of the working directory
+    os.chdir(tempfile.mkdtemp())
+    f.set_json_file('config.json', {'RPC_URL': mock_server.url})
+    
+    pubkeys = [str(Keypair().pubkey()) for _ in range(wallets)]
+    try:
+        sequential = await measure(get_balances_sequential, mock_server.url, pubkeys, repeat, mock_server)
+        batched = await measure(get_balances_batched, mock_server.url, pubkeys, repeat, mock_server)
+    finally:
+        await main.RPC_Manager.close()
+        mock_server.stop()
+    assert sequential['balances'] == batched['balances']
+    
+    print(f"{wallets} wallets, {round(latency * 1000)} ms RPC latency, best of {repeat}")
+    print(tabulate([
+        ['Sequential getBalance', sequential['requests'], round(sequential['latency'] * 1000)],
+        ['Batched getMultipleAccounts', batched['requests'], round(batched['latency'] * 1000)],
+    ], headers=['METHOD', 'RPC REQUESTS', 'LATENCY (MS)'], tablefmt="fancy_grid", numalign="center"))
+    print(f"Speedup: x{round(sequential['latency'] / batched['latency'], 1)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sequential vs batched wallets balances benchmark")
+    parser.add_argument('--wallets', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.05, help="Seconds the mock RPC takes to answer")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.wallets, args.latency, args.repeat))
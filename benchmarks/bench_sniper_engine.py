@@ -0,0 +1,135 @@
+"""Measures memory and connections per watched token of the single process sniper engine against a local mock quote API.
+
+Each run starts a fresh process running N snipers waiting for a route (quotes probed by the route discovery) on the
+shared HTTP client, as Token_Sniper.run_engine does. The former design ran one process per token: its cost is
+estimated as N times the process running a single sniper. Linux only (reads /proc).
+
+Usage: python benchmarks/bench_sniper_engine.py [--tokens 1 10 50 100 200] [--duration 6] [--max-concurrency 50]"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tabulate import tabulate
+
+from mock_server import Mock_Server
+
+
+def get_rss() -> int:
+    """Returns the resident memory of the process in bytes."""
+    with open('/proc/self/status') as status_file:
+        for line in status_file:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+
+
+def get_connections_count() -> int:
+    """Returns the number of established TCP connections of the process."""
+    socket_inodes = set()
+    for fd in os.listdir('/proc/self/fd'):
+        try:
+            link = os.readlink(f'/proc/self/fd/{fd}')
+        except OSError:
+            continue
+        if link.startswith('socket:['):
+            socket_inodes.add(link[len('socket:['):-1])
+    
+    connections_count = 0
+    for table_file in ('/proc/net/tcp', '/proc/net/tcp6'):
+        try:
+            with open(table_file) as table:
+                # Columns: sl local_address rem_address st ... inode
+                connections_count += sum(1 for line in list(table)[1:] if line.split()[3] == '01' and line.split()[9] in socket_inodes)
+        except OSError:
+            pass
+    return connections_count
+
+
+async def run_worker(tokens: int, url: str, duration: float, max_concurrency: int) -> dict:
+    from solders.keypair import Keypair
+    
+    import main
+    
+    main.Quote_Service.QUOTE_URL = f"{url}/v6/quote"
+    http_client = main.Token_Sniper.get_http_client(max_concurrency)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    snipers = []
+    for token_id in range(tokens):
+        token_data = {'ADDRESS': str(Keypair().pubkey()), 'TIMESTAMP': None, 'BUY_AMOUNT': 10, 'SLIPPAGE_BPS': 50, 'STATUS': "NOT IN"}
+        sniper = main.Token_Sniper(token_id=str(token_id), token_data=token_data, wallet=None, http_client=http_client, semaphore=semaphore)
+        # Hot standby: the SOL amount to buy is ready, only quotes are requested
+        sniper.standby = {'amount': int(token_data['BUY_AMOUNT'] * 10 ** 9 / Mock_Server.SOL_PRICE), 'refreshed_at': time.time()}
+        snipers.append(sniper)
+    
+    scheduler = main.Launch_Scheduler.get_scheduler()
+    tasks = [asyncio.create_task(scheduler.wait_for_route(sniper)) for sniper in snipers]
+    await asyncio.sleep(duration)
+    # Measured while the connections are still open
+    result = {'rss': get_rss(), 'connections': get_connections_count(), 'quotes': sum(sniper.health['loops'] for sniper in snipers)}
+    if scheduler.discovery_task is not None:
+        tasks.append(scheduler.discovery_task)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await http_client.aclose()
+    return result
+
+
+def run(tokens_counts: list, duration: float, max_concurrency: int):
+    mock_server = Mock_Server(latency=0.05)
+    mock_server.start()
+    
+    results = {}
+    try:
+        for tokens in [0] + tokens_counts:
+            mock_server.stats.clear()
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--worker', str(tokens), '--url', mock_server.url, '--duration', str(duration), '--max-concurrency', str(max_concurrency)],
+                cwd=tempfile.mkdtemp(), capture_output=True, text=True, check=True
+            ).stdout
+            results[tokens] = json.loads(output.splitlines()[-1])
+    finally:
+        mock_server.stop()
+    
+    baseline = results[0]
+    process_per_token = results[1] if 1 in results else None
+    rows = []
+    for tokens in tokens_counts:
+        result = results[tokens]
+        rows.append([
+            tokens,
+            round(result['rss'] / 2 ** 20, 1),
+            round((result['rss'] - baseline['rss']) / tokens / 2 ** 10, 1),
+            result['connections'],
+            result['quotes'],
+            round(tokens * process_per_token['rss'] / 2 ** 20) if process_per_token else '-',
+            tokens * process_per_token['connections'] if process_per_token else '-',
+        ])
+    
+    print(f"Engine process alone: {round(baseline['rss'] / 2 ** 20, 1)} MB, {duration}s of route discovery, max concurrency {max_concurrency}")
+    print(tabulate(rows, headers=[
+        'TOKENS', 'ENGINE RSS (MB)', 'RSS PER TOKEN (KB)', 'ENGINE CONNECTIONS', 'QUOTES SENT', 'PROCESS PER TOKEN RSS (MB)', 'PROCESS PER TOKEN CONNECTIONS'
+    ], tablefmt="fancy_grid", numalign="center"))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sniper engine memory & connections per watched token benchmark")
+    parser.add_argument('--tokens', type=int, nargs='+', default=[1, 10, 50, 100, 200])
+    parser.add_argument('--duration', type=float, default=6, help="Seconds the snipers run before measuring")
+    parser.add_argument('--max-concurrency', type=int, default=50)
+    parser.add_argument('--worker', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if not os.path.isdir('/proc/self/fd'):
+        sys.exit("This benchmark reads /proc, it only runs on Linux")
+    if args.worker is not None:
+        print(json.dumps(asyncio.run(run_worker(args.worker, args.url, args.duration, args.max_concurrency))))
+    else:
+        run(args.tokens, args.duration, args.max_concurrency)
@@ -0,0 +1,101 @@
+import hashlib
+import http.server
+import json
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+
+class Mock_Server():
+    """Local stand-in of the RPC, Jupiter quote API and Binance price API used by the benchmarks.
+    
+    Every request is answered after latency seconds (the network round trip), requests are counted per method."""
+    
+    SOL_PRICE = 150
+    
+    def __init__(self, latency: float=0.05):
+        self.latency = latency
+        self.stats = {}
+        self.stats_lock = threading.Lock()
+        self.server = None
+    
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+    
+    def start(self):
+        mock_server = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True # Headers & body are written apart, Nagle would delay the body
+            
+            def send_json(self, data):
+                body = json.dumps(data).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', "application/json")
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def do_GET(self):
+                path = urlparse(self.path).path
+                mock_server.count(path)
+                time.sleep(mock_server.latency)
+                if path == "/v6/quote":
+                    self.send_json({'error': "Could not find any route", 'errorCode': "COULD_NOT_FIND_ANY_ROUTE"})
+                else:
+                    self.send_json({'symbol': "SOLUSDT", 'price': str(Mock_Server.SOL_PRICE)})
+            
+            def do_POST(self):
+                rpc_request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                mock_server.count(rpc_request['method'])
+                time.sleep(mock_server.latency)
+                self.send_json({'jsonrpc': "2.0", 'id': rpc_request['id'], 'result': Mock_Server.get_rpc_result(rpc_request)})
+            
+            def log_message(self, *args):
+                pass
+        
+        class Server(http.server.ThreadingHTTPServer):
+            daemon_threads = True
+            request_queue_size = 1024 # Snipers open their connections all at once
+            
+            def handle_error(self, request, client_address):
+                # Clients closing their keep-alive connections while answered
+                if not isinstance(sys.exc_info()[1], ConnectionError):
+                    super().handle_error(request, client_address)
+        
+        self.server = Server(('127.0.0.1', 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+    
+    def count(self, method: str):
+        with self.stats_lock:
+            self.stats[method] = self.stats.get(method, 0) + 1
+    
+    @staticmethod
+    def get_lamports(pubkey: str) -> int:
+        """Returns a balance derived from the pubkey, the same for every call."""
+        return int.from_bytes(hashlib.sha256(pubkey.encode()).digest()[:4], 'big')
+    
+    @staticmethod
+    def get_rpc_result(rpc_request: dict):
+        context = {'slot': 1}
+        match rpc_request['method']:
+            case 'getBalance':
+                return {'context': context, 'value': Mock_Server.get_lamports(rpc_request['params'][0])}
+            case 'getMultipleAccounts':
+                return {'context': context, 'value': [{
+                    'lamports': Mock_Server.get_lamports(pubkey),
+                    'owner': "11111111111111111111111111111111",
+                    'data': ["", "base64"],
+                    'executable': False,
+                    'rentEpoch': 0,
+                    'space': 0,
+                } for pubkey in rpc_request['params'][0]]}
+        return None
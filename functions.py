@@ -1,51 +1,449 @@
 from pyfiglet import Figlet
 import json
+import os
+import time
+import asyncio
+import copy
+import random
+import queue
+import atexit
+import threading
+import email.utils
+import logging
 import httpx
 
+
+logger = logging.getLogger(__name__)
+
+PRICE_TTL = 5 # Seconds a fetched price is served from cache
+PRICE_MAX_AGE = 30 # Seconds after which a price is flagged as stale
+PRICES_CACHE_FILE = 'prices_cache.json'
+
+_prices = {}
+_prices_lock = threading.Lock()
+_prices_inflight = {}
+
+RATE_LIMITS = { # Max requests per second per host, also the burst size (RPC hosts are added from RPC_RATE_LIMIT)
+    'quote-api.jup.ag': 10,
+    'token.jup.ag': 2,
+    'price.jup.ag': 10,
+    'jup.ag': 5,
+    'www.binance.com': 10,
+    'discord.com': 2,
+    'api.telegram.org': 1,
+}
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+NOT_PROCESSED_STATUS_CODES = (429, 503) # Only retry statuses of non-idempotent requests: the server did not process them
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5 # Seconds
+BACKOFF_MAX = 10
+RETRY_AFTER_MAX = 10 # Seconds: a request the server asks to retry later than that is not retried
+
+_rate_buckets = {}
+_rate_buckets_lock = threading.Lock()
+http_stats = {'throttled': 0, 'retried': 0, 'dropped': 0}
+
+ALERTS_BATCH_WINDOW = 1 # Seconds alerts are gathered into one post
+ALERTS_BUFFER_FILE = 'alerts_buffer.jsonl'
+ALERTS_FLUSH_TIMEOUT = 10 # Seconds flush_alerts waits for queued alerts to be posted
+ALERTS_MAX_LENGTH = { # Max characters per post
+    'discord': 2000,
+    'telegram': 4096,
+}
+
+_alerts_queue = queue.Queue()
+_alerts_batch = [] # Alerts taken from the queue by the dispatcher, not posted yet
+_ALERTS_FLUSH = object() # Queued by flush_alerts: the dispatcher posts its batch without waiting the end of the window
+_alerts_thread = None
+_alerts_thread_lock = threading.Lock()
+
+STORE_CHECK_INTERVAL = 1 # Seconds between modification checks of loaded files
+
+_store = {} # {file_path: {'data': dict, 'mtime_ns': int, 'dirty': bool}}
+_store_lock = threading.Lock()
+_store_changed = threading.Condition(_store_lock)
+_store_threads = []
+
+def send_alert(message: str):
+    """Enqueues an alert for all platforms, never blocks."""
+    send_discord_alert(message)
+    send_telegram_alert(message)
+
 def send_discord_alert(message: str):
-    DISCORD_WEBHOOK_URL = get_config_data()['DISCORD_WEBHOOK']
-    try:
-        httpx.post(DISCORD_WEBHOOK_URL, json={'content': f'{message}'})
-    except:
-        pass
+    """Enqueues a Discord alert, never blocks."""
+    _enqueue_alert('discord', message)
 
 def send_telegram_alert(message: str):
-    TELEGRAM_API_INFO = get_config_data()
-    TELEGRAM_BOT_TOKEN = TELEGRAM_API_INFO['TELEGRAM_BOT_TOKEN']
-    TELEGRAM_CHAT_ID = TELEGRAM_API_INFO['TELEGRAM_CHAT_ID']
-    TELEGRAM_URL = "https://api.telegram.org/bot" + TELEGRAM_BOT_TOKEN + "/sendMessage"
-    PAYLOAD = {
-        'chat_id': TELEGRAM_CHAT_ID,
-        'text': message,
-        'parse_mode': 'HTML'
-    }
+    """Enqueues a Telegram alert, never blocks."""
+    _enqueue_alert('telegram', message)
+
+def send_test_alert(platform: str, message: str) -> bool:
+    """Posts an alert right away (not batched nor buffered), to check the platform settings.
+    Returns: True if the alert was accepted"""
     try:
-        httpx.post(url=TELEGRAM_URL, data=PAYLOAD)
-    except:
-        pass
+        response = _post_alert_batch(get_config_data(), platform, [message])
+    except (httpx.TransportError, httpx.InvalidURL):
+        return False
+    return response is not None and response.is_success
+
+def _enqueue_alert(platform: str, message: str):
+    global _alerts_thread
+    _alerts_queue.put((platform, message))
+    with _alerts_thread_lock:
+        if _alerts_thread is None:
+            _alerts_thread = threading.Thread(target=_run_alerts_dispatcher, daemon=True)
+            _alerts_thread.start()
+
+def _run_alerts_dispatcher():
+    """Background sender: gathers alerts during ALERTS_BATCH_WINDOW and sends one post per platform."""
+    _flush_alerts_buffer()
+    while True:
+        queued = [_alerts_queue.get()]
+        deadline = time.monotonic() + ALERTS_BATCH_WINDOW
+        while queued[-1] is not _ALERTS_FLUSH and (timeout := deadline - time.monotonic()) > 0:
+            try:
+                queued.append(_alerts_queue.get(timeout=timeout))
+            except queue.Empty:
+                break
+        
+        _alerts_batch[:] = [alert for alert in queued if alert is not _ALERTS_FLUSH]
+        try:
+            if _alerts_batch and _post_alerts(list(_alerts_batch)):
+                _flush_alerts_buffer()
+        # Config file unreadable (being written) or any unexpected error: the dispatcher must outlive it, the batch is kept
+        except Exception:
+            logger.warning("Alerts batch could not be posted, buffered to disk", exc_info=True)
+            _write_alerts_buffer(list(_alerts_batch))
+        finally:
+            _alerts_batch.clear()
+            for _ in queued:
+                _alerts_queue.task_done()
+
+def _post_alerts(alerts: list) -> bool:
+    """Posts alerts grouped by platform, unsent alerts are buffered to disk.
+    Returns: True if every alert was sent"""
+    config_data = get_config_data()
+    unsent_alerts = []
+    for platform in ALERTS_MAX_LENGTH:
+        messages = [message for alert_platform, message in alerts if alert_platform == platform]
+        for batch in _batch_messages(messages, ALERTS_MAX_LENGTH[platform]):
+            try:
+                response = _post_alert_batch(config_data, platform, batch)
+                # Rejected alerts (bad webhook, bad chat id) would fail again, only unreachable ones are kept
+                if response is None or response.status_code not in RETRY_STATUS_CODES:
+                    continue
+            # Invalid webhook URL: rejected too
+            except (httpx.InvalidURL, httpx.UnsupportedProtocol):
+                continue
+            except httpx.TransportError:
+                pass
+            unsent_alerts.extend((platform, message) for message in batch)
     
+    _write_alerts_buffer(unsent_alerts)
+    return not unsent_alerts
+
+def _post_alert_batch(config_data: dict, platform: str, batch: list) -> httpx.Response:
+    """Posts messages as one alert.
+    Returns: the response, None if the platform is not configured"""
+    match platform:
+        case 'discord':
+            if not config_data['DISCORD_WEBHOOK']:
+                return None
+            return request('POST', config_data['DISCORD_WEBHOOK'], json={'content': "\n".join(batch)})
+        case 'telegram':
+            if not config_data['TELEGRAM_BOT_TOKEN']:
+                return None
+            return request('POST', "https://api.telegram.org/bot" + config_data['TELEGRAM_BOT_TOKEN'] + "/sendMessage", data={
+                'chat_id': config_data['TELEGRAM_CHAT_ID'],
+                'text': "\n".join(batch),
+                'parse_mode': 'HTML'
+            })
+
+def _batch_messages(messages: list, max_length: int) -> list:
+    """Returns messages joined by line into batches not longer than max_length."""
+    batches = []
+    length = 0
+    for message in messages:
+        message = message[:max_length]
+        if not batches or length + len(message) + 1 > max_length:
+            batches.append([])
+            length = -1
+        batches[-1].append(message)
+        length += len(message) + 1
+    return batches
+
+def _flush_alerts_buffer():
+    """Re-enqueues alerts buffered to disk while offline."""
+    # Renaming claims the buffer, so alerts are not sent twice by several processes
+    claimed_file = f"{ALERTS_BUFFER_FILE}.{os.getpid()}"
+    try:
+        os.replace(ALERTS_BUFFER_FILE, claimed_file)
+    except FileNotFoundError:
+        return
+    with open(claimed_file, 'r') as alerts_buffer_file:
+        for line in alerts_buffer_file:
+            try:
+                alert = json.loads(line)
+                _alerts_queue.put((alert['platform'], alert['message']))
+            except (ValueError, KeyError):
+                continue
+    os.remove(claimed_file)
+
+def flush_alerts(timeout: float=ALERTS_FLUSH_TIMEOUT):
+    """Waits for queued alerts to be posted, alerts still queued after timeout are buffered to disk.
+    
+    Must be called before a multiprocessing child returns: it exits with os._exit, atexit handlers never run there."""
+    if _alerts_thread is None:
+        _buffer_pending_alerts()
+        return
+    _alerts_queue.put(_ALERTS_FLUSH)
+    deadline = time.monotonic() + timeout
+    with _alerts_queue.all_tasks_done:
+        while _alerts_queue.unfinished_tasks and (remaining := deadline - time.monotonic()) > 0:
+            _alerts_queue.all_tasks_done.wait(remaining)
+    # Still posting: the batch is buffered too, a duplicate alert is better than a lost one
+    _write_alerts_buffer(list(_alerts_batch))
+    _buffer_pending_alerts()
+
+@atexit.register
+def _buffer_pending_alerts():
+    """Buffers alerts still queued on exit to disk."""
+    pending_alerts = []
+    while True:
+        try:
+            alert = _alerts_queue.get_nowait()
+        except queue.Empty:
+            break
+        _alerts_queue.task_done()
+        if alert is not _ALERTS_FLUSH:
+            pending_alerts.append(alert)
+    _write_alerts_buffer(pending_alerts)
+
+def _write_alerts_buffer(alerts: list):
+    """Appends alerts to the disk buffer, sent again on next dispatcher start or successful post."""
+    if not alerts:
+        return
+    with open(ALERTS_BUFFER_FILE, 'a') as alerts_buffer_file:
+        for platform, message in alerts:
+            alerts_buffer_file.write(json.dumps({'platform': platform, 'message': message}) + "\n")
+
 def display_logo() -> None:
     """Display Jupiter CLI logo."""
     print("\033c\n", end="")
     print("-" * 51, "\n" + Figlet(font='small').renderText('JUPITER  CLI\n') + "-" * 51 + "\n")
 
+def get_json_file(file_path: str) -> dict:
+    """Returns a copy of JSON file data kept in memory, the file is only read again when modified."""
+    with _store_lock:
+        if file_path not in _store:
+            _load_json_file(file_path)
+        _start_store_threads()
+        return copy.deepcopy(_store[file_path]['data'])
+
+def set_json_file(file_path: str, data: dict):
+    """Updates JSON file data in memory, the file is written behind by the store writer."""
+    # Round trip normalizes data as it would be read from file (int keys to str...)
+    data = json.loads(json.dumps(data))
+    with _store_lock:
+        _start_store_threads()
+        _store[file_path] = {'data': data, 'mtime_ns': _store.get(file_path, {}).get('mtime_ns'), 'dirty': True}
+        _store_changed.notify_all()
+
+def flush_json_files(timeout: float=5):
+    """Waits until every JSON file data set is written to disk."""
+    with _store_lock:
+        return _store_changed.wait_for(lambda: not any(entry['dirty'] for entry in _store.values()), timeout=timeout)
+
+def _load_json_file(file_path: str):
+    """Reads JSON file into the store, _store_lock must be held."""
+    with open(file_path, 'r') as json_file:
+        mtime_ns = os.fstat(json_file.fileno()).st_mtime_ns
+        _store[file_path] = {'data': json.load(json_file), 'mtime_ns': mtime_ns, 'dirty': False}
+
+def _start_store_threads():
+    """Starts store writer and watcher threads once, _store_lock must be held."""
+    if not _store_threads:
+        _store_threads.append(threading.Thread(target=_run_store_writer, daemon=True))
+        _store_threads.append(threading.Thread(target=_run_store_watcher, daemon=True))
+        for thread in _store_threads:
+            thread.start()
+
+def _run_store_writer():
+    """Writes modified files atomically (temp file + rename), several updates in a row are written once."""
+    while True:
+        with _store_lock:
+            while not any(entry['dirty'] for entry in _store.values()):
+                _store_changed.wait()
+            file_path, entry = next((file_path, entry) for file_path, entry in _store.items() if entry['dirty'])
+            data = entry['data']
+        
+        temp_file = f"{file_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, 'w') as json_file:
+                json.dump(data, json_file, indent=4)
+            os.replace(temp_file, file_path)
+            mtime_ns = os.stat(file_path).st_mtime_ns
+        # Still dirty, written again next round
+        except OSError:
+            time.sleep(STORE_CHECK_INTERVAL)
+            continue
+        
+        with _store_lock:
+            # Data may have been set again while writing
+            if _store[file_path]['data'] is data:
+                _store[file_path]['dirty'] = False
+            _store[file_path]['mtime_ns'] = mtime_ns
+            _store_changed.notify_all()
+
+def _run_store_watcher():
+    """Reloads loaded files modified by another process."""
+    while True:
+        time.sleep(STORE_CHECK_INTERVAL)
+        with _store_lock:
+            file_paths = [file_path for file_path, entry in _store.items() if not entry['dirty']]
+        for file_path in file_paths:
+            try:
+                mtime_ns = os.stat(file_path).st_mtime_ns
+            except OSError:
+                continue
+            with _store_lock:
+                entry = _store[file_path]
+                if entry['dirty'] or entry['mtime_ns'] == mtime_ns:
+                    continue
+                try:
+                    _load_json_file(file_path)
+                # File being replaced or written by another process, loaded next check
+                except (OSError, ValueError):
+                    pass
+
+def _reset_threads_after_fork():
+    """Threads are not copied in forked processes (snipers), they are started again on next use.
+    
+    Locks are created again too: one held by another thread at fork time would never be released in the child."""
+    global _alerts_queue, _alerts_thread, _alerts_thread_lock, _store_lock, _store_changed, _prices_lock, _rate_buckets_lock
+    _prices_lock = threading.Lock()
+    # Tasks of the parent event loop
+    _prices_inflight.clear()
+    _rate_buckets_lock = threading.Lock()
+    _alerts_queue = queue.Queue()
+    _alerts_batch.clear()
+    _alerts_thread = None
+    _alerts_thread_lock = threading.Lock()
+    _store_lock = threading.Lock()
+    _store_changed = threading.Condition(_store_lock)
+    _store_threads.clear()
+    for entry in _store.values():
+        entry['dirty'] = False
+
+atexit.register(flush_json_files)
+os.register_at_fork(after_in_child=_reset_threads_after_fork)
+
 def get_config_data() -> dict:
     """Fetch config file data.
     Returns: dict"""
-    with open('config.json', 'r') as config_file:
-            return json.load(config_file)
+    return get_json_file('config.json')
         
 def load_wallets() -> dict:
     """Returns all wallets stored in wallets.json."""
-    with open('wallets.json', 'r') as wallets_file:
-        return json.load(wallets_file)
+    return get_json_file('wallets.json')
     
-def get_crypto_price(crypto: str) -> float:
-    """Returns crypto price."""
+def fetch_crypto_price(crypto: str) -> float:
+    """Fetches crypto price from Binance."""
     API_BINANCE = f"https://www.binance.com/api/v3/ticker/price?symbol={crypto}USDT"
-    crypto_price =float(httpx.get(API_BINANCE).json()['price'])
+    crypto_price =float(request('GET', API_BINANCE).json()['price'])
     return crypto_price
 
+def _format_price_data(price_data: dict) -> dict:
+    """Returns price data with its age and staleness."""
+    age = time.time() - price_data['timestamp']
+    return {
+        'price': price_data['price'],
+        'timestamp': price_data['timestamp'],
+        'age': age,
+        'stale': age > PRICE_MAX_AGE
+    }
+
+def _get_cached_price(crypto: str, ttl: float) -> dict:
+    """Returns price data if cached in this process for less than ttl seconds."""
+    price_data = _prices.get(crypto)
+    if price_data and time.time() - price_data['timestamp'] < ttl:
+        return _format_price_data(price_data)
+    return None
+
+def _read_shared_prices() -> dict:
+    """Returns prices shared by all CLI processes."""
+    try:
+        with open(PRICES_CACHE_FILE, 'r') as prices_file:
+            return json.load(prices_file)
+    except (OSError, ValueError):
+        return {}
+
+def _write_shared_prices(prices: dict):
+    """Atomically replaces prices shared by all CLI processes."""
+    temp_file = f"{PRICES_CACHE_FILE}.{os.getpid()}.tmp"
+    try:
+        with open(temp_file, 'w') as prices_file:
+            json.dump(prices, prices_file)
+        os.replace(temp_file, PRICES_CACHE_FILE)
+    except OSError:
+        pass
+
+def _refresh_crypto_price(crypto: str, ttl: float) -> dict:
+    """Returns crypto price data, fetching it only if nor this process nor another one has a fresh price.
+    
+    The lock makes concurrent callers wait for a single fetch, if it fails the last known price is returned flagged as stale."""
+    with _prices_lock:
+        price_data = _get_cached_price(crypto, ttl)
+        if price_data:
+            return price_data
+        
+        shared_prices = _read_shared_prices()
+        shared_price_data = shared_prices.get(crypto)
+        if shared_price_data and time.time() - shared_price_data['timestamp'] < ttl:
+            _prices[crypto] = shared_price_data
+            return _format_price_data(shared_price_data)
+        
+        try:
+            price_data = {'price': fetch_crypto_price(crypto), 'timestamp': time.time()}
+        except (httpx.HTTPError, ValueError, KeyError):
+            last_price_data = max([_prices.get(crypto), shared_price_data], key=lambda data: data['timestamp'] if data else 0)
+            if last_price_data is None:
+                raise
+            _prices[crypto] = last_price_data
+            return _format_price_data(last_price_data)
+        
+        _prices[crypto] = price_data
+        shared_prices[crypto] = price_data
+        _write_shared_prices(shared_prices)
+        return _format_price_data(price_data)
+
+def get_crypto_price_data(crypto: str, ttl: float=PRICE_TTL) -> dict:
+    """Returns crypto price data: {'price', 'timestamp', 'age', 'stale'}."""
+    return _get_cached_price(crypto, ttl) or _refresh_crypto_price(crypto, ttl)
+
+async def get_crypto_price_data_async(crypto: str, ttl: float=PRICE_TTL) -> dict:
+    """Returns crypto price data without blocking the event loop, coroutines asking for the same price share one fetch."""
+    price_data = _get_cached_price(crypto, ttl)
+    if price_data:
+        return price_data
+    
+    loop = asyncio.get_running_loop()
+    inflight_task = _prices_inflight.get(crypto)
+    if inflight_task is None or inflight_task.get_loop() is not loop:
+        inflight_task = loop.create_task(asyncio.to_thread(_refresh_crypto_price, crypto, ttl))
+        _prices_inflight[crypto] = inflight_task
+        inflight_task.add_done_callback(lambda task: _prices_inflight.pop(crypto) if _prices_inflight.get(crypto) is task else None)
+    return await asyncio.shield(inflight_task)
+
+def get_crypto_price(crypto: str) -> float:
+    """Returns crypto price."""
+    return get_crypto_price_data(crypto)['price']
+
+async def get_crypto_price_async(crypto: str) -> float:
+    """Returns crypto price."""
+    return (await get_crypto_price_data_async(crypto))['price']
+
 def get_timestamp_formatted(unix_timestamp: int) -> str:
     """Returns timestamp formatted based on a unix timestamp."""
     if unix_timestamp < 60:
@@ -69,4 +467,125 @@ def get_timestamp_formatted(unix_timestamp: int) -> str:
     else:
         months = unix_timestamp // 2629746  # Approximately a month
         days = (unix_timestamp % 2629746) // 86400
-        return f"{months} month{'s' if months > 1 else ''}, {days} day{'s' if days > 1 else ''}"
\ No newline at end of file
+        return f"{months} month{'s' if months > 1 else ''}, {days} day{'s' if days > 1 else ''}"
+
+def take_rate_token(host: str) -> float:
+    """Takes a token of the host token bucket, returns seconds to wait before sending the request."""
+    rate = RATE_LIMITS.get(host)
+    if not rate:
+        return 0
+    
+    with _rate_buckets_lock:
+        now = time.monotonic()
+        bucket = _rate_buckets.setdefault(host, {'tokens': rate, 'updated_at': now})
+        bucket['tokens'] = min(rate, bucket['tokens'] + (now - bucket['updated_at']) * rate)
+        bucket['updated_at'] = now
+        # Tokens can go negative: waiting requests are queued in the bucket
+        bucket['tokens'] -= 1
+        if bucket['tokens'] >= 0:
+            return 0
+        http_stats['throttled'] += 1
+        return -bucket['tokens'] / rate
+
+async def wait_rate_limit(host: str):
+    """Waits for a token of the host token bucket, hosts without rate limit are not throttled."""
+    delay = take_rate_token(host)
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+def parse_retry_after(retry_after: str) -> float:
+    """Returns seconds to wait from a Retry-After header (seconds or HTTP date), None if missing or invalid."""
+    if not retry_after:
+        return None
+    try:
+        return max(float(retry_after), 0)
+    except ValueError:
+        pass
+    try:
+        return max(email.utils.parsedate_to_datetime(retry_after).timestamp() - time.time(), 0)
+    except (TypeError, ValueError):
+        return None
+
+def get_backoff_delay(attempt: int, retry_after: float=None) -> float:
+    """Returns seconds to wait before the next attempt: Retry-After if given (at most RETRY_AFTER_MAX), else exponential
+    backoff with full jitter."""
+    if retry_after is not None:
+        return min(retry_after, RETRY_AFTER_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+def should_retry(response: httpx.Response, idempotent: bool=True) -> bool:
+    """Returns True if the response status is worth a retry: throttled or unavailable (only when the server did not
+    process the request if it is not idempotent)."""
+    return response.status_code in (RETRY_STATUS_CODES if idempotent else NOT_PROCESSED_STATUS_CODES)
+
+def should_retry_error(error: httpx.TransportError, idempotent: bool=True) -> bool:
+    """Non-idempotent requests (webhook posts...) are only retried if the connection failed: they were never sent,
+    a read timeout may come after the server processed them."""
+    return idempotent or isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout))
+
+def request(method: str, url: str, max_retries: int=MAX_RETRIES, **kwargs) -> httpx.Response:
+    """Sends a rate limited HTTP request, retried with backoff on 429/5xx or connection error
+    (POST only on 429/503 or connection failure, see should_retry_error)."""
+    host = httpx.URL(url).host
+    idempotent = method.upper() in IDEMPOTENT_METHODS
+    attempt = 0
+    while True:
+        delay = take_rate_token(host)
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            response = httpx.request(method, url, **kwargs)
+            retryable = should_retry(response, idempotent)
+            retry_after = parse_retry_after(response.headers.get('Retry-After')) if retryable else None
+            # Retry-After longer than RETRY_AFTER_MAX: the caller gets the answer instead of sleeping that long
+            if not retryable or attempt == max_retries or (retry_after is not None and retry_after > RETRY_AFTER_MAX):
+                if retryable:
+                    http_stats['dropped'] += 1
+                return response
+        except httpx.TransportError as error:
+            if attempt == max_retries or not should_retry_error(error, idempotent):
+                http_stats['dropped'] += 1
+                raise
+            retry_after = None
+        http_stats['retried'] += 1
+        time.sleep(get_backoff_delay(attempt, retry_after))
+        attempt += 1
+
+class Rate_Limited_Transport(httpx.AsyncHTTPTransport):
+    """httpx async transport applying the per host rate limits, requests are retried with backoff on 429/5xx or connection error.
+    
+    POST requests are only retried on 429/503 or connection failure, unless idempotent_posts (JSON-RPC: reads, and
+    signed transactions deduplicated by signature)."""
+    
+    def __init__(self, max_retries: int=MAX_RETRIES, idempotent_posts: bool=False, **kwargs):
+        super().__init__(**kwargs)
+        self.max_retries = max_retries
+        self.idempotent_posts = idempotent_posts
+    
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        idempotent = request.method in IDEMPOTENT_METHODS or (self.idempotent_posts and request.method == 'POST')
+        attempt = 0
+        while True:
+            await wait_rate_limit(request.url.host)
+            try:
+                response = await super().handle_async_request(request)
+                retryable = should_retry(response, idempotent)
+                retry_after = parse_retry_after(response.headers.get('Retry-After')) if retryable else None
+                # Retry-After longer than RETRY_AFTER_MAX: the caller (maybe holding a sniper semaphore slot) gets the answer
+                if not retryable or attempt == self.max_retries or (retry_after is not None and retry_after > RETRY_AFTER_MAX):
+                    if retryable:
+                        http_stats['dropped'] += 1
+                    return response
+                await response.aclose()
+            except httpx.TransportError as error:
+                if attempt == self.max_retries or not should_retry_error(error, idempotent):
+                    http_stats['dropped'] += 1
+                    raise
+                retry_after = None
+            http_stats['retried'] += 1
+            await asyncio.sleep(get_backoff_delay(attempt, retry_after))
+            attempt += 1
+
+def get_async_http_client(timeout: float=10, **transport_kwargs) -> httpx.AsyncClient:
+    """Returns an async HTTP client whose requests are rate limited & retried, transport_kwargs go to httpx transport (limits, http2...)."""
+    return httpx.AsyncClient(timeout=timeout, transport=Rate_Limited_Transport(**transport_kwargs))
@@ -1,19 +1,32 @@
 import json
+import os
+import sqlite3
+import pickle
 import base58
 import base64
 import time
 import re
 import httpx
 import asyncio
-from  multiprocessing import Process
+import websockets
+from  multiprocessing import Process, Queue
 import random
+import heapq
+import shutil
+import threading
+import weakref
+import inspect
+import importlib.util
+import logging
 
+from array import array
 from datetime import datetime
 
 from InquirerPy import inquirer
 
 from tabulate import tabulate
 import pandas as pd
+import numpy as np
 
 from yaspin import yaspin
 
@@ -22,24 +35,30 @@ from solders.keypair import Keypair
 from solders.pubkey import Pubkey
 from solders.transaction import VersionedTransaction
 from solders.signature import Signature
+from solders.hash import Hash
+from solders.transaction_status import TransactionConfirmationStatus
 from solders.system_program import transfer, TransferParams
 
 
 from solana.rpc.async_api import AsyncClient
-from solana.rpc.api import Client
 from solana.rpc.commitment import Processed
-from solana.rpc.types import TxOpts
+from solana.rpc.types import TxOpts, TokenAccountOpts
+from solana.exceptions import SolanaRpcException
 from solana.transaction import Transaction
 
 from spl.token.instructions import get_associated_token_address
 
 
-from jupiter_python_sdk.jupiter import Jupiter, Jupiter_DCA
+from jupiter_python_sdk.jupiter import Jupiter
+
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
 
 
 import functions as f
 import constants as c
 
+logger = logging.getLogger(__name__)
+
 
 class Config_CLI():
     
@@ -47,50 +66,25 @@ class Config_CLI():
     async def get_config_data() -> dict:
         """Fetch config file data.
         Returns: dict"""
-        with open('config.json', 'r') as config_file:
-            return json.load(config_file)
+        return f.get_json_file('config.json')
         
     @staticmethod
     def get_config_data_no_async() -> dict:
         """Fetch config file data.
         Returns: dict"""
-        with open('config.json', 'r') as config_file:
-            return json.load(config_file)
+        return f.get_json_file('config.json')
         
     @staticmethod
     async def edit_config_file(config_data: dict):
         """Edit config file."""
-        with open('config.json', 'w') as config_file:
-            json.dump(config_data, config_file, indent=4)
-        return True
-    
-    @staticmethod
-    async def edit_tokens_file(tokens_data: dict):
-        """Edit tokens file."""
-        with open('tokens.json', 'w') as tokens_file:
-            json.dump(tokens_data, tokens_file, indent=4)
-        return True
-    
-    @staticmethod
-    def edit_tokens_file_no_async(tokens_data: dict):
-        """Edit tokens file."""
-        with open('tokens.json', 'w') as tokens_file:
-            json.dump(tokens_data, tokens_file, indent=4)
+        f.set_json_file('config.json', config_data)
         return True
     
     @staticmethod
     async def get_tokens_data() -> dict:
-        """Fetch token file data.
-        Returns: dict"""
-        with open('tokens.json', 'r') as tokens_file:
-            return json.load(tokens_file)
-        
-    @staticmethod
-    def get_tokens_data_no_async() -> dict:
-        """Fetch token file data.
+        """Fetch tokens to snipe.
         Returns: dict"""
-        with open('tokens.json', 'r') as tokens_file:
-            return json.load(tokens_file)
+        return Tokens_Store.get_tokens()
         
     @staticmethod
     async def prompt_collect_fees():
@@ -110,7 +104,7 @@ class Config_CLI():
     async def prompt_rpc_url():
         """Asks the user the RPC URL endpoint to be used."""
         config_data = await Config_CLI.get_config_data()
-        rpc_url = await inquirer.text(message="Enter your Solana RPC URL endpoint or press ENTER to skip:").execute_async()
+        rpc_url = await inquirer.text(message="Enter your Solana RPC URL endpoint(s) separated by commas or press ENTER to skip:").execute_async()
         # rpc_url = os.getenv('RPC_URL')
         # confirm = "Yes"
         
@@ -122,17 +116,16 @@ class Config_CLI():
         elif rpc_url != "":
             confirm = await inquirer.select(message="Confirm Solana RPC URL Endpoint?", choices=["Yes", "No"]).execute_async()
             if confirm == "Yes":
-                if rpc_url.endswith("/"):
-                    rpc_url = rpc_url[:-1]
-                    
-                test_client = AsyncClient(endpoint=rpc_url)
+                rpc_urls = [url.strip().removesuffix("/") for url in rpc_url.split(",") if url.strip()]
                 
-                if not await test_client.is_connected():
-                    print(f"{c.RED}! Connection to RPC failed. Please enter a valid RPC.{c.RESET}")
+                connected = await asyncio.gather(*[RPC_Manager.get_client(url).is_connected() for url in rpc_urls])
+                if not all(connected):
+                    failed_rpc_urls = [url for url, is_connected in zip(rpc_urls, connected) if not is_connected]
+                    print(f"{c.RED}! Connection to RPC failed ({', '.join(failed_rpc_urls)}). Please enter a valid RPC.{c.RESET}")
                     await Config_CLI.prompt_rpc_url()
                     return
                 else:
-                    config_data['RPC_URL'] = rpc_url
+                    config_data['RPC_URL'] = rpc_urls[0] if len(rpc_urls) == 1 else rpc_urls
                     await Config_CLI.edit_config_file(config_data=config_data)
                     return
             
@@ -154,7 +147,7 @@ class Config_CLI():
             if confirm == "Yes":
                 config_data['DISCORD_WEBHOOK'] = discord_webhook
                 await Config_CLI.edit_config_file(config_data=config_data)
-                f.send_discord_alert("Discord Alert added!")
+                await asyncio.to_thread(f.send_test_alert, 'discord', "Discord Alert added!")
                 
                 confirm = await inquirer.select(message="Is message sent in the Discord channel?", choices=["Yes", "No"]).execute_async()
                 if confirm == "No":
@@ -186,7 +179,7 @@ class Config_CLI():
                     if confirm == "Yes":
                         config_data['TELEGRAM_CHAT_ID'] = int(telegram_bot_token)
                         await Config_CLI.edit_config_file(config_data=config_data)
-                        f.send_telegram_alert("Telegram Alert added!")
+                        await asyncio.to_thread(f.send_test_alert, 'telegram', "Telegram Alert added!")
                 
                         confirm = await inquirer.select(message="Is message sent in the Telegram channel?", choices=["Yes", "No"]).execute_async()
                         if confirm == "No":
@@ -212,11 +205,18 @@ class Config_CLI():
         
         # print(f"CLI collect fees (0.005%): {'Yes' if config_data['COLLECT_FEES'] else 'No'}") # TBD
         
-        client = AsyncClient(endpoint=config_data['RPC_URL'])
-        start_time = time.time()
-        await client.is_connected()
-        end_time = time.time()
-        print(f"RPC URL Endpoint: {config_data['RPC_URL']} {c.GREEN}({round(end_time - start_time, 2)} ms){c.RESET}")
+        await RPC_Manager.probe()
+        endpoints_metrics = RPC_Manager.get_metrics()
+        for endpoint in RPC_Manager.get_endpoints():
+            health = RPC_Manager.health.get(endpoint, {'latency': None, 'error_rate': 0})
+            if health['error_rate'] >= RPC_Manager.UNHEALTHY_ERROR_RATE or health['latency'] is None:
+                print(f"RPC URL Endpoint: {endpoint} {c.RED}(UNHEALTHY - {round(health['error_rate'] * 100, 1)}% errors){c.RESET}")
+            else:
+                print(f"RPC URL Endpoint: {endpoint} {c.GREEN}({round(health['latency'] * 1000, 2)} ms - {round(health['error_rate'] * 100, 1)}% errors){c.RESET}")
+            if endpoint in endpoints_metrics:
+                metrics = endpoints_metrics[endpoint]
+                print(f"  Connections: {metrics['open_connections']} open | {metrics['handshakes']} handshakes for {metrics['requests']} requests | Reuse ratio: {round(metrics['reuse_ratio'] * 100, 1)}%")
+        print(f"HTTP requests: {f.http_stats['throttled']} throttled | {f.http_stats['retried']} retried | {f.http_stats['dropped']} dropped")
         print("Discord Webhook:", config_data['DISCORD_WEBHOOK'])
         print("Telegram Bot Token:", config_data['TELEGRAM_BOT_TOKEN'], "| Channel ID:", config_data['TELEGRAM_CHAT_ID'])
         
@@ -248,14 +248,577 @@ class Config_CLI():
                 return
 
 
+class Tokens_Store():
+    """Tokens to snipe stored in SQLite (WAL mode), one row per token, along with the health of their snipers.
+    
+    Sniper processes & the CLI update single fields of a row, so concurrent status changes are never overwritten
+    by a stale copy of all the tokens. tokens.json (previous storage) is imported on first run."""
+    
+    DATABASE_FILE = 'tokens.db'
+    LEGACY_FILE = 'tokens.json'
+    BUSY_TIMEOUT = 5000 # Milliseconds a write waits for another process lock
+    COLUMNS = ('NAME', 'ADDRESS', 'WALLET', 'BUY_AMOUNT', 'TAKE_PROFIT', 'STOP_LOSS', 'SLIPPAGE_BPS', 'TIMESTAMP', 'STATUS')
+    HEALTH_COLUMNS = ('STATE', 'HEARTBEAT', 'QUOTE_LATENCY', 'LOOP_RATE', 'ERRORS', 'RESTARTS')
+    
+    connections = {}
+    
+    @staticmethod
+    def get_connection() -> sqlite3.Connection:
+        """Returns the process database connection (a connection can not be shared with forked processes)."""
+        pid = os.getpid()
+        if pid not in Tokens_Store.connections:
+            new_database = not os.path.exists(Tokens_Store.DATABASE_FILE)
+            connection = sqlite3.connect(Tokens_Store.DATABASE_FILE, timeout=Tokens_Store.BUSY_TIMEOUT / 1000, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA busy_timeout={Tokens_Store.BUSY_TIMEOUT}")
+            connection.execute("""CREATE TABLE IF NOT EXISTS tokens (
+                ID INTEGER PRIMARY KEY AUTOINCREMENT,
+                NAME TEXT, ADDRESS TEXT, WALLET TEXT,
+                BUY_AMOUNT REAL, TAKE_PROFIT REAL, STOP_LOSS REAL, SLIPPAGE_BPS REAL,
+                TIMESTAMP INTEGER, STATUS TEXT,
+                UPDATED_AT REAL
+            )""")
+            connection.execute("""CREATE TABLE IF NOT EXISTS snipers_health (
+                ID INTEGER PRIMARY KEY,
+                STATE TEXT, HEARTBEAT REAL, QUOTE_LATENCY REAL, LOOP_RATE REAL, ERRORS INTEGER, RESTARTS INTEGER,
+                UPDATED_AT REAL
+            )""")
+            Tokens_Store.connections = {pid: connection}
+            if new_database:
+                Tokens_Store.import_legacy_file()
+        return Tokens_Store.connections[pid]
+    
+    @staticmethod
+    def import_legacy_file():
+        """Imports tokens of tokens.json, keeping their IDs."""
+        try:
+            with open(Tokens_Store.LEGACY_FILE, 'r') as tokens_file:
+                tokens_data = json.load(tokens_file)
+        except (OSError, ValueError):
+            return
+        
+        connection = Tokens_Store.connections[os.getpid()]
+        with connection:
+            connection.execute("BEGIN")
+            for token_id, token_data in tokens_data.items():
+                connection.execute(
+                    f"INSERT OR IGNORE INTO tokens (ID, {', '.join(Tokens_Store.COLUMNS)}, UPDATED_AT) VALUES ({', '.join('?' * (len(Tokens_Store.COLUMNS) + 2))})",
+                    (int(token_id), *[token_data.get(column) for column in Tokens_Store.COLUMNS], time.time())
+                )
+    
+    @staticmethod
+    def get_tokens() -> dict:
+        """Returns all the tokens to snipe: {token_id: token_data}."""
+        cursor = Tokens_Store.get_connection().execute(f"SELECT ID, {', '.join(Tokens_Store.COLUMNS)} FROM tokens ORDER BY ID")
+        return {str(row[0]): dict(zip(Tokens_Store.COLUMNS, row[1:])) for row in cursor}
+    
+    @staticmethod
+    def add_token(token_data: dict) -> str:
+        """Adds a token to snipe, returns its ID."""
+        cursor = Tokens_Store.get_connection().execute(
+            f"INSERT INTO tokens ({', '.join(Tokens_Store.COLUMNS)}, UPDATED_AT) VALUES ({', '.join('?' * (len(Tokens_Store.COLUMNS) + 1))})",
+            (*[token_data.get(column) for column in Tokens_Store.COLUMNS], time.time())
+        )
+        return str(cursor.lastrowid)
+    
+    @staticmethod
+    def update_token(token_id: str, fields: dict):
+        """Updates only the given fields of a token."""
+        columns = [column for column in fields if column in Tokens_Store.COLUMNS]
+        Tokens_Store.get_connection().execute(
+            f"UPDATE tokens SET {', '.join(f'{column} = ?' for column in columns)}, UPDATED_AT = ? WHERE ID = ?",
+            (*[fields[column] for column in columns], time.time(), int(token_id))
+        )
+    
+    @staticmethod
+    def delete_token(token_id: str):
+        Tokens_Store.get_connection().execute("DELETE FROM tokens WHERE ID = ?", (int(token_id),))
+    
+    @staticmethod
+    def set_snipers_health(snipers_health: dict):
+        """Replaces the health reported by the sniper engine: {token_id: health}."""
+        connection = Tokens_Store.get_connection()
+        with connection:
+            connection.execute("BEGIN")
+            connection.execute("DELETE FROM snipers_health")
+            connection.executemany(
+                f"INSERT INTO snipers_health (ID, {', '.join(Tokens_Store.HEALTH_COLUMNS)}, UPDATED_AT) VALUES ({', '.join('?' * (len(Tokens_Store.HEALTH_COLUMNS) + 2))})",
+                [(int(token_id), *[health[column.lower()] for column in Tokens_Store.HEALTH_COLUMNS], time.time()) for token_id, health in snipers_health.items()]
+            )
+    
+    @staticmethod
+    def get_snipers_health() -> dict:
+        """Returns the last health reported by the sniper engine: {token_id: health}."""
+        cursor = Tokens_Store.get_connection().execute(f"SELECT ID, {', '.join(Tokens_Store.HEALTH_COLUMNS)}, UPDATED_AT FROM snipers_health ORDER BY ID")
+        return {str(row[0]): dict(zip([column.lower() for column in Tokens_Store.HEALTH_COLUMNS] + ['updated_at'], row[1:])) for row in cursor}
+
+
+class Trade_Ledger():
+    """Local trades ledger stored in SQLite (WAL mode): Jupiter limit order fills, DCA fills and sniper swaps.
+    
+    Trades are indexed by wallet, mints & time. Positions (held amount, cost basis, realized PnL) are aggregated per
+    (wallet, mint, quote mint) as trades are inserted, with the average cost method, so PnL queries only read
+    positions. Tokens sold beyond the held amount (acquired outside the ledger) have an unknown cost: their proceeds
+    are counted apart, not as realized PnL. Amounts are raw (not scaled by decimals), PnL is in quote mint raw units."""
+    
+    DATABASE_FILE = 'trades.db'
+    QUOTE_MINTS = { # Mints PnL is counted in: {mint: decimals}
+        'So11111111111111111111111111111111111111112': 9,
+        'EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v': 6,
+        'Es9vMFrzaCERmJfrF4H2FYD4KCoNkY11McCe8BenwNYB': 6,
+    }
+    COLUMNS = ('ID', 'SOURCE', 'WALLET', 'TIMESTAMP', 'INPUT_MINT', 'INPUT_AMOUNT', 'OUTPUT_MINT', 'OUTPUT_AMOUNT', 'TXID')
+    POSITION_COLUMNS = ('WALLET', 'MINT', 'QUOTE_MINT', 'AMOUNT', 'COST', 'REALIZED_PNL', 'UNKNOWN_COST_SOLD', 'BOUGHT', 'SOLD', 'TRADES', 'LAST_TIMESTAMP')
+    
+    connections = {}
+    
+    @staticmethod
+    def get_connection() -> sqlite3.Connection:
+        """Returns the process database connection (a connection can not be shared with forked processes)."""
+        pid = os.getpid()
+        if pid not in Trade_Ledger.connections:
+            connection = sqlite3.connect(Trade_Ledger.DATABASE_FILE, timeout=Tokens_Store.BUSY_TIMEOUT / 1000, isolation_level=None)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(f"PRAGMA busy_timeout={Tokens_Store.BUSY_TIMEOUT}")
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS trades (
+                    ID TEXT PRIMARY KEY,
+                    SOURCE TEXT, WALLET TEXT, TIMESTAMP REAL,
+                    INPUT_MINT TEXT, INPUT_AMOUNT REAL, OUTPUT_MINT TEXT, OUTPUT_AMOUNT REAL,
+                    TXID TEXT
+                );
+                CREATE INDEX IF NOT EXISTS trades_wallet_timestamp ON trades (WALLET, TIMESTAMP);
+                CREATE INDEX IF NOT EXISTS trades_input_mint_timestamp ON trades (INPUT_MINT, TIMESTAMP);
+                CREATE INDEX IF NOT EXISTS trades_output_mint_timestamp ON trades (OUTPUT_MINT, TIMESTAMP);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    SOURCE TEXT, WALLET TEXT, LAST_ID INTEGER,
+                    PRIMARY KEY (SOURCE, WALLET)
+                );
+            """)
+            positions_columns = {row['name'] for row in connection.execute("PRAGMA table_info(positions)")}
+            # Positions are derived from trades: an outdated positions table is computed again
+            if positions_columns != set(Trade_Ledger.POSITION_COLUMNS):
+                with connection:
+                    connection.execute("BEGIN IMMEDIATE")
+                    connection.execute("DROP TABLE IF EXISTS positions")
+                    connection.execute("""CREATE TABLE positions (
+                        WALLET TEXT, MINT TEXT, QUOTE_MINT TEXT,
+                        AMOUNT REAL, COST REAL, REALIZED_PNL REAL, UNKNOWN_COST_SOLD REAL, BOUGHT REAL, SOLD REAL, TRADES INTEGER,
+                        LAST_TIMESTAMP REAL,
+                        PRIMARY KEY (WALLET, MINT, QUOTE_MINT)
+                    )""")
+                    Trade_Ledger.rebuild_positions(connection)
+            Trade_Ledger.connections = {pid: connection}
+        return Trade_Ledger.connections[pid]
+    
+    @staticmethod
+    def get_position_trade(trade: dict) -> tuple:
+        """Returns (mint, quote mint, 'BUY'/'SELL', mint amount, quote amount), None if the trade is not against a quote mint."""
+        input_is_quote = trade['INPUT_MINT'] in Trade_Ledger.QUOTE_MINTS
+        output_is_quote = trade['OUTPUT_MINT'] in Trade_Ledger.QUOTE_MINTS
+        if input_is_quote and not output_is_quote:
+            return trade['OUTPUT_MINT'], trade['INPUT_MINT'], 'BUY', trade['OUTPUT_AMOUNT'], trade['INPUT_AMOUNT']
+        if output_is_quote and not input_is_quote:
+            return trade['INPUT_MINT'], trade['OUTPUT_MINT'], 'SELL', trade['INPUT_AMOUNT'], trade['OUTPUT_AMOUNT']
+        return None
+    
+    @staticmethod
+    def apply_trade(position: dict, side: str, amount: float, quote_amount: float, timestamp: float):
+        """Updates position with a trade, sold amounts leave at the average cost."""
+        if side == 'BUY':
+            position['AMOUNT'] += amount
+            position['COST'] += quote_amount
+            position['BOUGHT'] += quote_amount
+        else:
+            sold_amount = min(amount, position['AMOUNT'])
+            sold_cost = position['COST'] * sold_amount / position['AMOUNT'] if position['AMOUNT'] > 0 else 0
+            # Proceeds of the amount not held in the ledger have no cost basis, they are not a profit
+            unknown_cost_proceeds = quote_amount * (amount - sold_amount) / amount if amount > 0 else 0
+            position['REALIZED_PNL'] += quote_amount - unknown_cost_proceeds - sold_cost
+            position['UNKNOWN_COST_SOLD'] += unknown_cost_proceeds
+            position['COST'] -= sold_cost
+            position['AMOUNT'] -= sold_amount
+            position['SOLD'] += quote_amount
+        position['TRADES'] += 1
+        position['LAST_TIMESTAMP'] = max(position['LAST_TIMESTAMP'], timestamp)
+    
+    @staticmethod
+    def compute_position(connection: sqlite3.Connection, wallet_address: str, mint: str, quote_mint: str) -> dict:
+        """Returns the position computed from all its stored trades."""
+        position = {'WALLET': wallet_address, 'MINT': mint, 'QUOTE_MINT': quote_mint, 'AMOUNT': 0, 'COST': 0, 'REALIZED_PNL': 0, 'UNKNOWN_COST_SOLD': 0, 'BOUGHT': 0, 'SOLD': 0, 'TRADES': 0, 'LAST_TIMESTAMP': 0}
+        for trade in connection.execute(
+            "SELECT * FROM trades WHERE WALLET = ? AND ((INPUT_MINT = ? AND OUTPUT_MINT = ?) OR (INPUT_MINT = ? AND OUTPUT_MINT = ?)) ORDER BY TIMESTAMP",
+            (wallet_address, mint, quote_mint, quote_mint, mint)
+        ):
+            _, _, side, amount, quote_amount = Trade_Ledger.get_position_trade(trade)
+            Trade_Ledger.apply_trade(position, side, amount, quote_amount, trade['TIMESTAMP'])
+        return position
+    
+    @staticmethod
+    def save_position(connection: sqlite3.Connection, position: dict):
+        connection.execute(
+            f"INSERT OR REPLACE INTO positions ({', '.join(Trade_Ledger.POSITION_COLUMNS)}) VALUES ({', '.join('?' * len(Trade_Ledger.POSITION_COLUMNS))})",
+            [position[column] for column in Trade_Ledger.POSITION_COLUMNS]
+        )
+    
+    @staticmethod
+    def rebuild_positions(connection: sqlite3.Connection):
+        """Computes every position again from the stored trades."""
+        positions_keys = set()
+        for trade in connection.execute("SELECT DISTINCT WALLET, INPUT_MINT, OUTPUT_MINT FROM trades"):
+            position_trade = Trade_Ledger.get_position_trade({**dict(trade), 'INPUT_AMOUNT': 0, 'OUTPUT_AMOUNT': 0})
+            if position_trade is not None:
+                positions_keys.add((trade['WALLET'], position_trade[0], position_trade[1]))
+        for wallet_address, mint, quote_mint in positions_keys:
+            Trade_Ledger.save_position(connection, Trade_Ledger.compute_position(connection, wallet_address, mint, quote_mint))
+    
+    @staticmethod
+    def add_trades(trades: list) -> int:
+        """Inserts trades not stored yet and updates their positions, returns the number of new trades."""
+        connection = Trade_Ledger.get_connection()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            new_trades = {}
+            for trade in trades:
+                cursor = connection.execute(
+                    f"INSERT OR IGNORE INTO trades ({', '.join(Trade_Ledger.COLUMNS)}) VALUES ({', '.join('?' * len(Trade_Ledger.COLUMNS))})",
+                    [trade[column] for column in Trade_Ledger.COLUMNS]
+                )
+                position_trade = Trade_Ledger.get_position_trade(trade)
+                if cursor.rowcount == 1 and position_trade is not None:
+                    mint, quote_mint, side, amount, quote_amount = position_trade
+                    new_trades.setdefault((trade['WALLET'], mint, quote_mint), []).append((trade['TIMESTAMP'], side, amount, quote_amount))
+            
+            for (wallet, mint, quote_mint), position_trades in new_trades.items():
+                row = connection.execute("SELECT * FROM positions WHERE WALLET = ? AND MINT = ? AND QUOTE_MINT = ?", (wallet, mint, quote_mint)).fetchone()
+                position_trades.sort()
+                # Older trades than the aggregated ones (history fetched newest first): the position is computed again
+                if row is None or position_trades[0][0] < row['LAST_TIMESTAMP']:
+                    position = Trade_Ledger.compute_position(connection, wallet, mint, quote_mint)
+                else:
+                    position = dict(row)
+                    for timestamp, side, amount, quote_amount in position_trades:
+                        Trade_Ledger.apply_trade(position, side, amount, quote_amount, timestamp)
+                Trade_Ledger.save_position(connection, position)
+        return sum(len(position_trades) for position_trades in new_trades.values())
+    
+    @staticmethod
+    def add_swap(source: str, wallet_address: str, quote_response: dict, transaction_hash: str):
+        """Stores a confirmed swap sent by the CLI."""
+        Trade_Ledger.add_trades([{
+            'ID': f"{source}:{transaction_hash}",
+            'SOURCE': source,
+            'WALLET': wallet_address,
+            'TIMESTAMP': time.time(),
+            'INPUT_MINT': quote_response['inputMint'],
+            'INPUT_AMOUNT': float(quote_response['inAmount']),
+            'OUTPUT_MINT': quote_response['outputMint'],
+            'OUTPUT_AMOUNT': float(quote_response['outAmount']),
+            'TXID': transaction_hash,
+        }])
+    
+    @staticmethod
+    def add_dca_fills(wallet_address: str, dca_accounts: list) -> int:
+        """Stores the fills of DCA accounts."""
+        return Trade_Ledger.add_trades([{
+            'ID': f"dca:{fill['txId']}",
+            'SOURCE': 'dca',
+            'WALLET': wallet_address,
+            'TIMESTAMP': float(fill['confirmedAt']),
+            'INPUT_MINT': fill['inputMint'],
+            'INPUT_AMOUNT': float(fill['inAmount']),
+            'OUTPUT_MINT': fill['outputMint'],
+            'OUTPUT_AMOUNT': float(fill['outAmount']),
+            'TXID': fill['txId'],
+        } for dca_account in dca_accounts for fill in dca_account['fills']])
+    
+    @staticmethod
+    async def sync_limit_fills(wallet_address: str) -> int:
+        """Stores limit order fills newer than the last synchronized one, returns the number of new trades.
+        
+        The last synchronized id only moves once the history was read without gap down to it (or to the end), fills
+        missed while offline or on a failed page are so fetched on next sync."""
+        connection = Trade_Ledger.get_connection()
+        row = connection.execute("SELECT LAST_ID FROM sync_state WHERE SOURCE = 'limit' AND WALLET = ?", (wallet_address,)).fetchone()
+        last_id = row['LAST_ID'] if row is not None else None
+        
+        trades = []
+        newest_id = last_id
+        stream_state = {'offline': False}
+        synchronized = False
+        pages = History_Fetcher.stream(History_Fetcher.TRADES_HISTORY_URL, wallet_address=wallet_address, state=stream_state)
+        try:
+            async for page in pages:
+                for record in page:
+                    if last_id is not None and record['id'] <= last_id:
+                        synchronized = True
+                        break
+                    newest_id = max(newest_id or record['id'], record['id'])
+                    trades.append({
+                        'ID': f"limit:{record['id']}",
+                        'SOURCE': 'limit',
+                        'WALLET': wallet_address,
+                        'TIMESTAMP': datetime.fromisoformat(record['createdAt'].replace('Z', '+00:00')).timestamp(),
+                        'INPUT_MINT': record['order']['inputMint'],
+                        'INPUT_AMOUNT': float(record['inAmount']),
+                        'OUTPUT_MINT': record['order']['outputMint'],
+                        'OUTPUT_AMOUNT': float(record['outAmount']),
+                        'TXID': record['txid'],
+                    })
+                if synchronized:
+                    break
+            # History read to its end
+            else:
+                synchronized = True
+        finally:
+            await pages.aclose()
+            # Fills read before a failure are valid, only the synchronized id waits for a complete read
+            new_trades = Trade_Ledger.add_trades(trades)
+        
+        if synchronized and not stream_state['offline'] and newest_id is not None:
+            connection.execute("INSERT OR REPLACE INTO sync_state (SOURCE, WALLET, LAST_ID) VALUES ('limit', ?, ?)", (wallet_address, newest_id))
+        return new_trades
+    
+    @staticmethod
+    def get_positions(wallet_address: str=None) -> list:
+        """Returns aggregated positions, of every wallet if wallet_address is None."""
+        if wallet_address is None:
+            cursor = Trade_Ledger.get_connection().execute("SELECT * FROM positions ORDER BY WALLET, LAST_TIMESTAMP DESC")
+        else:
+            cursor = Trade_Ledger.get_connection().execute("SELECT * FROM positions WHERE WALLET = ? ORDER BY LAST_TIMESTAMP DESC", (wallet_address,))
+        return [dict(row) for row in cursor]
+    
+    @staticmethod
+    def get_trades(wallet_address: str, mint: str=None, since: float=0) -> list:
+        """Returns trades of a wallet (involving mint if given) since a timestamp, newest first."""
+        if mint is None:
+            cursor = Trade_Ledger.get_connection().execute("SELECT * FROM trades WHERE WALLET = ? AND TIMESTAMP >= ? ORDER BY TIMESTAMP DESC", (wallet_address, since))
+        else:
+            cursor = Trade_Ledger.get_connection().execute(
+                "SELECT * FROM trades WHERE WALLET = ? AND TIMESTAMP >= ? AND (INPUT_MINT = ? OR OUTPUT_MINT = ?) ORDER BY TIMESTAMP DESC",
+                (wallet_address, since, mint, mint)
+            )
+        return [dict(row) for row in cursor]
+
+
+class RPC_Manager():
+    """Shares one keep-alive pooled RPC client per endpoint for the whole process.
+    
+    RPC_POOL_SIZE in config.json sets the max connections per endpoint (default: 10),
+    HTTP/2 is used when the optional h2 package is installed.
+    
+    RPC_URL can be a list of endpoints, a background prober then keeps an EWMA of each endpoint latency & error rate
+    so calls are routed to the fastest healthy one."""
+    
+    MULTIPLE_ACCOUNTS_LIMIT = 100 # Max accounts per getMultipleAccounts call
+    POOL_SIZE = 10
+    RATE_LIMIT = 50 # Max requests per second per endpoint
+    KEEPALIVE_EXPIRY = 60 # Seconds an idle connection is kept open
+    PROBE_INTERVAL = 10 # Seconds between two probes of every endpoint
+    EWMA_ALPHA = 0.3
+    UNHEALTHY_ERROR_RATE = 0.5
+    SEND_METHODS = ('send_raw_transaction',) # Only already signed bytes can be sent to several endpoints without duplicating the transaction
+    
+    clients = {}
+    health = {}
+    prober_task = None
+    
+    @staticmethod
+    def create_client(endpoint: str) -> dict:
+        """Returns a RPC client whose HTTP session counts requests & TLS handshakes."""
+        metrics = {'requests': 0, 'handshakes': 0}
+        network_streams = weakref.WeakSet()
+        
+        async def on_response(response: httpx.Response):
+            metrics['requests'] += 1
+            # A connection keeps the same network stream for its whole life, an unseen one is a new handshake
+            network_stream = response.extensions.get('network_stream')
+            if network_stream is not None and network_stream not in network_streams:
+                network_streams.add(network_stream)
+                metrics['handshakes'] += 1
+        
+        config_data = Config_CLI.get_config_data_no_async()
+        pool_size = int(config_data.get('RPC_POOL_SIZE', RPC_Manager.POOL_SIZE))
+        f.RATE_LIMITS[httpx.URL(endpoint).host] = float(config_data.get('RPC_RATE_LIMIT', RPC_Manager.RATE_LIMIT))
+        client = AsyncClient(endpoint=endpoint)
+        # solana-py keeps its httpx session on the provider, it is replaced by a pooled keep-alive one
+        client._provider.session = httpx.AsyncClient(
+            timeout=10,
+            transport=f.Rate_Limited_Transport(
+                idempotent_posts=True,
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size, keepalive_expiry=RPC_Manager.KEEPALIVE_EXPIRY)
+            ),
+            event_hooks={'response': [on_response]}
+        )
+        return {'client': client, 'metrics': metrics, 'loop': RPC_Manager.get_loop()}
+    
+    @staticmethod
+    def get_loop():
+        try:
+            return asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+    
+    @staticmethod
+    def get_endpoints() -> list:
+        """Returns RPC endpoints set in config.json."""
+        rpc_url = Config_CLI.get_config_data_no_async()['RPC_URL']
+        return [rpc_url] if isinstance(rpc_url, str) else list(rpc_url)
+    
+    @staticmethod
+    def get_client(endpoint=None) -> AsyncClient:
+        """Returns the shared RPC client of the endpoint.
+        
+        endpoint (str | list | None): a list of endpoints (or None for config.json endpoints) returns a client routing calls between them."""
+        if not isinstance(endpoint, str):
+            endpoints = RPC_Manager.get_endpoints() if endpoint is None else list(endpoint)
+            if len(endpoints) > 1:
+                return RPC_Pool_Client(endpoints)
+            endpoint = endpoints[0]
+        
+        rpc_client = RPC_Manager.clients.get(endpoint)
+        # Connections cannot be shared between event loops
+        if rpc_client is None or rpc_client['loop'] is not RPC_Manager.get_loop():
+            rpc_client = RPC_Manager.create_client(endpoint)
+            RPC_Manager.clients[endpoint] = rpc_client
+        return rpc_client['client']
+    
+    @staticmethod
+    def get_metrics() -> dict:
+        """Returns connections metrics per endpoint: {endpoint: {'requests', 'handshakes', 'open_connections', 'reuse_ratio'}}."""
+        endpoints_metrics = {}
+        for endpoint, rpc_client in RPC_Manager.clients.items():
+            metrics = rpc_client['metrics']
+            transport = getattr(rpc_client['client']._provider.session, '_transport', None)
+            pool = getattr(transport, '_pool', None)
+            endpoints_metrics[endpoint] = {
+                'requests': metrics['requests'],
+                'handshakes': metrics['handshakes'],
+                'open_connections': len(pool.connections) if pool is not None else None,
+                'reuse_ratio': 1 - metrics['handshakes'] / metrics['requests'] if metrics['requests'] else 0
+            }
+        return endpoints_metrics
+    
+    @staticmethod
+    def record(endpoint: str, latency: float=None, error: bool=False):
+        """Updates endpoint latency (seconds) & error rate EWMAs."""
+        health = RPC_Manager.health.setdefault(endpoint, {'latency': None, 'error_rate': 0})
+        alpha = RPC_Manager.EWMA_ALPHA
+        health['error_rate'] = alpha * error + (1 - alpha) * health['error_rate']
+        if latency is not None:
+            health['latency'] = latency if health['latency'] is None else alpha * latency + (1 - alpha) * health['latency']
+    
+    @staticmethod
+    def rank_endpoints(endpoints: list) -> list:
+        """Returns endpoints sorted from the fastest healthy one to the slowest unhealthy one."""
+        def rank(endpoint: str):
+            health = RPC_Manager.health.get(endpoint, {'latency': None, 'error_rate': 0})
+            latency = health['latency'] if health['latency'] is not None else float('inf')
+            return (health['error_rate'] >= RPC_Manager.UNHEALTHY_ERROR_RATE, latency)
+        return sorted(endpoints, key=rank)
+    
+    @staticmethod
+    async def call(endpoints: list, method: str, *args, **kwargs):
+        """Calls the RPC method on the best endpoint, fails over to the next ones on connection or HTTP error."""
+        last_error = None
+        for endpoint in RPC_Manager.rank_endpoints(endpoints):
+            start_time = time.perf_counter()
+            try:
+                result = await getattr(RPC_Manager.get_client(endpoint), method)(*args, **kwargs)
+            except (SolanaRpcException, httpx.HTTPError, asyncio.TimeoutError) as error:
+                RPC_Manager.record(endpoint, error=True)
+                last_error = error
+                continue
+            RPC_Manager.record(endpoint, latency=time.perf_counter() - start_time)
+            return result
+        raise last_error
+    
+    @staticmethod
+    async def broadcast(endpoints: list, method: str, *args, **kwargs):
+        """Calls the RPC method on every healthy endpoint at once, returns the result of the best endpoint that succeeded."""
+        ranked_endpoints = RPC_Manager.rank_endpoints(endpoints)
+        healthy_endpoints = [endpoint for endpoint in ranked_endpoints if RPC_Manager.health.get(endpoint, {'error_rate': 0})['error_rate'] < RPC_Manager.UNHEALTHY_ERROR_RATE]
+        results = await asyncio.gather(*[
+            RPC_Manager.call([endpoint], method, *args, **kwargs)
+            for endpoint in healthy_endpoints or ranked_endpoints
+        ], return_exceptions=True)
+        for result in results:
+            if not isinstance(result, BaseException):
+                return result
+        raise results[0]
+    
+    @staticmethod
+    async def probe(endpoints: list=None):
+        """Measures latency of every endpoint with a getSlot call."""
+        async def probe_endpoint(endpoint: str):
+            start_time = time.perf_counter()
+            try:
+                await RPC_Manager.get_client(endpoint).get_slot()
+                RPC_Manager.record(endpoint, latency=time.perf_counter() - start_time)
+            except Exception:
+                RPC_Manager.record(endpoint, error=True)
+        
+        await asyncio.gather(*[probe_endpoint(endpoint) for endpoint in endpoints or RPC_Manager.get_endpoints()])
+    
+    @staticmethod
+    async def run_prober():
+        while True:
+            await RPC_Manager.probe()
+            await asyncio.sleep(RPC_Manager.PROBE_INTERVAL)
+    
+    @staticmethod
+    def start_prober():
+        """Starts probing endpoints in the background of the current event loop if several endpoints are set."""
+        if len(RPC_Manager.get_endpoints()) < 2:
+            return
+        if RPC_Manager.prober_task is not None and not RPC_Manager.prober_task.done() and RPC_Manager.prober_task.get_loop() is RPC_Manager.get_loop():
+            return
+        RPC_Manager.prober_task = asyncio.create_task(RPC_Manager.run_prober())
+    
+    @staticmethod
+    async def close():
+        """Closes all the RPC clients of the current event loop."""
+        if RPC_Manager.prober_task is not None:
+            RPC_Manager.prober_task.cancel()
+            RPC_Manager.prober_task = None
+        loop = RPC_Manager.get_loop()
+        for endpoint, rpc_client in list(RPC_Manager.clients.items()):
+            if rpc_client['loop'] is loop:
+                await rpc_client['client'].close()
+            del RPC_Manager.clients[endpoint]
+    
+
+class RPC_Pool_Client():
+    """AsyncClient stand-in routing every RPC call to the fastest healthy endpoint of the pool.
+    
+    Failed calls fail over to the next endpoint, sends go to every healthy endpoint if RPC_BROADCAST is enabled."""
+    
+    def __init__(self, endpoints: list):
+        self.endpoints = endpoints
+    
+    def __getattr__(self, name: str):
+        attribute = getattr(RPC_Manager.get_client(RPC_Manager.rank_endpoints(self.endpoints)[0]), name)
+        if not inspect.iscoroutinefunction(attribute):
+            return attribute
+        
+        async def call(*args, **kwargs):
+            if name in RPC_Manager.SEND_METHODS and Config_CLI.get_config_data_no_async().get('RPC_BROADCAST', False):
+                return await RPC_Manager.broadcast(self.endpoints, name, *args, **kwargs)
+            return await RPC_Manager.call(self.endpoints, name, *args, **kwargs)
+        return call
+    
+
 class Wallet():
     
-    def __init__(self, rpc_url: str, private_key: str, async_client: bool=True):
+    BROADCAST_INTERVAL = 1 # Seconds between two broadcasts of the same transaction
+    
+    def __init__(self, rpc_url: str, private_key: str, client: AsyncClient=None):
         self.wallet = Keypair.from_bytes(base58.b58decode(private_key))
-        if async_client:
-            self.client = AsyncClient(endpoint=rpc_url)
-        else:
-            self.client = Client(endpoint=rpc_url)
+        self.client = client if client is not None else RPC_Manager.get_client(rpc_url)
 
 
     async def get_token_balance(self, token_mint_account: str) -> dict:
@@ -290,43 +853,12 @@ class Wallet():
         
         return token_balance
     
-    def get_token_balance_no_async(self, token_mint_account: str) -> dict:
-        
-        if token_mint_account == self.wallet.pubkey().__str__():
-            get_token_balance = self.client.get_balance(pubkey=self.wallet.pubkey())
-            token_balance = {
-                'decimals': 9,
-                'balance': {
-                    'int': get_token_balance.value,
-                    'float': float(get_token_balance.value / 10 ** 9)
-                }
-            }
-        else:
-            get_token_balance = self.client.get_token_account_balance(pubkey=token_mint_account)
-            try:
-                token_balance = {
-                    'decimals': int(get_token_balance.value.decimals),
-                    'balance': {
-                        'int': get_token_balance.value.amount,
-                        'float': float(get_token_balance.value.amount) / 10 ** int(get_token_balance.value.decimals)
-                    }
-                }
-            except AttributeError:
-                token_balance = {'balance': {'int': 0, 'float':0}}
-        
-        return token_balance
-    
-    
     async def get_token_mint_account(self, token_mint: str) -> Pubkey:
         token_mint_account = get_associated_token_address(owner=self.wallet.pubkey(), mint=Pubkey.from_string(token_mint))
         return token_mint_account
     
-    def get_token_mint_account_no_async(self, token_mint: str) -> Pubkey:
-        token_mint_account = get_associated_token_address(owner=self.wallet.pubkey(), mint=Pubkey.from_string(token_mint))
-        return token_mint_account
-    
-    
-    async def sign_send_transaction(self, transaction_data: str, signatures_list: list=None, print_link: bool=True):
+    def sign_transaction(self, transaction_data: str, signatures_list: list=None) -> VersionedTransaction:
+        """Returns the transaction signed by the wallet (and the additional signatures)."""
         signatures = []
 
         raw_transaction = VersionedTransaction.from_bytes(base64.b64decode(transaction_data))
@@ -335,50 +867,74 @@ class Wallet():
         if signatures_list:
             for signature in signatures_list:
                 signatures.append(signature)
-        signed_txn = VersionedTransaction.populate(raw_transaction.message, signatures)
-        opts = TxOpts(skip_preflight=True, preflight_commitment=Processed)
-        
-        # print(signatures, transaction_data)
-        # input()
+        return VersionedTransaction.populate(raw_transaction.message, signatures)
+    
+    async def sign_broadcast_transaction(self, transaction_data: str, signatures_list: list=None, last_valid_block_height: int=None) -> dict:
+        """Signs the transaction then sends the same bytes to every RPC endpoint at once, every BROADCAST_INTERVAL seconds,
+        until the confirmation tracker resolves it (confirmed, failed, or blockhash expired).
+        
+        Returns: {'transaction_hash', 'status': 'confirmed' | 'failed' | 'expired', 'confirmation',
+        'endpoints': {endpoint: {'sends', 'errors', 'first_ack'}}} with times in seconds since signing started."""
+        start_time = time.perf_counter()
+        signed_txn = self.sign_transaction(transaction_data=transaction_data, signatures_list=signatures_list)
+        signature = signed_txn.signatures[0]
+        opts = TxOpts(skip_preflight=True, preflight_commitment=Processed, max_retries=0)
+        
+        endpoints = RPC_Manager.get_endpoints()
+        report = {
+            'transaction_hash': str(signature),
+            'status': None,
+            'confirmation': None,
+            'endpoints': {endpoint: {'sends': 0, 'errors': 0, 'first_ack': None} for endpoint in endpoints}
+        }
         
-        result = await self.client.send_raw_transaction(txn=bytes(signed_txn), opts=opts)
-        transaction_hash = json.loads(result.to_json())['result']
-        if print_link is True:
-            print(f"{c.GREEN}Transaction sent: https://explorer.solana.com/tx/{transaction_hash}{c.RESET}")
-            await inquirer.text(message="\nPress ENTER to continue").execute_async()
-        # await self.get_status_transaction(transaction_hash=transaction_hash) # TBD
-        return
+        async def send(endpoint: str):
+            endpoint_report = report['endpoints'][endpoint]
+            endpoint_report['sends'] += 1
+            try:
+                await RPC_Manager.get_client(endpoint).send_raw_transaction(txn=bytes(signed_txn), opts=opts)
+                if endpoint_report['first_ack'] is None:
+                    endpoint_report['first_ack'] = time.perf_counter() - start_time
+            except Exception:
+                endpoint_report['errors'] += 1
+        
+        transaction_outcome = Confirmation_Tracker.get_tracker().track(
+            signature=signature,
+            blockhash=signed_txn.message.recent_blockhash,
+            last_valid_block_height=last_valid_block_height
+        )
+        # Own deadline: the blockhash is expired by then, the broadcast never depends on the tracker to end
+        deadline = time.time() + Confirmation_Tracker.MAX_PENDING_TIME
+        while not transaction_outcome.done() and time.time() < deadline:
+            await asyncio.gather(*[send(endpoint) for endpoint in endpoints])
+            await asyncio.wait([transaction_outcome], timeout=Wallet.BROADCAST_INTERVAL)
+        
+        report['status'] = transaction_outcome.result()['status'] if transaction_outcome.done() else "expired"
+        report['confirmation'] = time.perf_counter() - start_time
+        return report
     
-    def sign_send_transaction_no_async(self, transaction_data: str, signatures_list: list=None, print_link: bool=True):
-        signatures = []
-
-        raw_transaction = VersionedTransaction.from_bytes(base64.b64decode(transaction_data))
-        signature = self.wallet.sign_message(message.to_bytes_versioned(raw_transaction.message))
-        signatures.append(signature)
-        if signatures_list:
-            for signature in signatures_list:
-                signatures.append(signature)
-        signed_txn = VersionedTransaction.populate(raw_transaction.message, signatures)
+    async def sign_send_transaction(self, transaction_data: str, signatures_list: list=None, print_link: bool=True):
+        signed_txn = self.sign_transaction(transaction_data=transaction_data, signatures_list=signatures_list)
         opts = TxOpts(skip_preflight=True, preflight_commitment=Processed)
         
         # print(signatures, transaction_data)
         # input()
         
-        result = self.client.send_raw_transaction(txn=bytes(signed_txn), opts=opts)
+        result = await self.client.send_raw_transaction(txn=bytes(signed_txn), opts=opts)
         transaction_hash = json.loads(result.to_json())['result']
         if print_link is True:
             print(f"{c.GREEN}Transaction sent: https://explorer.solana.com/tx/{transaction_hash}{c.RESET}")
-        # await self.get_status_transaction(transaction_hash=transaction_hash) # TBD
+            await self.get_status_transaction(transaction_hash=transaction_hash, blockhash=signed_txn.message.recent_blockhash)
         return
-        
-
-    async def get_status_transaction(self, transaction_hash: str):
+    
+    async def get_status_transaction(self, transaction_hash: str, blockhash: Hash=None):
         print("Checking transaction status...")
-        get_transaction_details = await self.client.confirm_transaction(tx_sig=Signature.from_string(transaction_hash), sleep_seconds=1)
-        transaction_status = get_transaction_details.value[0].err
+        transaction_status = await Confirmation_Tracker.get_tracker().track(signature=Signature.from_string(transaction_hash), blockhash=blockhash)
         
-        if transaction_status is None:
+        if transaction_status['status'] == "confirmed":
             print("Transaction SUCCESS!")
+        elif transaction_status['status'] == "expired":
+            print(f"{c.RED}! Transaction EXPIRED!{c.RESET}")
         else:
             print(f"{c.RED}! Transaction FAILED!{c.RESET}")
             
@@ -386,137 +942,1543 @@ class Wallet():
         return
             
 
+class Confirmation_Tracker():
+    """Confirms every pending transaction of the event loop with one batched getSignatureStatuses call per tick.
+    
+    A transaction expires once the block height passes the last valid block height of its blockhash. When it is not
+    known, the last valid block height of the latest blockhash when tracking started is used: the transaction blockhash
+    is older, so it never expires earlier than this bound.
+    
+    track() returns a future resolved with {'status': 'confirmed' | 'failed' | 'expired', 'err', 'slot'}."""
+    
+    SIGNATURE_STATUSES_LIMIT = 256 # Max signatures per getSignatureStatuses call
+    TICK_INTERVAL = 1 # Seconds between two status checks
+    MAX_PENDING_TIME = 90 # Seconds before any transaction is considered expired, even if the block height is unknown
+    
+    trackers = {}
+    
+    def __init__(self, client: AsyncClient):
+        self.client = client
+        self.pending = {}
+        self.task = None
+    
+    @staticmethod
+    def get_tracker() -> 'Confirmation_Tracker':
+        """Returns the tracker of the current event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in Confirmation_Tracker.trackers:
+            Confirmation_Tracker.trackers = {loop: Confirmation_Tracker(client=RPC_Manager.get_client())}
+        return Confirmation_Tracker.trackers[loop]
+    
+    def track(self, signature: Signature, blockhash: Hash=None, last_valid_block_height: int=None) -> asyncio.Future:
+        """Returns the future of the transaction outcome, its blockhash (or its last valid block height) is used to
+        detect its expiration."""
+        if signature not in self.pending:
+            self.pending[signature] = {
+                'future': asyncio.get_running_loop().create_future(),
+                'blockhash': blockhash,
+                'last_valid_block_height': last_valid_block_height,
+                'expires_at': time.time() + Confirmation_Tracker.MAX_PENDING_TIME
+            }
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        return self.pending[signature]['future']
+    
+    def resolve(self, signature: Signature, status: str, err=None, slot: int=None):
+        pending_transaction = self.pending.pop(signature)
+        if not pending_transaction['future'].done():
+            pending_transaction['future'].set_result({'status': status, 'err': err, 'slot': slot})
+    
+    async def run(self):
+        try:
+            while self.pending:
+                await asyncio.sleep(Confirmation_Tracker.TICK_INTERVAL)
+                try:
+                    await self.check()
+                # Any failed check (RPC error answer included) is retried next tick, the tracker must outlive it
+                except Exception:
+                    logger.warning("Transactions confirmation check failed", exc_info=True)
+        finally:
+            # Tracker stopped (event loop closing): nobody waits forever on a transaction outcome
+            for signature in list(self.pending):
+                self.resolve(signature, "expired")
+    
+    async def check(self):
+        """Resolves confirmed or failed transactions, then expired ones."""
+        signatures = list(self.pending)
+        chunk_size = Confirmation_Tracker.SIGNATURE_STATUSES_LIMIT
+        chunks = [signatures[i:i + chunk_size] for i in range(0, len(signatures), chunk_size)]
+        get_chunks_statuses = await asyncio.gather(*[self.client.get_signature_statuses(chunk) for chunk in chunks])
+        
+        for chunk, get_chunk_statuses in zip(chunks, get_chunks_statuses):
+            for signature, transaction_status in zip(chunk, get_chunk_statuses.value):
+                if transaction_status is None:
+                    continue
+                if transaction_status.err is not None:
+                    self.resolve(signature, "failed", err=transaction_status.err, slot=transaction_status.slot)
+                elif transaction_status.confirmation_status in (TransactionConfirmationStatus.Confirmed, TransactionConfirmationStatus.Finalized):
+                    self.resolve(signature, "confirmed", slot=transaction_status.slot)
+        
+        for signature, pending_transaction in list(self.pending.items()):
+            if time.time() > pending_transaction['expires_at']:
+                self.resolve(signature, "expired")
+        
+        unbounded_transactions = [pending_transaction for pending_transaction in self.pending.values() if pending_transaction['blockhash'] is not None and pending_transaction['last_valid_block_height'] is None]
+        if unbounded_transactions:
+            get_latest_blockhash = await self.client.get_latest_blockhash()
+            for pending_transaction in unbounded_transactions:
+                pending_transaction['last_valid_block_height'] = get_latest_blockhash.value.last_valid_block_height
+        
+        if not any(pending_transaction['last_valid_block_height'] is not None for pending_transaction in self.pending.values()):
+            return
+        block_height = (await self.client.get_block_height()).value
+        for signature, pending_transaction in list(self.pending.items()):
+            if pending_transaction['last_valid_block_height'] is not None and block_height > pending_transaction['last_valid_block_height']:
+                self.resolve(signature, "expired")
+    
+
+class Account_Subscriber():
+    """Pushes token accounts balances from one websocket accountSubscribe connection per event loop.
+    
+    The connection is reopened and the accounts resubscribed if it drops."""
+    
+    RECONNECT_DELAY = 5 # Seconds before reconnecting a dropped websocket
+    
+    subscribers = {}
+    
+    def __init__(self, ws_url: str):
+        self.ws_url = ws_url
+        self.websocket = None
+        self.task = None
+        self.request_id = 0
+        self.requests = {}
+        self.subscriptions = {}
+        self.balances = {}
+        self.events = {}
+        self.references = {}
+    
+    @staticmethod
+    def get_ws_url() -> str:
+        """Returns the websocket URL of the best RPC endpoint."""
+        endpoint = RPC_Manager.rank_endpoints(RPC_Manager.get_endpoints())[0]
+        return re.sub(r'^http', 'ws', endpoint)
+    
+    @staticmethod
+    def get_subscriber() -> 'Account_Subscriber':
+        """Returns the subscriber of the current event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in Account_Subscriber.subscribers:
+            Account_Subscriber.subscribers = {loop: Account_Subscriber(ws_url=Account_Subscriber.get_ws_url())}
+        return Account_Subscriber.subscribers[loop]
+    
+    @staticmethod
+    def parse_balance(account_value: dict) -> dict:
+        """Returns token balance, in Wallet.get_token_balance format, from a jsonParsed account."""
+        try:
+            token_amount = account_value['data']['parsed']['info']['tokenAmount']
+            return {
+                'decimals': int(token_amount['decimals']),
+                'balance': {
+                    'int': int(token_amount['amount']),
+                    'float': int(token_amount['amount']) / 10 ** int(token_amount['decimals'])
+                }
+            }
+        # Closed or not yet created account
+        except (KeyError, TypeError):
+            return {'decimals': 0, 'balance': {'int': 0, 'float': 0}}
+    
+    async def send_subscribe(self, token_account: str):
+        self.request_id += 1
+        self.requests[self.request_id] = token_account
+        await self.websocket.send(json.dumps({
+            'jsonrpc': "2.0",
+            'id': self.request_id,
+            'method': "accountSubscribe",
+            'params': [token_account, {'encoding': "jsonParsed", 'commitment': "confirmed"}]
+        }))
+    
+    async def send_unsubscribe(self, subscription_id: int):
+        self.request_id += 1
+        try:
+            await self.websocket.send(json.dumps({
+                'jsonrpc': "2.0",
+                'id': self.request_id,
+                'method': "accountUnsubscribe",
+                'params': [subscription_id]
+            }))
+        except (AttributeError, websockets.exceptions.WebSocketException):
+            pass
+    
+    async def subscribe(self, token_account: Pubkey, balance: dict=None):
+        """Starts pushing the token account balance, balance is the known balance until the first notification."""
+        token_account = str(token_account)
+        self.references[token_account] = self.references.get(token_account, 0) + 1
+        if token_account in self.balances:
+            return
+        self.balances[token_account] = balance
+        self.events[token_account] = asyncio.Event()
+        
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+        elif self.websocket is not None:
+            try:
+                await self.send_subscribe(token_account)
+            except websockets.exceptions.WebSocketException:
+                pass
+    
+    async def unsubscribe(self, token_account: Pubkey):
+        """Stops pushing the token account balance once all its subscribers unsubscribed, the websocket is closed
+        when no account is left."""
+        token_account = str(token_account)
+        if token_account not in self.references:
+            return
+        self.references[token_account] -= 1
+        if self.references[token_account] > 0:
+            return
+        del self.references[token_account]
+        del self.balances[token_account]
+        self.events.pop(token_account).set()
+        
+        for subscription_id, subscribed_account in list(self.subscriptions.items()):
+            if subscribed_account == token_account:
+                del self.subscriptions[subscription_id]
+                await self.send_unsubscribe(subscription_id)
+        if not self.balances and self.task is not None:
+            self.task.cancel()
+            self.task = None
+    
+    def get_balance(self, token_account: Pubkey) -> dict:
+        """Returns the last token account balance pushed, None if still unknown."""
+        return self.balances.get(str(token_account))
+    
+    async def wait_for_change(self, token_account: Pubkey, timeout: float) -> dict:
+        """Waits until the token account balance changes or timeout seconds are elapsed, returns the balance."""
+        token_account = str(token_account)
+        try:
+            await asyncio.wait_for(self.events[token_account].wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.balances.get(token_account)
+    
+    def on_message(self, message: dict):
+        if 'id' in message and message['id'] in self.requests:
+            token_account = self.requests.pop(message['id'])
+            if 'result' not in message:
+                return
+            # Unsubscribed while the subscription was pending
+            if token_account not in self.balances:
+                asyncio.create_task(self.send_unsubscribe(message['result']))
+                return
+            self.subscriptions[message['result']] = token_account
+        
+        elif message.get('method') == "accountNotification":
+            token_account = self.subscriptions.get(message['params']['subscription'])
+            if token_account is None or token_account not in self.balances:
+                return
+            self.balances[token_account] = Account_Subscriber.parse_balance(message['params']['result']['value'])
+            # Wakes up current waiters, next ones wait for the next change
+            self.events[token_account].set()
+            self.events[token_account] = asyncio.Event()
+    
+    async def run(self):
+        while True:
+            try:
+                async with websockets.connect(self.ws_url) as websocket:
+                    self.websocket = websocket
+                    self.requests.clear()
+                    self.subscriptions.clear()
+                    for token_account in list(self.balances):
+                        await self.send_subscribe(token_account)
+                    
+                    async for raw_message in websocket:
+                        self.on_message(json.loads(raw_message))
+            except (OSError, websockets.exceptions.WebSocketException, ValueError):
+                pass
+            finally:
+                self.websocket = None
+            await asyncio.sleep(Account_Subscriber.RECONNECT_DELAY)
+    
+
+class Launch_Scheduler():
+    """Wakes snipers up when their token can be bought.
+    
+    Launch-dated snipers wait in a heap ordered by launch timestamp, one timer wakes only the due ones which then probe
+    quotes at a bounded rate until past the launch grace window, then with jittered backoff. Snipers without launch
+    date are checked together by one low-frequency route discovery probe."""
+    
+    WAKE_UP_ADVANCE = 3 # Seconds before launch a sniper starts probing quotes
+    PROBE_MIN_INTERVAL = 0.2 # Seconds between two quotes of a launching token
+    PROBE_MAX_INTERVAL = 2
+    LAUNCH_GRACE = 30 # Seconds after launch quotes are probed at PROBE_MIN_INTERVAL (unless throttled or failing)
+    DISCOVERY_INTERVAL = 5 # Seconds between two route discovery rounds
+    
+    schedulers = {}
+    
+    def __init__(self):
+        self.launches = []
+        self.launches_counter = 0
+        self.launches_changed = asyncio.Event()
+        self.timer_task = None
+        self.undated_snipers = {}
+        self.discovery_task = None
+    
+    @staticmethod
+    def get_scheduler() -> 'Launch_Scheduler':
+        """Returns the scheduler of the current event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in Launch_Scheduler.schedulers:
+            Launch_Scheduler.schedulers = {loop: Launch_Scheduler()}
+        return Launch_Scheduler.schedulers[loop]
+    
+    async def wait_for_route(self, sniper: 'Token_Sniper') -> dict:
+        """Returns the first quote with a route to buy the sniper token."""
+        if sniper.token_data['TIMESTAMP'] is None:
+            route_found = asyncio.get_running_loop().create_future()
+            self.undated_snipers[sniper] = route_found
+            if self.discovery_task is None or self.discovery_task.done():
+                self.discovery_task = asyncio.create_task(self.run_discovery())
+            try:
+                return await route_found
+            finally:
+                self.undated_snipers.pop(sniper, None)
+        
+        await self.wait_for_launch(sniper.token_data['TIMESTAMP'])
+        backoff_at = sniper.token_data['TIMESTAMP'] + Launch_Scheduler.LAUNCH_GRACE
+        probe_interval = Launch_Scheduler.PROBE_MIN_INTERVAL
+        while True:
+            errors = sniper.health['errors']
+            quote_response = await sniper.get_buy_quote()
+            if quote_response is not None:
+                return quote_response
+            # Tight probing around launch, backoff only once the launch is late or quotes are throttled/failing
+            if sniper.health['errors'] > errors or time.time() > backoff_at:
+                probe_interval = min(probe_interval * 2, Launch_Scheduler.PROBE_MAX_INTERVAL)
+            else:
+                probe_interval = Launch_Scheduler.PROBE_MIN_INTERVAL
+            await asyncio.sleep(random.uniform(probe_interval / 2, probe_interval))
+    
+    async def wait_for_launch(self, timestamp: int, advance: float=WAKE_UP_ADVANCE):
+        """Waits until advance seconds before the launch timestamp."""
+        wake_up_at = timestamp - advance
+        if wake_up_at <= time.time():
+            return
+        launch = asyncio.get_running_loop().create_future()
+        self.launches_counter += 1
+        heapq.heappush(self.launches, (wake_up_at, self.launches_counter, launch))
+        self.launches_changed.set()
+        if self.timer_task is None or self.timer_task.done():
+            self.timer_task = asyncio.create_task(self.run_timer())
+        await launch
+    
+    async def run_timer(self):
+        while self.launches:
+            wake_up_at, _, launch = self.launches[0]
+            delay = wake_up_at - time.time()
+            if delay > 0:
+                # Sleeps until the next launch, or until an earlier one is scheduled
+                self.launches_changed.clear()
+                try:
+                    await asyncio.wait_for(self.launches_changed.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            heapq.heappop(self.launches)
+            if not launch.done():
+                launch.set_result(None)
+    
+    async def run_discovery(self):
+        async def discover_route(sniper: 'Token_Sniper', route_found: asyncio.Future):
+            quote_response = await sniper.get_buy_quote()
+            if quote_response is not None and not route_found.done():
+                route_found.set_result(quote_response)
+        
+        while self.undated_snipers:
+            await asyncio.gather(*[discover_route(sniper, route_found) for sniper, route_found in list(self.undated_snipers.items())])
+            await asyncio.sleep(Launch_Scheduler.DISCOVERY_INTERVAL)
+    
+
+class Quote_Service():
+    """Jupiter quotes shared by every caller of the process.
+    
+    Quotes are keyed by (inputMint, outputMint, amount bucket, slippageBps): concurrent identical requests share one
+    request, answers are cached for TTL seconds and requests are throttled by the quote-api.jup.ag token bucket."""
+    
+    QUOTE_URL = "https://quote-api.jup.ag/v6/quote"
+    TTL = 1 # Seconds a quote is served from cache
+    AMOUNT_SIGNIFICANT_DIGITS = 3 # Precision of the amount bucket of inexact quotes
+    MAX_CACHE_SIZE = 1024
+    
+    cache = {}
+    inflight = {}
+    http_clients = {}
+    
+    @staticmethod
+    def get_amount_bucket(amount: int, exact: bool) -> int:
+        """Returns the amount rounded down to AMOUNT_SIGNIFICANT_DIGITS digits if the quote does not need to be exact."""
+        amount = int(amount)
+        if exact or amount == 0:
+            return amount
+        magnitude = 10 ** max(len(str(amount)) - Quote_Service.AMOUNT_SIGNIFICANT_DIGITS, 0)
+        return amount // magnitude * magnitude
+    
+    @staticmethod
+    def get_http_client() -> httpx.AsyncClient:
+        """Returns the HTTP client of the current event loop."""
+        loop = asyncio.get_running_loop()
+        if loop not in Quote_Service.http_clients:
+            Quote_Service.http_clients = {loop: f.get_async_http_client()}
+        return Quote_Service.http_clients[loop]
+    
+    @staticmethod
+    async def fetch_quote(key: tuple, http_client: httpx.AsyncClient) -> dict:
+        input_mint, output_mint, amount, slippage_bps = key
+        quote_params = {
+            'inputMint': input_mint,
+            'outputMint': output_mint,
+            'amount': amount,
+            'slippageBps': slippage_bps,
+        }
+        response = await http_client.get(url=Quote_Service.QUOTE_URL, params=quote_params)
+        # Throttled or unavailable (retries exhausted): an error for the caller, never cached (no route answers are)
+        if response.status_code in f.RETRY_STATUS_CODES:
+            response.raise_for_status()
+        quote_response = response.json()
+        
+        if len(Quote_Service.cache) >= Quote_Service.MAX_CACHE_SIZE:
+            now = time.time()
+            Quote_Service.cache = {cache_key: cached for cache_key, cached in Quote_Service.cache.items() if now - cached[0] < Quote_Service.TTL}
+        Quote_Service.cache[key] = (time.time(), quote_response)
+        return quote_response
+    
+    @staticmethod
+    async def get_quote(input_mint: str, output_mint: str, amount: int, slippage_bps: int, exact: bool=True, http_client: httpx.AsyncClient=None) -> dict:
+        """Returns Jupiter quote response.
+        
+        exact (bool): False allows a quote of a slightly lower amount (same bucket), only use it for displayed values."""
+        key = (input_mint, output_mint, Quote_Service.get_amount_bucket(amount, exact), int(slippage_bps))
+        cached = Quote_Service.cache.get(key)
+        if cached is not None and time.time() - cached[0] < Quote_Service.TTL:
+            return cached[1]
+        
+        loop = asyncio.get_running_loop()
+        inflight_task = Quote_Service.inflight.get(key)
+        if inflight_task is None or inflight_task.get_loop() is not loop:
+            inflight_task = loop.create_task(Quote_Service.fetch_quote(key, http_client or Quote_Service.get_http_client()))
+            Quote_Service.inflight[key] = inflight_task
+            inflight_task.add_done_callback(lambda task: Quote_Service.inflight.pop(key) if Quote_Service.inflight.get(key) is task else None)
+        return await asyncio.shield(inflight_task)
+    
+
 snipers_processes = []
 class Token_Sniper():
     
-    def __init__(self, token_id, token_data):
-        self.token_id = token_id
-        self.token_data = token_data
-        self.success = False
+    STANDBY_ADVANCE = 300 # Seconds before launch the sniper gets on hot standby
+    STANDBY_REFRESH_INTERVAL = 10
+    
+    def __init__(self, token_id, token_data, wallet: Wallet, http_client: httpx.AsyncClient, semaphore: asyncio.Semaphore):
+        self.token_id = token_id
+        self.token_data = token_data
+        self.wallet = wallet
+        self.http_client = http_client
+        self.semaphore = semaphore
+        self.success = False
+        self.last_broadcast = None
+        self.standby = None
+        self.swap_lock = asyncio.Lock()
+        self.health = {
+            'state': "STARTING",
+            'heartbeat': time.time(),
+            'quote_latency': None,
+            'loops': 0,
+            'loop_rate': 0,
+            'errors': 0,
+            'restarts': 0,
+        }
+    
+    def beat(self, state: str=None):
+        """Records a sniper loop, the supervisor reports it as heartbeat & loop rate."""
+        self.health['heartbeat'] = time.time()
+        self.health['loops'] += 1
+        if state is not None:
+            self.health['state'] = state
+    
+    async def get_quote(self, input_mint: str, output_mint: str, amount: int) -> dict:
+        """Returns Jupiter quote, the semaphore caps the number of requests in flight for the whole engine."""
+        async with self.semaphore:
+            start_time = time.perf_counter()
+            quote_response = await Quote_Service.get_quote(
+                input_mint=input_mint,
+                output_mint=output_mint,
+                amount=amount,
+                slippage_bps=int(self.token_data['SLIPPAGE_BPS']),
+                http_client=self.http_client
+            )
+            self.health['quote_latency'] = time.perf_counter() - start_time
+            return quote_response
+    
+    async def run_standby(self):
+        """Keeps the SOL amount to buy ready, so the launch quote does not wait for the SOL price.
+        
+        Refreshing it every STANDBY_REFRESH_INTERVAL seconds also keeps the price connection warm."""
+        await Launch_Scheduler.get_scheduler().wait_for_launch(self.token_data['TIMESTAMP'], advance=Token_Sniper.STANDBY_ADVANCE)
+        while True:
+            try:
+                sol_price = await f.get_crypto_price_async('SOL')
+                self.standby = {
+                    'amount': int((self.token_data['BUY_AMOUNT']*10**9) / sol_price),
+                    'refreshed_at': time.time(),
+                }
+            except (httpx.HTTPError, ValueError, KeyError):
+                self.health['errors'] += 1
+            await asyncio.sleep(Token_Sniper.STANDBY_REFRESH_INTERVAL)
+    
+    async def get_buy_quote(self) -> dict:
+        """Returns quote to buy the token for BUY_AMOUNT $ of SOL, None if there is no route yet."""
+        self.beat()
+        try:
+            if self.standby is not None and time.time() - self.standby['refreshed_at'] < f.PRICE_MAX_AGE:
+                amount = self.standby['amount']
+            else:
+                sol_price = await f.get_crypto_price_async('SOL')
+                amount = int((self.token_data['BUY_AMOUNT']*10**9) / sol_price)
+            quote_response = await self.get_quote(
+                input_mint="So11111111111111111111111111111111111111112",
+                output_mint=self.token_data['ADDRESS'],
+                amount=amount
+            )
+        except (httpx.HTTPError, ValueError, KeyError):
+            self.health['errors'] += 1
+            return None
+        
+        if 'error' in quote_response:
+            return None
+        return quote_response
+    
+    async def swap(self, quote_response: dict) -> dict:
+        """Builds the swap transaction from a quote then signs and broadcasts it until it lands or expires.
+        
+        Returns: broadcast report, see Wallet.sign_broadcast_transaction, with 'critical_path' seconds from quote to first RPC ack"""
+        swap_data = {
+            "quoteResponse": quote_response,
+            "userPublicKey": self.wallet.wallet.pubkey().__str__(),
+            "wrapUnwrapSOL": True
+        }
+        # Held until the swap lands or expires, the supervisor never stops a sniper in the middle of a swap
+        async with self.swap_lock:
+            start_time = time.perf_counter()
+            async with self.semaphore:
+                get_swap_data = (await self.http_client.post(url="https://quote-api.jup.ag/v6/swap", json=swap_data)).json()
+            swap_build_time = time.perf_counter() - start_time
+            
+            self.last_broadcast = await self.wallet.sign_broadcast_transaction(
+                transaction_data=get_swap_data['swapTransaction'],
+                last_valid_block_height=get_swap_data.get('lastValidBlockHeight')
+            )
+        first_acks = [endpoint_report['first_ack'] for endpoint_report in self.last_broadcast['endpoints'].values() if endpoint_report['first_ack'] is not None]
+        self.last_broadcast['critical_path'] = swap_build_time + min(first_acks) if first_acks else None
+        return self.last_broadcast
+    
+    async def snipe_token(self):
+        
+        token_account = await self.wallet.get_token_mint_account(self.token_data['ADDRESS'])
+        token_balance = await self.wallet.get_token_balance(token_mint_account=token_account)
+        account_subscriber = Account_Subscriber.get_subscriber()
+        await account_subscriber.subscribe(token_account=token_account, balance=token_balance)
+        
+        try:
+            while True:
+                if self.token_data['STATUS'] in ["NOT IN", "ERROR WHEN SWAPPING"]:
+                    self.beat(state="WAITING ROUTE")
+                    standby_task = asyncio.create_task(self.run_standby()) if self.token_data['TIMESTAMP'] is not None else None
+                    try:
+                        quote_response = await Launch_Scheduler.get_scheduler().wait_for_route(sniper=self)
+                    finally:
+                        if standby_task is not None:
+                            standby_task.cancel()
+                    
+                    self.beat(state="BUYING")
+                    attempt = 0
+                    while True:
+                        try:
+                            # A failed or expired swap quote is outdated: retries are quoted again
+                            if attempt > 0:
+                                quote_response = await self.get_buy_quote()
+                                if quote_response is None:
+                                    raise RuntimeError("No buy quote")
+                            broadcast_report = await self.swap(quote_response=quote_response)
+                            if broadcast_report['status'] != "confirmed":
+                                raise RuntimeError(f"Swap transaction {broadcast_report['status']}")
+                            self.success = True
+                            break
+                        except (httpx.HTTPError, SolanaRpcException, RuntimeError, KeyError, ValueError):
+                            self.health['errors'] += 1
+                            if attempt == f.MAX_RETRIES:
+                                self.success = False
+                                break
+                            await asyncio.sleep(f.get_backoff_delay(attempt))
+                            attempt += 1
+                            
+                    if self.success is True:
+                        self.token_data['STATUS'] = "IN"
+                        Trade_Ledger.add_swap('sniper', self.wallet.wallet.pubkey().__str__(), quote_response, broadcast_report['transaction_hash'])
+                        alert_message = f"{self.token_data['NAME']} ({self.token_data['ADDRESS']}): IN"
+                        if broadcast_report['critical_path'] is not None:
+                            alert_message += f" (quote to send: {round(broadcast_report['critical_path'] * 1000)} ms)"
+                        f.send_alert(alert_message)
+                    else:
+                        self.token_data['STATUS'] = "ERROR WHEN SWAPPING"
+                        alert_message = f"{self.token_data['NAME']} ({self.token_data['ADDRESS']}): BUY FAILED"
+                        f.send_alert(alert_message)
+                    Tokens_Store.update_token(self.token_id, {'STATUS': self.token_data['STATUS']})
+                
+                elif self.token_data['STATUS'] not in ["NOT IN", "ERROR WHEN SWAPPING"] and not self.token_data['STATUS'].startswith('> '):
+                    self.beat(state="WATCHING TP/SL")
+                    await asyncio.sleep(1)
+                    try:
+                        sol_price_data = await f.get_crypto_price_data_async('SOL')
+                        # Never take profit or stop loss on an outdated price
+                        if sol_price_data['stale']:
+                            continue
+                        sol_price = sol_price_data['price']
+                        
+                        token_balance = account_subscriber.get_balance(token_account)
+                        # Bought tokens not pushed yet (or websocket unavailable)
+                        if token_balance is None or int(token_balance['balance']['int']) == 0:
+                            token_balance = await self.wallet.get_token_balance(token_mint_account=token_account)
+                            if int(token_balance['balance']['int']) == 0:
+                                continue
+                        
+                        quote_response = await self.get_quote(
+                            input_mint=self.token_data['ADDRESS'],
+                            output_mint="So11111111111111111111111111111111111111112",
+                            amount=token_balance['balance']['int']
+                        )
+                        out_amount = (int(quote_response['outAmount']) / 10 ** 9) * sol_price
+                        
+                        amount_usd = out_amount
+                        
+                        if amount_usd < self.token_data['STOP_LOSS'] or amount_usd > self.token_data['TAKE_PROFIT']:
+                            broadcast_report = await self.swap(quote_response=quote_response)
+                            # Quote & check again if the sell did not land
+                            if broadcast_report['status'] != "confirmed":
+                                continue
+                            Trade_Ledger.add_swap('sniper', self.wallet.wallet.pubkey().__str__(), quote_response, broadcast_report['transaction_hash'])
+                            
+                            if amount_usd < self.token_data['STOP_LOSS']:
+                                self.token_data['STATUS'] = f"> STOP LOSS"
+                                alert_message = f"{self.token_data['NAME']} ({self.token_data['ADDRESS']}): STOP LOSS @ ${amount_usd}"
+                                f.send_alert(alert_message)
+                            elif amount_usd > self.token_data['TAKE_PROFIT']:
+                                self.token_data['STATUS'] = f"> TAKE PROFIT"
+                                alert_message = f"{self.token_data['NAME']} ({self.token_data['ADDRESS']}): TAKE PROFIT @ ${amount_usd}"
+                                f.send_alert(alert_message)
+                            
+                            Tokens_Store.update_token(self.token_id, {'STATUS': self.token_data['STATUS']})
+                            break
+                    # If token balance not synchronized yet (on buy) or quote/RPC failed, requests are already retried by the transport
+                    except (httpx.HTTPError, SolanaRpcException, KeyError, ValueError):
+                        self.health['errors'] += 1
+                
+                else:
+                    break
+        finally:
+            # Stopped, restarted or done: the subscription is released (reference counted, shared with watch)
+            await account_subscriber.unsubscribe(token_account)
+        
+        self.health['state'] = "DONE"
+    
+    @staticmethod
+    def get_http_client(max_concurrency: int) -> httpx.AsyncClient:
+        """Returns the HTTP client shared by the snipers, its connections outlive the route discovery interval."""
+        return f.get_async_http_client(limits=httpx.Limits(
+            max_connections=max_concurrency,
+            max_keepalive_connections=max_concurrency,
+            keepalive_expiry=RPC_Manager.KEEPALIVE_EXPIRY
+        ))
+    
+    @staticmethod
+    async def run_engine(control_queue: Queue):
+        """Runs every token sniper as a task of a single event loop.
+        
+        All the snipers share one RPC client and one HTTP client (and so one connection pool each),
+        SNIPER_MAX_CONCURRENCY in config.json caps the number of quote/swap requests in flight."""
+        config_data = await Config_CLI.get_config_data()
+        
+        max_concurrency = int(config_data.get('SNIPER_MAX_CONCURRENCY', 50))
+        RPC_Manager.start_prober()
+        http_client = Token_Sniper.get_http_client(max_concurrency)
+        supervisor = Sniper_Supervisor(
+            client=RPC_Manager.get_client(config_data['RPC_URL']),
+            http_client=http_client,
+            semaphore=asyncio.Semaphore(max_concurrency)
+        )
+        
+        try:
+            await supervisor.run(control_queue=control_queue)
+        finally:
+            await http_client.aclose()
+            await RPC_Manager.close()
+    
+    @staticmethod
+    def start_engine(control_queue: Queue):
+        try:
+            asyncio.run(Token_Sniper.run_engine(control_queue))
+        finally:
+            # The engine process exits without atexit handlers: alerts are posted (or buffered) before
+            f.flush_alerts()
+    
+    @staticmethod
+    async def run():
+        """Starts the sniper engine process running all the token snipers, restarted with backoff if it crashes."""
+        tokens_snipe = await Config_CLI.get_tokens_data()
+        if len(tokens_snipe) == 0:
+            return
+        Sniper_Supervisor.start_engine_process()
+        Sniper_Supervisor.start_monitor()
+    
+    @staticmethod
+    async def reload():
+        """Applies tokens changes to the running snipers, starts the sniper engine process if not running."""
+        if any(process.is_alive() for process in snipers_processes):
+            Sniper_Supervisor.control_queue.put({'command': "reload"})
+        else:
+            await Token_Sniper.run()
+    
+
+class Sniper_Supervisor():
+    """Runs the token snipers of the engine process and applies tokens changes without restarting the unchanged ones.
+    
+    The CLI sends commands over the control queue after editing tokens. On reload, the tokens are diffed with the
+    running snipers: new tokens are started, deleted ones stopped, edited ones updated in place or restarted if
+    their address, wallet or launch date changed. Unchanged snipers keep their state and warm connections.
+    
+    Crashed snipers (and a crashed engine process) are restarted with backoff, on drain the snipers are stopped
+    once their swaps in flight have landed or expired. Snipers health is reported to Tokens_Store every HEALTH_INTERVAL."""
+    
+    RESTART_FIELDS = ('ADDRESS', 'WALLET', 'TIMESTAMP')
+    HEALTH_INTERVAL = 1 # Seconds between two health reports
+    DRAIN_TIMEOUT = 90 # Seconds to wait for swaps in flight on exit (blockhash lifetime)
+    
+    # CLI side
+    control_queue = None
+    monitor_thread = None
+    engine_restarts = 0
+    draining = False
+    
+    def __init__(self, client: AsyncClient, http_client: httpx.AsyncClient, semaphore: asyncio.Semaphore):
+        self.client = client
+        self.http_client = http_client
+        self.semaphore = semaphore
+        self.snipers = {}
+        self.tasks = {}
+        self.wallets = {}
+        self.wallets_data = {}
+        self.rpc_url = None
+        self.last_loops = {}
+    
+    @staticmethod
+    def start_engine_process():
+        Sniper_Supervisor.control_queue = Queue()
+        process = Process(target=Token_Sniper.start_engine, args=(Sniper_Supervisor.control_queue,))
+        snipers_processes.clear()
+        snipers_processes.append(process)
+        process.start()
+    
+    @staticmethod
+    def start_monitor():
+        """Starts the thread restarting the engine process with backoff if it crashes."""
+        if Sniper_Supervisor.monitor_thread is None or not Sniper_Supervisor.monitor_thread.is_alive():
+            Sniper_Supervisor.monitor_thread = threading.Thread(target=Sniper_Supervisor.monitor_engine, daemon=True)
+            Sniper_Supervisor.monitor_thread.start()
+    
+    @staticmethod
+    def monitor_engine():
+        while snipers_processes and not Sniper_Supervisor.draining:
+            process = snipers_processes[-1]
+            process.join()
+            # Drained or stopped on purpose
+            if Sniper_Supervisor.draining or process.exitcode == 0:
+                return
+            time.sleep(f.get_backoff_delay(Sniper_Supervisor.engine_restarts))
+            Sniper_Supervisor.engine_restarts += 1
+            # Not already restarted by a reload meanwhile
+            if not Sniper_Supervisor.draining and snipers_processes and snipers_processes[-1] is process:
+                Sniper_Supervisor.start_engine_process()
+    
+    @staticmethod
+    async def drain():
+        """Stops the sniper engine once the swaps in flight have landed or expired."""
+        Sniper_Supervisor.draining = True
+        for process in snipers_processes:
+            if process.is_alive():
+                Sniper_Supervisor.control_queue.put({'command': "drain"})
+                await asyncio.to_thread(process.join, Sniper_Supervisor.DRAIN_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
+        snipers_processes.clear()
+        await asyncio.to_thread(f.flush_alerts)
+    
+    @staticmethod
+    def get_engine_status() -> dict:
+        """Returns the engine process status (CLI side)."""
+        process = snipers_processes[-1] if snipers_processes else None
+        return {
+            'running': process is not None and process.is_alive(),
+            'pid': process.pid if process is not None else None,
+            'restarts': Sniper_Supervisor.engine_restarts,
+        }
+    
+    def get_wallet(self, wallet_id: str) -> Wallet:
+        """Returns the wallet shared by the snipers of wallet_id."""
+        if wallet_id not in self.wallets:
+            self.wallets[wallet_id] = Wallet(rpc_url=self.rpc_url, private_key=self.wallets_data[wallet_id]['private_key'], client=self.client)
+        return self.wallets[wallet_id]
+    
+    def start_sniper(self, token_id: str, token_data: dict) -> Token_Sniper:
+        sniper = Token_Sniper(
+            token_id=token_id,
+            token_data=token_data,
+            wallet=self.get_wallet(str(token_data['WALLET'])),
+            http_client=self.http_client,
+            semaphore=self.semaphore
+        )
+        self.snipers[token_id] = sniper
+        self.tasks[token_id] = asyncio.create_task(sniper.snipe_token())
+        self.tasks[token_id].add_done_callback(lambda task: self.on_sniper_done(token_id, sniper, task))
+        return sniper
+    
+    async def stop_sniper(self, token_id: str):
+        """Stops the sniper once its swap in flight, if any, has landed or expired."""
+        sniper = self.snipers.pop(token_id)
+        task = self.tasks.pop(token_id)
+        async with sniper.swap_lock:
+            task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    
+    def on_sniper_done(self, token_id: str, sniper: Token_Sniper, task: asyncio.Task):
+        if task.cancelled() or task.exception() is None:
+            return
+        sniper.health['state'] = "CRASHED"
+        sniper.health['errors'] += 1
+        f.send_alert(f"{sniper.token_data['NAME']} ({sniper.token_data['ADDRESS']}): SNIPER CRASHED ({task.exception()!r}), restarting")
+        asyncio.create_task(self.restart_sniper(token_id, sniper))
+    
+    async def restart_sniper(self, token_id: str, sniper: Token_Sniper):
+        """Restarts a crashed sniper with backoff, from its last stored status."""
+        await asyncio.sleep(f.get_backoff_delay(sniper.health['restarts']))
+        # Stopped or replaced by a reload meanwhile
+        if self.snipers.get(token_id) is not sniper:
+            return
+        tokens_data = await Config_CLI.get_tokens_data()
+        if token_id not in tokens_data:
+            await self.stop_sniper(token_id)
+            return
+        self.tasks.pop(token_id)
+        restarted_sniper = self.start_sniper(token_id, tokens_data[token_id])
+        restarted_sniper.health['restarts'] = sniper.health['restarts'] + 1
+        restarted_sniper.health['errors'] = sniper.health['errors']
+    
+    async def reload(self):
+        """Diffs the tokens with the running snipers and starts, stops or updates only the changed ones."""
+        tokens_data = await Config_CLI.get_tokens_data()
+        config_data = await Config_CLI.get_config_data()
+        self.wallets_data = await Wallets_CLI.get_wallets()
+        self.rpc_url = config_data['RPC_URL']
+        
+        for token_id in [token_id for token_id in self.snipers if token_id not in tokens_data]:
+            await self.stop_sniper(token_id)
+        
+        for token_id, token_data in tokens_data.items():
+            sniper = self.snipers.get(token_id)
+            if sniper is None:
+                self.start_sniper(token_id, token_data)
+                continue
+            
+            # STATUS is only written by the sniper itself
+            changed_fields = {field: value for field, value in token_data.items() if field != 'STATUS' and sniper.token_data.get(field) != value}
+            if not changed_fields:
+                continue
+            if any(field in Sniper_Supervisor.RESTART_FIELDS for field in changed_fields):
+                await self.stop_sniper(token_id)
+                self.start_sniper(token_id, token_data)
+            else:
+                # Snipers read their parameters (buy amount, TP/SL, slippage...) on every use
+                sniper.token_data.update(changed_fields)
+    
+    def report_health(self):
+        snipers_health = {}
+        for token_id, sniper in self.snipers.items():
+            sniper.health['loop_rate'] = (sniper.health['loops'] - self.last_loops.get(sniper, 0)) / Sniper_Supervisor.HEALTH_INTERVAL
+            self.last_loops[sniper] = sniper.health['loops']
+            snipers_health[token_id] = sniper.health
+        self.last_loops = {sniper: loops for sniper, loops in self.last_loops.items() if sniper in self.snipers.values()}
+        Tokens_Store.set_snipers_health(snipers_health)
+    
+    async def run_health_reporter(self):
+        while True:
+            await asyncio.sleep(Sniper_Supervisor.HEALTH_INTERVAL)
+            try:
+                self.report_health()
+            # Database locked by a long write of another process, reported next round
+            except sqlite3.OperationalError:
+                pass
+    
+    async def run(self, control_queue: Queue):
+        """Starts the snipers then applies the commands received from the CLI until drained."""
+        loop = asyncio.get_running_loop()
+        commands = asyncio.Queue()
+        def read_control_queue():
+            while True:
+                loop.call_soon_threadsafe(commands.put_nowait, control_queue.get())
+        # Daemon thread: a thread blocked on the queue must not keep the process alive once drained
+        threading.Thread(target=read_control_queue, daemon=True).start()
+        
+        await self.reload()
+        health_reporter_task = asyncio.create_task(self.run_health_reporter())
+        while True:
+            command = await commands.get()
+            match command['command']:
+                case "reload":
+                    await self.reload()
+                case "drain":
+                    break
+        
+        health_reporter_task.cancel()
+        await asyncio.gather(*[self.stop_sniper(token_id) for token_id in list(self.snipers)])
+        Tokens_Store.set_snipers_health({})
+    
+
+class Token_Registry():
+    """Jupiter tokens list stored on disk as columns, loaded once per process and refreshed in the background.
+    
+    Columns: addresses, symbols, decimals, prebuilt fuzzy prompt choices and the set of DCA-eligible tokens."""
+    
+    TOKENS_LIST_URL = "https://token.jup.ag/all"
+    DCA_TOKENS_URL = "https://cache.jup.ag/top-tokens"
+    CACHE_FILE = 'tokens_list_cache.pickle'
+    CACHE_MAX_AGE = 3600 # Seconds before asking Jupiter if the tokens list changed
+    
+    columns = None
+    tokens = None
+    tokens_frame = None
+    refresh_task = None
+    
+    @staticmethod
+    def read_cache() -> dict:
+        """Returns tokens list columns stored on disk."""
+        try:
+            with open(Token_Registry.CACHE_FILE, 'rb') as cache_file:
+                return pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+    
+    @staticmethod
+    def write_cache(columns: dict):
+        """Atomically writes tokens list columns on disk."""
+        temp_file = f"{Token_Registry.CACHE_FILE}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as cache_file:
+            pickle.dump(columns, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, Token_Registry.CACHE_FILE)
+    
+    @staticmethod
+    async def fetch_tokens(columns: dict) -> dict:
+        """Downloads tokens list & DCA tokens, the tokens list is reused if Jupiter answers it did not change (ETag)."""
+        headers = {}
+        if columns and columns.get('etag'):
+            headers['If-None-Match'] = columns['etag']
+        
+        # Not Jupiter_DCA.get_available_dca_tokens: it blocks the event loop (sync request) during background refreshes
+        async with f.get_async_http_client(timeout=30) as http_client:
+            response, dca_tokens_response = await asyncio.gather(
+                http_client.get(Token_Registry.TOKENS_LIST_URL, headers=headers),
+                http_client.get(Token_Registry.DCA_TOKENS_URL)
+            )
+        dca_tokens_response.raise_for_status()
+        dca_tokens = set(dca_tokens_response.json())
+        
+        if response.status_code == 304:
+            return {**columns, 'fetched_at': time.time(), 'dca_tokens': dca_tokens}
+        
+        response.raise_for_status()
+        tokens_list = response.json()
+        addresses = [token['address'] for token in tokens_list]
+        symbols = [token.get('symbol', "") for token in tokens_list]
+        return {
+            'etag': response.headers.get('ETag'),
+            'fetched_at': time.time(),
+            'addresses': addresses,
+            'symbols': symbols,
+            'decimals': array('B', [int(token.get('decimals', 0)) for token in tokens_list]),
+            'choices': [f"{symbol} ({address})" for symbol, address in zip(symbols, addresses)],
+            'dca_tokens': dca_tokens,
+        }
+    
+    @staticmethod
+    async def refresh():
+        """Refreshes tokens list columns and their disk cache."""
+        try:
+            columns = await Token_Registry.fetch_tokens(Token_Registry.columns)
+            Token_Registry.write_cache(columns)
+        except (httpx.HTTPError, OSError, ValueError):
+            # Keep using the outdated cache if Jupiter cannot be reached
+            if Token_Registry.columns is None:
+                raise
+            return
+        Token_Registry.columns = columns
+        Token_Registry.tokens = None
+        Token_Registry.tokens_frame = None
+    
+    @staticmethod
+    def start_background_refresh():
+        """Refreshes tokens list without blocking the prompts if the cache is outdated."""
+        if Token_Registry.refresh_task is not None and not Token_Registry.refresh_task.done():
+            return
+        if Token_Registry.columns is None:
+            Token_Registry.columns = Token_Registry.read_cache()
+        if Token_Registry.columns is None or time.time() - Token_Registry.columns['fetched_at'] > Token_Registry.CACHE_MAX_AGE:
+            Token_Registry.refresh_task = asyncio.create_task(Token_Registry.refresh())
+    
+    @staticmethod
+    async def load() -> dict:
+        """Returns tokens list columns, only waits for Jupiter if there is no cache on disk yet."""
+        Token_Registry.start_background_refresh()
+        if Token_Registry.columns is None:
+            await Token_Registry.refresh_task
+        return Token_Registry.columns
+    
+    @staticmethod
+    async def get_tokens() -> dict:
+        """Returns tokens indexed by mint address: {address: {'address', 'symbol', 'decimals'}}."""
+        columns = await Token_Registry.load()
+        if Token_Registry.tokens is None:
+            Token_Registry.tokens = {
+                address: {'address': address, 'symbol': symbol, 'decimals': decimals}
+                for address, symbol, decimals in zip(columns['addresses'], columns['symbols'], columns['decimals'])
+            }
+        return Token_Registry.tokens
+    
+    @staticmethod
+    async def get_tokens_frame() -> pd.DataFrame:
+        """Returns tokens as a DataFrame indexed by mint address, columns: symbol, decimals."""
+        columns = await Token_Registry.load()
+        if Token_Registry.tokens_frame is None:
+            tokens_frame = pd.DataFrame({
+                'symbol': columns['symbols'],
+                'decimals': np.frombuffer(columns['decimals'], dtype=np.uint8),
+            }, index=pd.Index(columns['addresses'], name='address'))
+            Token_Registry.tokens_frame = tokens_frame[~tokens_frame.index.duplicated()]
+        return Token_Registry.tokens_frame
+    
+    @staticmethod
+    async def get_token(address: str) -> dict:
+        """Returns token symbol & decimals, unknown mints get 'UNKNOWN' symbol and 0 decimals."""
+        tokens = await Token_Registry.get_tokens()
+        return tokens.get(address, {'address': address, 'symbol': "UNKNOWN", 'decimals': 0})
+    
+    @staticmethod
+    async def resolve(addresses: list) -> dict:
+        """Returns symbol & decimals of every distinct mint address: {address: {'address', 'symbol', 'decimals'}}."""
+        tokens = await Token_Registry.get_tokens()
+        return {
+            address: tokens.get(address, {'address': address, 'symbol': "UNKNOWN", 'decimals': 0})
+            for address in set(addresses)
+        }
+    
+    @staticmethod
+    async def get_choices() -> list:
+        """Returns a copy of the prebuilt 'SYMBOL (address)' choices for token prompts."""
+        columns = await Token_Registry.load()
+        return list(columns['choices'])
+    
+    @staticmethod
+    async def get_dca_tokens() -> set:
+        """Returns the set of token addresses available for DCA."""
+        columns = await Token_Registry.load()
+        return columns['dca_tokens']
+    
+
+class History_Table():
+    """Builds history tables as typed DataFrames straight from API responses, rendered one page at a time.
+    
+    Timestamps are parsed and amounts scaled column-wide, mints are joined against the Token_Registry tokens frame."""
+    
+    HEADER_LINES = 16 # Lines taken by the logo, title, table header & page prompt
+    DATE_FORMAT = 'ISO8601' # Jupiter dates come with and without milliseconds
+    ORDERS_COLUMNS = ['ID', 'CREATED AT', 'TOKEN SOLD', 'AMOUNT SOLD', 'TOKEN BOUGHT', 'AMOUNT BOUGHT', 'STATE']
+    DCA_COLUMNS = ['ID', 'CREATED AT', 'END AT', 'SELLING', 'SELLING PER CYCLE', 'BUYING', 'CYCLE FREQUENCY', 'NEXT ORDER AT', 'ORDERS LEFT']
+    POSITIONS_COLUMNS = ['TOKEN', 'AMOUNT', 'COST', 'VALUE', 'UNREALIZED PNL', 'REALIZED PNL', 'SOLD (UNKNOWN COST)', 'TRADES', 'LAST TRADE']
+    
+    @staticmethod
+    def join_tokens(mints: pd.Series, tokens_frame: pd.DataFrame) -> pd.DataFrame:
+        """Returns symbol & decimals of every mint, unknown mints get 'UNKNOWN' symbol and 0 decimals."""
+        joined = tokens_frame.reindex(mints.to_numpy())
+        return pd.DataFrame({
+            'symbol': joined['symbol'].fillna("UNKNOWN").to_numpy(),
+            'decimals': joined['decimals'].fillna(0).astype('int64').to_numpy(),
+        }, index=mints.index)
+    
+    @staticmethod
+    def scale_amounts(amounts: pd.Series, decimals: pd.Series) -> pd.Series:
+        return pd.to_numeric(amounts, errors='coerce') / 10.0 ** decimals
+    
+    @staticmethod
+    def format_amounts(amounts: pd.Series, symbols: pd.Series) -> pd.Series:
+        """Returns 'amount $SYMBOL' strings, '-' for unknown amounts."""
+        return (amounts.round(6).astype(str) + " $" + symbols).where(amounts.notna(), "-")
+    
+    @staticmethod
+    def get_page_size() -> int:
+        """Returns the number of rows fitting in the terminal (a fancy_grid row takes 2 lines)."""
+        return max((shutil.get_terminal_size().lines - History_Table.HEADER_LINES) // 2, 5)
+    
+    @staticmethod
+    async def build_orders_history(orders: list, input_mint_key: str, output_mint_key: str, state: str=None, first_id: int=1) -> pd.DataFrame:
+        """Returns limit orders history table, mint keys are flattened paths (ex: 'order.inputMint').
+        
+        state: value of the STATE column, taken from each order 'state' if None."""
+        frame = pd.json_normalize(orders)
+        if frame.empty:
+            return pd.DataFrame(columns=History_Table.ORDERS_COLUMNS)
+        
+        tokens_frame = await Token_Registry.get_tokens_frame()
+        token_sold = History_Table.join_tokens(frame[input_mint_key], tokens_frame)
+        token_bought = History_Table.join_tokens(frame[output_mint_key], tokens_frame)
+        return pd.DataFrame({
+            'ID': np.arange(first_id, first_id + len(frame)),
+            'CREATED AT': pd.to_datetime(frame['createdAt'], format=History_Table.DATE_FORMAT, errors='coerce').dt.strftime("%m-%d-%Y %H:%M:%S"),
+            'TOKEN SOLD': token_sold['symbol'],
+            'AMOUNT SOLD': History_Table.scale_amounts(frame['inAmount'], token_sold['decimals']),
+            'TOKEN BOUGHT': token_bought['symbol'],
+            'AMOUNT BOUGHT': History_Table.scale_amounts(frame['outAmount'], token_bought['decimals']),
+            'STATE': frame['state'] if state is None else state,
+        })
     
-    def snipe_token(self):
-                    
-        tokens_data = Config_CLI.get_tokens_data_no_async()
-        config_data = Config_CLI.get_config_data_no_async()
-        wallets = Wallets_CLI.get_wallets_no_async()
-        wallet = Wallet(rpc_url=config_data['RPC_URL'], private_key=wallets[str(tokens_data[self.token_id]['WALLET'])]['private_key'], async_client=False)
-        token_account = wallet.get_token_mint_account_no_async(self.token_data['ADDRESS'])
-        token_balance = wallet.get_token_balance_no_async(token_mint_account=token_account)
-        
-        while True:
-            if self.token_data['STATUS'] in ["NOT IN", "ERROR WHEN SWAPPING"]:
-            
-                while True:
-                    if self.token_data['TIMESTAMP'] is None:
-                        time.sleep(1)
-                    elif self.token_data['TIMESTAMP'] is not None:
-                        sleep_time = self.token_data['TIMESTAMP'] - int(time.time()) - 3
-                        try:
-                            time.sleep(sleep_time)
-                        except ValueError:
-                            pass
-                    
-                    sol_price = f.get_crypto_price('SOL')
-                    amount = int((self.token_data['BUY_AMOUNT']*10**9) / sol_price)
-                    quote_url = "https://quote-api.jup.ag/v6/quote?" + f"inputMint=So11111111111111111111111111111111111111112" + f"&outputMint={self.token_data['ADDRESS']}" + f"&amount={amount}" + f"&slippageBps={int(self.token_data['SLIPPAGE_BPS'])}"
-                    quote_response = httpx.get(url=quote_url).json()
-                    
+    @staticmethod
+    async def build_dca_accounts(dca_accounts: list) -> pd.DataFrame:
+        """Returns open DCA accounts table."""
+        frame = pd.DataFrame(dca_accounts)
+        if frame.empty:
+            return pd.DataFrame(columns=History_Table.DCA_COLUMNS)
+        
+        tokens_frame = await Token_Registry.get_tokens_frame()
+        token_sold = History_Table.join_tokens(frame['inputMint'], tokens_frame)
+        token_bought = History_Table.join_tokens(frame['outputMint'], tokens_frame)
+        local_timezone = datetime.now().astimezone().tzinfo
+        
+        created_at = pd.to_datetime(frame['createdAt'], format=History_Table.DATE_FORMAT, errors='coerce', utc=True)
+        in_deposited = pd.to_numeric(frame['inDeposited'])
+        in_amount_per_cycle = pd.to_numeric(frame['inAmountPerCycle'])
+        cycle_frequency = pd.to_numeric(frame['cycleFrequency']).astype('int64')
+        total_orders = (in_deposited // in_amount_per_cycle).astype('int64')
+        total_orders_filled = frame['fills'].str.len().astype('int64')
+        next_order_at = created_at + pd.to_timedelta(cycle_frequency * (total_orders_filled + 1), unit='s')
+        end_at = created_at + pd.to_timedelta(cycle_frequency * total_orders, unit='s')
+        
+        return pd.DataFrame({
+            'ID': np.arange(1, len(frame) + 1),
+            'CREATED AT': created_at.dt.strftime("%m-%d-%y %H:%M"),
+            'END AT': end_at.dt.tz_convert(local_timezone).dt.strftime("%m-%d-%y %H:%M"),
+            'SELLING': History_Table.scale_amounts(in_deposited, token_sold['decimals']).astype(str) + " $" + token_sold['symbol'],
+            'SELLING PER CYCLE': History_Table.scale_amounts(in_amount_per_cycle, token_sold['decimals']).astype(str) + " $" + token_sold['symbol'],
+            'BUYING': History_Table.scale_amounts(frame['unfilledAmount'], token_bought['decimals']).astype(str) + " $" + token_bought['symbol'],
+            'CYCLE FREQUENCY': cycle_frequency.map(f.get_timestamp_formatted),
+            'NEXT ORDER AT': next_order_at.dt.tz_convert(local_timezone).dt.strftime("%m-%d-%y %H:%M"),
+            'ORDERS LEFT': total_orders - total_orders_filled,
+        })
+    
+    @staticmethod
+    async def build_positions(positions: list, values: list) -> pd.DataFrame:
+        """Returns Trade_Ledger positions table, values: current value of each position in raw quote units (None if unknown)."""
+        frame = pd.DataFrame(positions)
+        if frame.empty:
+            return pd.DataFrame(columns=History_Table.POSITIONS_COLUMNS)
+        
+        tokens_frame = await Token_Registry.get_tokens_frame()
+        token = History_Table.join_tokens(frame['MINT'], tokens_frame)
+        quote_token = History_Table.join_tokens(frame['QUOTE_MINT'], tokens_frame)
+        cost = History_Table.scale_amounts(frame['COST'], quote_token['decimals'])
+        value = History_Table.scale_amounts(pd.Series(values, index=frame.index, dtype='float64'), quote_token['decimals'])
+        
+        return pd.DataFrame({
+            'TOKEN': token['symbol'],
+            'AMOUNT': History_Table.scale_amounts(frame['AMOUNT'], token['decimals']),
+            'COST': History_Table.format_amounts(cost, quote_token['symbol']),
+            'VALUE': History_Table.format_amounts(value, quote_token['symbol']),
+            'UNREALIZED PNL': History_Table.format_amounts(value - cost, quote_token['symbol']),
+            'REALIZED PNL': History_Table.format_amounts(History_Table.scale_amounts(frame['REALIZED_PNL'], quote_token['decimals']), quote_token['symbol']),
+            'SOLD (UNKNOWN COST)': History_Table.format_amounts(History_Table.scale_amounts(frame['UNKNOWN_COST_SOLD'], quote_token['decimals']), quote_token['symbol']),
+            'TRADES': frame['TRADES'],
+            'LAST TRADE': pd.to_datetime(frame['LAST_TIMESTAMP'], unit='s', utc=True).dt.tz_convert(datetime.now().astimezone().tzinfo).dt.strftime("%m-%d-%y %H:%M"),
+        })
+    
+    @staticmethod
+    def render(frame: pd.DataFrame) -> str:
+        return tabulate(frame, headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
+    
+    @staticmethod
+    async def display_stream(pages, build_table, title: str):
+        """Prints the table one terminal page at a time while history pages are streamed.
+        
+        pages: async generator of records lists, build_table: async (records, first_id) -> DataFrame.
+        Records are only fetched until the displayed page is full (plus one row to know if there is a next page)."""
+        page_size = History_Table.get_page_size()
+        tables = []
+        rows = 0
+        exhausted = False
+        page = 0
+        error = None
+        try:
+            while True:
+                loading_spinner = yaspin(text=f"{c.BLUE}Loading history{c.RESET}", color="blue")
+                loading_spinner.start()
+                while not exhausted and rows <= (page + 1) * page_size:
                     try:
-                        if quote_response['error']:
-                            time.sleep(1)
-                    except:
+                        records = await anext(pages)
+                    except StopAsyncIteration:
+                        exhausted = True
+                        break
+                    except httpx.HTTPError:
+                        error = "! Failed to load the whole history"
+                        exhausted = True
                         break
+                    table = await build_table(records, first_id=rows + 1)
+                    if not table.empty:
+                        tables.append(table)
+                        rows += len(table)
+                frame = pd.concat(tables, ignore_index=True) if tables else await build_table([], first_id=1)
+                loading_spinner.stop()
                 
-                swap_data = {
-                    "quoteResponse": quote_response,
-                    "userPublicKey": wallet.wallet.pubkey().__str__(),
-                    "wrapUnwrapSOL": True
-                }
+                f.display_logo()
+                print(title)
+                print()
+                print(History_Table.render(frame.iloc[page * page_size:(page + 1) * page_size]))
+                print(f"Page {page + 1} - {len(frame)}{'' if exhausted else '+'} rows")
+                if error is not None:
+                    print(f"{c.RED}{error}{c.RESET}")
+                print()
+                
+                choices = []
+                if len(frame) > (page + 1) * page_size:
+                    choices.append("Next page")
+                if page > 0:
+                    choices.append("Previous page")
+                if not choices:
+                    await inquirer.text(message="\nPress ENTER to continue").execute_async()
+                    return
+                choices.append("Back")
                 
-                retries = 0
+                match await inquirer.select(message="Select page:", choices=choices).execute_async():
+                    case "Next page":
+                        page += 1
+                    case "Previous page":
+                        page -= 1
+                    case "Back":
+                        return
+        finally:
+            await pages.aclose()
+
+
+class History_Fetcher():
+    """Streams limit orders & trades history pages, newest first, and caches them on disk.
+    
+    Pages are requested with take/cursor (cursor: id of the last record received). Records already cached are
+    not requested again: new records are fetched until the first cached one, then the cache is served."""
+    
+    ORDERS_HISTORY_URL = "https://jup.ag/api/limit/v1/orderHistory"
+    TRADES_HISTORY_URL = "https://jup.ag/api/limit/v1/tradeHistory"
+    PAGE_SIZE = 100 # Records per request
+    CACHE_FILE = 'history_cache.pickle'
+    
+    @staticmethod
+    def read_cache() -> dict:
+        """Returns cached histories: {'url:wallet': {'records': list newest first, 'complete': bool}}."""
+        try:
+            with open(History_Fetcher.CACHE_FILE, 'rb') as cache_file:
+                return pickle.load(cache_file)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return {}
+    
+    @staticmethod
+    def write_cache(key: str, history: dict):
+        """Atomically writes a cached history on disk."""
+        cache = History_Fetcher.read_cache()
+        cache[key] = history
+        temp_file = f"{History_Fetcher.CACHE_FILE}.{os.getpid()}.tmp"
+        with open(temp_file, 'wb') as cache_file:
+            pickle.dump(cache, cache_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, History_Fetcher.CACHE_FILE)
+    
+    @staticmethod
+    async def fetch_page(http_client: httpx.AsyncClient, url: str, wallet_address: str, cursor: int=None) -> list:
+        params = {'wallet': wallet_address, 'take': History_Fetcher.PAGE_SIZE}
+        if cursor is not None:
+            params['cursor'] = cursor
+        response = await http_client.get(url, params=params)
+        response.raise_for_status()
+        return response.json()
+    
+    @staticmethod
+    async def stream(url: str, wallet_address: str, state: dict=None):
+        """Yields history pages (lists of records), newest first.
+        
+        The cache is updated with what was fetched, even if the consumer stops early, as long as it stays contiguous.
+        state (dict): set to {'offline': True} if Jupiter could not be reached and the cache was served as is,
+        records newer than the cached ones may then be missing between the yielded pages."""
+        key = f"{url}:{wallet_address}"
+        cached = History_Fetcher.read_cache().get(key, {'records': [], 'complete': False})
+        cached_ids = {record['id'] for record in cached['records']}
+        new_records = []
+        reached_cache = False
+        # Stored on disk when set, always a contiguous history from the newest record
+        history = None
+        
+        try:
+            async with f.get_async_http_client(timeout=30) as http_client:
+                # New records, until the first cached one
+                cursor = None
                 while True:
                     try:
-                        get_swap_data = httpx.post(url="https://quote-api.jup.ag/v6/swap", json=swap_data).json()
-                        swap_data = get_swap_data['swapTransaction']
-                        wallet.sign_send_transaction_no_async(transaction_data=swap_data, print_link=False)
-                        self.success = True
+                        page = await History_Fetcher.fetch_page(http_client, url, wallet_address, cursor)
+                    # Offline: the cache is served as is
+                    except httpx.HTTPError:
+                        if not cached['records']:
+                            raise
+                        if state is not None:
+                            state['offline'] = True
                         break
-                    except:
-                        if retries == 3:
-                            self.success = False
-                            break
-                        retries += 1
-                        time.sleep(0.5)
-                        
-                if self.success is True:
-                    tokens_data[self.token_id]['STATUS'] = "IN"
-                    self.token_data['STATUS'] = "IN"
-                    alert_message = f"{self.token_data['NAME']} ({self.token_data['ADDRESS']}): IN"
-                    f.send_discord_alert(alert_message)
-                    f.send_telegram_alert(alert_message)
-                else:
-                    tokens_data[self.token_id]['STATUS'] = "ERROR ON SWAPPING"
-                    self.token_data['STATUS'] = "ERROR WHEN SWAPPING"
-                    alert_message = f"{self.token_data['NAME']} ({self.token_data['ADDRESS']}): BUY FAILED"
-                    f.send_discord_alert(alert_message)
-                    f.send_telegram_alert(alert_message)
-                Config_CLI.edit_tokens_file_no_async(tokens_data)
-            
-            elif self.token_data['STATUS'] not in ["NOT IN", "ERROR WHEN SWAPPING"] and not self.token_data['STATUS'].startswith('> '):
-                time.sleep(1)
-                sol_price = f.get_crypto_price('SOL')
-                quote_url = "https://quote-api.jup.ag/v6/quote?" + f"inputMint={self.token_data['ADDRESS']}" + f"&outputMint=So11111111111111111111111111111111111111112" + f"&amount={token_balance['balance']['int']}" + f"&slippageBps={int(self.token_data['SLIPPAGE_BPS'])}"
-                quote_response = httpx.get(quote_url).json()
-                try:
-                    out_amount = (int(quote_response['outAmount']) / 10 ** 9) * sol_price
-                    
-                    amount_usd = out_amount
+                    new_page = [record for record in page if record['id'] not in cached_ids]
+                    new_records.extend(new_page)
+                    reached_cache = len(new_page) < len(page)
+                    reached_end = len(page) < History_Fetcher.PAGE_SIZE
+                    if reached_cache:
+                        history = {'records': new_records + cached['records'], 'complete': cached['complete']}
+                    elif reached_end:
+                        history = {'records': new_records, 'complete': True}
+                    elif not cached['records']:
+                        history = {'records': new_records, 'complete': False}
                     
-                    if amount_usd < self.token_data['STOP_LOSS'] or amount_usd > self.token_data['TAKE_PROFIT']:
-                        swap_data = {
-                            "quoteResponse": quote_response,
-                            "userPublicKey": wallet.wallet.pubkey().__str__(),
-                            "wrapUnwrapSOL": True
-                        }
-                        get_swap_data = httpx.post(url="https://quote-api.jup.ag/v6/swap", json=swap_data).json()
-                        swap_data = get_swap_data['swapTransaction']
-                        wallet.sign_send_transaction_no_async(transaction_data=swap_data, print_link=False)
-                        
-                        if amount_usd < self.token_data['STOP_LOSS']:
-                            tokens_data[self.token_id]['STATUS'] = f"> STOP LOSS"
-                            alert_message = f"{self.token_data['NAME']} ({self.token_data['ADDRESS']}): STOP LOSS @ ${amount_usd}"
-                            f.send_discord_alert(alert_message)
-                            f.send_telegram_alert(alert_message)
-                        elif amount_usd > self.token_data['TAKE_PROFIT']:
-                            tokens_data[self.token_id]['STATUS'] = f"> TAKE PROFIT"
-                            alert_message = f"{self.token_data['NAME']} ({self.token_data['ADDRESS']}): TAKE PROFIT @ ${amount_usd}"
-                            f.send_discord_alert(alert_message)
-                            f.send_telegram_alert(alert_message)
-                        
-                        Config_CLI.edit_tokens_file_no_async(tokens_data)
+                    if new_page:
+                        yield new_page
+                    if reached_cache or reached_end:
                         break
-                # If token balance not synchronized yet (on buy)
-                except:
-                    pass
-            
-            else:
-                break
-            
+                    cursor = page[-1]['id']
+                
+                if history is None or reached_cache:
+                    for i in range(0, len(cached['records']), History_Fetcher.PAGE_SIZE):
+                        yield cached['records'][i:i + History_Fetcher.PAGE_SIZE]
+                if history is None:
+                    return
+                
+                # Older records never fetched yet
+                while not history['complete'] and history['records']:
+                    page = await History_Fetcher.fetch_page(http_client, url, wallet_address, cursor=history['records'][-1]['id'])
+                    history['records'].extend(page)
+                    history['complete'] = len(page) < History_Fetcher.PAGE_SIZE
+                    if page:
+                        yield page
+        finally:
+            if history is not None:
+                History_Fetcher.write_cache(key, history)
+    
     @staticmethod
-    async def run():
-        """Starts all the sniper token instance"""
-        tokens_snipe = await Config_CLI.get_tokens_data()
-        for token_id, token_data in tokens_snipe.items():
-            token_sniper_instance = Token_Sniper(token_id, token_data)
-            process = Process(target=token_sniper_instance.snipe_token, args=())
-            snipers_processes.append(process)
-            
-        for sniper_process in snipers_processes:
-            sniper_process.start()
+    async def prefetch(url: str, wallet_address: str):
+        """Caches the newest history page, history displays then only have to stream cached records."""
+        pages = History_Fetcher.stream(url, wallet_address=wallet_address)
+        try:
+            await pages.__anext__()
+        # No history, or Jupiter unreachable: the display requests it again
+        except (StopAsyncIteration, httpx.HTTPError, ValueError):
+            pass
+        finally:
+            await pages.aclose()
+    
+
+class Portfolio_Scanner():
+    """SOL & SPL holdings of every wallet, scanned concurrently.
+    
+    Each owner token accounts are listed with getTokenAccountsByOwner (jsonParsed, SPL Token & Token-2022 programs),
+    symbols come from Token_Registry and USD prices from Jupiter price API, one request per PRICE_BATCH_SIZE distinct mints."""
+    
+    PRICE_URL = "https://price.jup.ag/v4/price"
+    PRICE_BATCH_SIZE = 100 # Max mints per price request
+    TOKEN_PROGRAM_IDS = ('TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA', 'TokenzQdBNbLqP5VEhdkAS6EPFLC1PHnBqCXEpPxuEb')
+    SOL_MINT = "So11111111111111111111111111111111111111112"
+    HOLDINGS_COLUMNS = ['wallet', 'mint', 'amount', 'decimals']
+    
+    @staticmethod
+    async def get_token_accounts(client: AsyncClient, owner: str) -> list:
+        """Returns every non empty token account of owner: [{'mint', 'amount' (raw), 'decimals'}]."""
+        get_token_accounts = await asyncio.gather(*[
+            client.get_token_accounts_by_owner_json_parsed(Pubkey.from_string(owner), TokenAccountOpts(program_id=Pubkey.from_string(program_id)))
+            for program_id in Portfolio_Scanner.TOKEN_PROGRAM_IDS
+        ])
+        
+        token_accounts = []
+        for get_program_token_accounts in get_token_accounts:
+            for keyed_account in get_program_token_accounts.value:
+                token_account_info = keyed_account.account.data.parsed['info']
+                amount = int(token_account_info['tokenAmount']['amount'])
+                if amount > 0:
+                    token_accounts.append({
+                        'mint': token_account_info['mint'],
+                        'amount': amount,
+                        'decimals': int(token_account_info['tokenAmount']['decimals']),
+                    })
+        return token_accounts
+    
+    @staticmethod
+    async def get_prices(mints: list) -> dict:
+        """Returns USD price of every mint Jupiter can price: {mint: price}, batches are requested concurrently."""
+        batches = [mints[i:i + Portfolio_Scanner.PRICE_BATCH_SIZE] for i in range(0, len(mints), Portfolio_Scanner.PRICE_BATCH_SIZE)]
+        async with f.get_async_http_client() as http_client:
+            responses = await asyncio.gather(*[
+                http_client.get(Portfolio_Scanner.PRICE_URL, params={'ids': ",".join(batch)})
+                for batch in batches
+            ], return_exceptions=True)
+        
+        prices = {}
+        for response in responses:
+            # Holdings of a failed batch are displayed without price
+            if isinstance(response, Exception) or response.status_code != 200:
+                continue
+            for mint, price_data in response.json()['data'].items():
+                prices[mint] = float(price_data['price'])
+        return prices
+    
+    @staticmethod
+    async def scan(wallets: dict) -> pd.DataFrame:
+        """Returns holdings of every wallet, columns: wallet, mint, symbol, amount (scaled), price, value."""
+        config_data = await Config_CLI.get_config_data()
+        client = RPC_Manager.get_client(config_data['RPC_URL'])
+        pubkeys = [wallet_data['pubkey'] for wallet_data in wallets.values()]
+        sol_balances, wallets_token_accounts, tokens_frame = await asyncio.gather(
+            Wallets_CLI.get_sol_balances(client=client, pubkeys=pubkeys),
+            asyncio.gather(*[Portfolio_Scanner.get_token_accounts(client, pubkey) for pubkey in pubkeys]),
+            Token_Registry.get_tokens_frame(),
+        )
+        
+        holdings = []
+        for wallet_data, token_accounts in zip(wallets.values(), wallets_token_accounts):
+            if sol_balances[wallet_data['pubkey']] > 0:
+                holdings.append({'wallet': wallet_data['wallet_name'], 'mint': Portfolio_Scanner.SOL_MINT, 'amount': sol_balances[wallet_data['pubkey']], 'decimals': 9})
+            holdings.extend({'wallet': wallet_data['wallet_name'], **token_account} for token_account in token_accounts)
+        frame = pd.DataFrame(holdings, columns=Portfolio_Scanner.HOLDINGS_COLUMNS)
+        
+        prices = await Portfolio_Scanner.get_prices(frame['mint'].unique().tolist())
+        frame['symbol'] = History_Table.join_tokens(frame['mint'], tokens_frame)['symbol']
+        frame['amount'] = frame['amount'].astype('float64') / 10.0 ** frame['decimals'].astype('int64')
+        frame['price'] = frame['mint'].map(prices).astype('float64')
+        frame['value'] = frame['amount'] * frame['price']
+        return frame[['wallet', 'mint', 'symbol', 'amount', 'price', 'value']]
+    
+    @staticmethod
+    def build_tables(holdings: pd.DataFrame) -> tuple:
+        """Returns (tokens table consolidated across wallets, wallets value table), unpriced holdings count as 0 $."""
+        tokens = holdings.groupby('mint', sort=False).agg(
+            symbol=('symbol', 'first'),
+            amount=('amount', 'sum'),
+            price=('price', 'first'),
+            value=('value', 'sum'),
+            wallets=('wallet', 'nunique'),
+        ).sort_values('value', ascending=False)
+        wallets = holdings.groupby('wallet', sort=False).agg(
+            tokens=('mint', 'nunique'),
+            value=('value', 'sum'),
+        ).sort_values('value', ascending=False)
+        
+        tokens_table = pd.DataFrame({
+            'TOKEN': tokens['symbol'],
+            'AMOUNT': tokens['amount'].round(6),
+            'PRICE': tokens['price'].map(lambda price: f"${price:,.6g}" if pd.notna(price) else "-"),
+            'VALUE': tokens['value'].map(lambda value: f"${value:,.2f}"),
+            'WALLETS': tokens['wallets'],
+        })
+        wallets_table = pd.DataFrame({
+            'WALLET': wallets.index,
+            'TOKENS': wallets['tokens'].to_numpy(),
+            'VALUE': wallets['value'].map(lambda value: f"${value:,.2f}").to_numpy(),
+        })
+        return tokens_table, wallets_table
     
 
+class Watch_Dashboard():
+    """Terminal table drawn once, then only the cells whose value changed are rewritten in place (ANSI cursor moves).
+    
+    columns: {column name: width}, rows: row keys; the footer lines are printed below the table."""
+    
+    ANSI_PATTERN = re.compile(r'\033\[[0-9;]*m')
+    
+    def __init__(self, columns: dict, rows: list, footer_lines: int=0):
+        self.columns = columns
+        self.rows = rows
+        self.footer_lines = footer_lines
+        self.cells = {}
+        self.changed_cells = {}
+        self.footer = []
+        self.changed_footer = False
+    
+    @staticmethod
+    def fit(value, width: int) -> str:
+        """Returns value padded or truncated to width visible characters, colors kept."""
+        value = str(value)
+        visible_length = len(Watch_Dashboard.ANSI_PATTERN.sub('', value))
+        if visible_length > width:
+            return Watch_Dashboard.ANSI_PATTERN.sub('', value)[:width - 1] + "…"
+        return value + " " * (width - visible_length)
+    
+    def get_cell_position(self, row, column) -> tuple:
+        """Returns (lines up from the cursor, column) of a cell, the cursor being under the footer."""
+        lines_up = (len(self.rows) - self.rows.index(row)) + 1 + self.footer_lines
+        x = 1
+        for column_name, width in self.columns.items():
+            if column_name == column:
+                break
+            x += width + 3
+        return lines_up, x + 2
+    
+    def draw(self):
+        """Draws the whole table with empty cells."""
+        widths = list(self.columns.values())
+        print("┌" + "┬".join("─" * (width + 2) for width in widths) + "┐")
+        print("│" + "│".join(f" {Watch_Dashboard.fit(column, width)} " for column, width in self.columns.items()) + "│")
+        print("╞" + "╪".join("═" * (width + 2) for width in widths) + "╡")
+        for _ in self.rows:
+            print("│" + "│".join(" " * (width + 2) for width in widths) + "│")
+        print("└" + "┴".join("─" * (width + 2) for width in widths) + "┘")
+        print("\n" * (self.footer_lines - 1))
+    
+    def set_cell(self, row, column, value):
+        value = Watch_Dashboard.fit(value, self.columns[column])
+        if self.cells.get((row, column)) != value:
+            self.cells[(row, column)] = value
+            self.changed_cells[(row, column)] = value
+    
+    def set_footer(self, lines: list):
+        if lines != self.footer:
+            self.footer = lines
+            self.changed_footer = True
+    
+    def flush(self):
+        """Rewrites the changed cells, the cursor is moved back under the footer."""
+        output = ""
+        for (row, column), value in self.changed_cells.items():
+            lines_up, x = self.get_cell_position(row, column)
+            output += f"\033[{lines_up}A\033[{x}G{value}{c.RESET}\033[{lines_up}B\r"
+        if self.changed_footer:
+            lines_up = self.footer_lines
+            output += f"\033[{lines_up}A"
+            for line in self.footer + [""] * (self.footer_lines - len(self.footer)):
+                output += f"\r\033[2K{line}\n"
+        print(output, end="", flush=True)
+        self.changed_cells.clear()
+        self.changed_footer = False
+
+
 class Jupiter_CLI(Wallet):
     
+    OPEN_ORDERS_URL = "https://jup.ag/api/limit/v1/openOrders"
+    
     def __init__(self, rpc_url: str, private_key: str) -> None:
         super().__init__(rpc_url=rpc_url, private_key=private_key)
     
@@ -532,6 +2494,7 @@ class Jupiter_CLI(Wallet):
             "Limit Order",
             "DCA",
             "Token Sniper",
+            "Trades PnL",
             "Change wallet",
             "Back to main menu",
         ]).execute_async()
@@ -551,6 +2514,11 @@ class Jupiter_CLI(Wallet):
                     await self.token_sniper_menu()
                     await self.main_menu()
                     return
+            case "Trades PnL":
+                await self.display_trades_pnl()
+                await inquirer.text(message="Press ENTER to go back").execute_async()
+                await self.main_menu()
+                return
             case "Change wallet":
                 wallet_id, wallet_private_key = await Wallets_CLI.prompt_select_wallet()
                 if wallet_private_key:
@@ -567,12 +2535,8 @@ class Jupiter_CLI(Wallet):
         
         type_swap (str): swap, limit_order, dca
         """
-        tokens_list = await Jupiter.get_tokens_list(list_type="all")
-        tokens_list_dca = await Jupiter_DCA.get_available_dca_tokens()
-            
-        choices = []
-        for token in tokens_list:
-            choices.append(f"{token['symbol']} ({token['address']})")
+        choices = await Token_Registry.get_choices()
+        tokens_list_dca = await Token_Registry.get_dca_tokens()
         
         # TOKEN TO SELL
         while True:
@@ -694,8 +2658,6 @@ class Jupiter_CLI(Wallet):
     # LIMIT ORDERS
     async def limit_order_menu(self):
         """Jupiter CLI - LIMIT ORDER MENU."""
-        loading_spinner = yaspin(text=f"{c.BLUE}Loading open limit orders{c.RESET}", color="blue")
-        loading_spinner.start()
         f.display_logo()
         print("[JUPITER CLI] [LIMIT ORDER MENU]")
         print()
@@ -707,12 +2669,17 @@ class Jupiter_CLI(Wallet):
             "Back to main menu",
         ]
 
-        open_orders = await Jupiter_CLI.get_open_orders(wallet_address=self.wallet.pubkey().__str__())
+        loading_spinner = yaspin(text=f"{c.BLUE}Loading open limit orders{c.RESET}", color="blue")
+        loading_spinner.start()
+        open_orders, open_orders_table, load_time = await Jupiter_CLI.load_limit_order_menu(wallet_address=self.wallet.pubkey().__str__())
+        loading_spinner.stop()
+        
         if len(open_orders) > 0:
             choices.insert(1, "Cancel Limit Order(s)")
-            await Jupiter_CLI.display_open_orders(wallet_address=self.wallet.pubkey().__str__())
+            print(open_orders_table)
+            print()
+        print(f"Loaded in {round(load_time * 1000)} ms")
         
-        loading_spinner.stop()
         limit_order_prompt_main_menu = await inquirer.select(message="Select menu:", choices=choices).execute_async()
         
         match limit_order_prompt_main_menu:
@@ -776,15 +2743,13 @@ class Jupiter_CLI(Wallet):
                 return
             case "Cancel Limit Order(s)":
                 f.display_logo()
-                
-                loading_spinner = yaspin(text=f"{c.BLUE}Loading open limit orders{c.RESET}", color="blue")
-                loading_spinner.start()
-                open_orders = await Jupiter_CLI.display_open_orders(wallet_address=self.wallet.pubkey().__str__())
+                # Orders loaded with the menu, not requested again
+                print(open_orders_table)
+                print()
                 choices = []
             
                 for order_id, order_data in open_orders.items():
                     choices.append(f"ID {order_id} - {order_data['input_mint']['amount']} ${order_data['input_mint']['symbol']} -> {order_data['output_mint']['amount']} ${order_data['output_mint']['symbol']} (Account address: {order_data['open_order_pubkey']})")
-                loading_spinner.stop()
                 
                 while True:
                     prompt_select_cancel_orders = await inquirer.checkbox(message="Select orders to cancel (Max 10) or press ENTER to skip:", choices=choices).execute_async()
@@ -813,115 +2778,51 @@ class Jupiter_CLI(Wallet):
                 await self.limit_order_menu()
                 return
             case "Display Canceled Orders History":
-                loading_spinner = yaspin(text=f"{c.BLUE}Loading canceled limit orders{c.RESET}", color="blue")
-                loading_spinner.start()
-                tokens_list = await  Jupiter.get_tokens_list(list_type="all")
-                cancel_orders_history = await Jupiter.query_orders_history(wallet_address=self.wallet.pubkey().__str__())
-                data = {
-                    "ID": [],
-                    "CREATED AT": [],
-                    "TOKEN SOLD": [],
-                    "AMOUNT SOLD": [],
-                    "TOKEN BOUGHT": [],
-                    "AMOUNT BOUGHT": [],
-                    "STATE": [],
-                }
-                
-                order_id = 1
-                for order in cancel_orders_history:
-                    data['ID'].append(order_id)
-                    date = datetime.strptime(order['createdAt'], "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%m-%d-%Y %H:%M:%S")
-                    data['CREATED AT'].append(date)
-
-                    token_sold_address = order['inputMint']
-                    token_bought_address = order['outputMint']
-                    
-                    token_sold_decimals = int(next((token.get("decimals", "") for token in tokens_list if token_sold_address == token.get("address", "")), None))
-                    token_sold_symbol = next((token.get("symbol", "") for token in tokens_list if token_sold_address == token.get("address", "")), None)
-                    data['TOKEN SOLD'].append(token_sold_symbol)
-                    amount_sold = float(order['inAmount']) / 10 ** token_sold_decimals
-                    data['AMOUNT SOLD'].append(amount_sold)
-                    
-                    token_bought_decimals = int(next((token.get("decimals", "") for token in tokens_list if token_bought_address == token.get("address", "")), None))
-                    token_bought_symbol = next((token.get("symbol", "") for token in tokens_list if token_bought_address == token.get("address", "")), None)
-                    data['TOKEN BOUGHT'].append(token_bought_symbol)
-                    amount_bought = float(order['outAmount'])  / 10 ** token_bought_decimals
-                    data['AMOUNT BOUGHT'].append(amount_bought)
-                    
-                    state = order['state']
-                    data['STATE'] = state
-                    
-                    order_id += 1
-                    
-                dataframe = tabulate(pd.DataFrame(data), headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
-                loading_spinner.stop()
-                print(dataframe)
-                print()
-                
-                await inquirer.text(message="\nPress ENTER to continue").execute_async()
+                await History_Table.display_stream(
+                    pages=History_Fetcher.stream(History_Fetcher.ORDERS_HISTORY_URL, wallet_address=self.wallet.pubkey().__str__()),
+                    build_table=lambda records, first_id: History_Table.build_orders_history(records, input_mint_key='inputMint', output_mint_key='outputMint', first_id=first_id),
+                    title="[JUPITER CLI] [LIMIT ORDER MENU] [CANCELED ORDERS HISTORY]"
+                )
                 await self.limit_order_menu()
                 return
             case "Display Filled Orders History":
-                loading_spinner = yaspin(text=f"{c.BLUE}Loading filled limit orders{c.RESET}", color="blue")
-                loading_spinner.start()
-                tokens_list = await  Jupiter.get_tokens_list(list_type="all")
-                filled_orders_history = await Jupiter.query_trades_history(wallet_address=self.wallet.pubkey().__str__())
-                data = {
-                    "ID": [],
-                    "CREATED AT": [],
-                    "TOKEN SOLD": [],
-                    "AMOUNT SOLD": [],
-                    "TOKEN BOUGHT": [],
-                    "AMOUNT BOUGHT": [],
-                    "STATE": [],
-                }
-                
-                order_id = 1
-                for order in filled_orders_history:
-                    data['ID'].append(order_id)
-                    date = datetime.strptime(order['createdAt'], "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%m-%d-%Y %H:%M:%S")
-                    data['CREATED AT'].append(date)
-
-                    token_sold_address = order['order']['inputMint']
-                    token_bought_address = order['order']['outputMint']
-                    
-                    token_sold_decimals = int(next((token.get("decimals", "") for token in tokens_list if token_sold_address == token.get("address", "")), None))
-                    token_sold_symbol = next((token.get("symbol", "") for token in tokens_list if token_sold_address == token.get("address", "")), None)
-                    data['TOKEN SOLD'].append(token_sold_symbol)
-                    amount_sold = float(order['inAmount']) / 10 ** token_sold_decimals
-                    data['AMOUNT SOLD'].append(amount_sold)
-                    
-                    token_bought_decimals = int(next((token.get("decimals", "") for token in tokens_list if token_bought_address == token.get("address", "")), None))
-                    token_bought_symbol = next((token.get("symbol", "") for token in tokens_list if token_bought_address == token.get("address", "")), None)
-                    data['TOKEN BOUGHT'].append(token_bought_symbol)
-                    amount_bought = float(order['outAmount'])  / 10 ** token_sold_decimals
-                    data['AMOUNT BOUGHT'].append(amount_bought)
-                    
-                    data['STATE'] = "FILLED"
-                    
-                    order_id += 1
-                    
-                dataframe = tabulate(pd.DataFrame(data), headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
-                
-                loading_spinner.stop()
-                print(dataframe)
-                print()
-                
-                await inquirer.text(message="\nPress ENTER to continue").execute_async()
+                await History_Table.display_stream(
+                    pages=History_Fetcher.stream(History_Fetcher.TRADES_HISTORY_URL, wallet_address=self.wallet.pubkey().__str__()),
+                    build_table=lambda records, first_id: History_Table.build_orders_history(records, input_mint_key='order.inputMint', output_mint_key='order.outputMint', state="FILLED", first_id=first_id),
+                    title="[JUPITER CLI] [LIMIT ORDER MENU] [FILLED ORDERS HISTORY]"
+                )
                 await self.limit_order_menu()
                 return
             case "Back to main menu":
                 await self.main_menu()
                 return
     
+    @staticmethod
+    async def load_limit_order_menu(wallet_address: str) -> tuple:
+        """Loads everything the limit order menu needs concurrently, each resource once: tokens list, open orders
+        and the newest page of both histories (cached for the history displays).
+        
+        Returns: (open orders, rendered open orders table, seconds taken)"""
+        start_time = time.perf_counter()
+        _, open_orders, _, _ = await asyncio.gather(
+            Token_Registry.get_tokens(),
+            Jupiter_CLI.get_open_orders(wallet_address=wallet_address),
+            History_Fetcher.prefetch(History_Fetcher.ORDERS_HISTORY_URL, wallet_address=wallet_address),
+            History_Fetcher.prefetch(History_Fetcher.TRADES_HISTORY_URL, wallet_address=wallet_address),
+        )
+        open_orders_table = Jupiter_CLI.build_open_orders_table(open_orders)
+        return open_orders, open_orders_table, time.perf_counter() - start_time
+    
     @staticmethod
     async def get_open_orders(wallet_address: str) -> dict:
         """Returns all open orders in a correct format."""
         
-        loading_spinner = yaspin(text=f"{c.BLUE}Loading open limit orders{c.RESET}", color="blue")
-        loading_spinner.start()
-        tokens_list = await  Jupiter.get_tokens_list(list_type="all")
-        open_orders_list = await Jupiter.query_open_orders(wallet_address=wallet_address)
+        # Not Jupiter.query_open_orders: it blocks the event loop (sync request), the menu loads everything concurrently
+        async with f.get_async_http_client(timeout=30) as http_client:
+            response = await http_client.get(Jupiter_CLI.OPEN_ORDERS_URL, params={'wallet': wallet_address})
+        response.raise_for_status()
+        open_orders_list = response.json()
+        tokens = await Token_Registry.resolve([open_order['account'][key] for open_order in open_orders_list for key in ('inputMint', 'outputMint')])
         
         open_orders = {}
         
@@ -935,15 +2836,15 @@ class Jupiter_CLI(Wallet):
             else:
                 expired_at = "Never"
             
-            input_mint_address = open_order['account']['inputMint']
+            input_mint = tokens[open_order['account']['inputMint']]
             input_mint_amount = int(open_order['account']['inAmount'])
-            input_mint_symbol = next((token.get("symbol", "") for token in tokens_list if input_mint_address == token.get("address", "")), None)
-            input_mint_decimals = int(next((token.get("decimals", "") for token in tokens_list if input_mint_address == token.get("address", "")), None))
+            input_mint_symbol = input_mint['symbol']
+            input_mint_decimals = input_mint['decimals']
             
-            output_mint_address = open_order['account']['outputMint']
+            output_mint = tokens[open_order['account']['outputMint']]
             output_mint_amount = int(open_order['account']['outAmount'])
-            output_mint_symbol = next((token.get("symbol", "") for token in tokens_list if output_mint_address == token.get("address", "")), None)
-            output_mint_decimals = int(next((token.get("decimals", "") for token in tokens_list if output_mint_address == token.get("address", "")), None))
+            output_mint_symbol = output_mint['symbol']
+            output_mint_decimals = output_mint['decimals']
             
             open_orders[order_id] = {
                 'open_order_pubkey': open_order_pubkey, 
@@ -959,16 +2860,11 @@ class Jupiter_CLI(Wallet):
             }
             order_id += 1
         
-        loading_spinner.stop()
         return open_orders
 
     @staticmethod
-    async def display_open_orders(wallet_address: str) -> dict:
-        """Displays current open orders and return open orders dict."""
-        loading_spinner = yaspin(text=f"{c.BLUE}Loading open limit orders{c.RESET}", color="blue")
-        loading_spinner.start()
-        open_orders = await Jupiter_CLI.get_open_orders(wallet_address=wallet_address)
-        
+    def build_open_orders_table(open_orders: dict) -> str:
+        """Returns open orders table."""
         data = {
             'ID': [],
             'EXPIRED AT': [],
@@ -984,12 +2880,7 @@ class Jupiter_CLI(Wallet):
             data['BUY TOKEN'].append(f"{open_order_data['output_mint']['amount']} ${open_order_data['output_mint']['symbol']}")
             data['ACCOUNT ADDRESS'].append(open_order_data['open_order_pubkey'])
             
-        dataframe = tabulate(pd.DataFrame(data), headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
-        loading_spinner.stop()
-        
-        print(dataframe)
-        print()
-        return open_orders
+        return tabulate(pd.DataFrame(data), headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
 
 
     # DCA #
@@ -1125,74 +3016,51 @@ class Jupiter_CLI(Wallet):
     async def display_dca_accounts(self, wallet_address: str):
         loading_spinner = yaspin(text=f"{c.BLUE}Loading DCA Accounts{c.RESET}", color="blue")
         loading_spinner.start()
-        tokens_list = await  Jupiter.get_tokens_list(list_type="all")
         get_dca_accounts = await self.jupiter.dca.fetch_user_dca_accounts(wallet_address=wallet_address, status=0)
-        loading_spinner.stop()
-        
         dca_accounts = get_dca_accounts['data']['dcaAccounts']
-        
-        data = {
-            'ID': [],
-            'CREATED AT': [],
-            'END AT': [],
-            'SELLING': [],
-            'SELLING PER CYCLE': [],
-            "BUYING": [],
-            'CYCLE FREQUENCY': [],
-            'NEXT ORDER AT': [],
-            'ORDERS LEFT': []
-        }
-
-        dca_account_id = 1
-
-        for dca_account_data in dca_accounts:
-            data['ID'].append(dca_account_id)
-            
-            created_at = datetime.strptime(dca_account_data['createdAt'], "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%m-%d-%y %H:%M")
-            data['CREATED AT'].append(created_at)
-            
-            end_at = int(dca_account_data['unfilledAmount']) / int(dca_account_data['inAmountPerCycle']) * int(dca_account_data['cycleFrequency'])
-            data['END AT'].append(datetime.fromtimestamp(end_at).strftime("%m-%d-%y %H:%M"))
-            
-            input_mint_address = dca_account_data['inputMint']
-            input_mint_amount = int(dca_account_data['inDeposited'])
-            input_mint_symbol = next((token.get("symbol", "") for token in tokens_list if input_mint_address == token.get("address", "")), None)
-            input_mint_decimals = int(next((token.get("decimals", "") for token in tokens_list if input_mint_address == token.get("address", "")), None))
-            data['SELLING'].append(f"{input_mint_amount/10**input_mint_decimals} ${input_mint_symbol}")
-            data['SELLING PER CYCLE'].append(f"{int(dca_account_data['inAmountPerCycle'])/10**input_mint_decimals} ${input_mint_symbol}")
-            
-            output_mint_address = dca_account_data['outputMint']
-            output_mint_amount = int(dca_account_data['unfilledAmount'])
-            output_mint_symbol = next((token.get("symbol", "") for token in tokens_list if output_mint_address == token.get("address", "")), None)
-            output_mint_decimals = int(next((token.get("decimals", "") for token in tokens_list if output_mint_address == token.get("address", "")), None))
-            data['BUYING'].append(f"{output_mint_amount/10**output_mint_decimals} ${output_mint_symbol}")
-            
-            data['CYCLE FREQUENCY'].append(f.get_timestamp_formatted(int(dca_account_data['cycleFrequency'])))
-            
-            # NEXT ORDER AT
-            creation_unix_timestamp = int(datetime.fromisoformat(dca_account_data['createdAt'].replace('Z', '+00:00')).timestamp())
-            date_now_unix_timestamp = int(time.time())
-            time_elapsed = date_now_unix_timestamp - creation_unix_timestamp
-            cycle_frequency = int(dca_account_data['cycleFrequency'])
-            total_orders = int(int(dca_account_data['inDeposited']) / int(dca_account_data['inAmountPerCycle']))
-            total_orders_filled = int(len(dca_account_data['fills']))
-            total_orders_unfilled = total_orders - total_orders_filled
-
-            next_order_time_unix_timestamp = creation_unix_timestamp + (cycle_frequency * (total_orders_filled + 1))
-            next_order_time_date = datetime.fromtimestamp(next_order_time_unix_timestamp).strftime("%m-%d-%y %H:%M")
-            data['NEXT ORDER AT'].append(next_order_time_date)
-            
-            data['ORDERS LEFT'].append(total_orders_unfilled)
-            
-            dca_account_id += 1
-            
-
-        dataframe = tabulate(pd.DataFrame(data), headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
+        Trade_Ledger.add_dca_fills(wallet_address, dca_accounts)
+        dataframe = History_Table.render(await History_Table.build_dca_accounts(dca_accounts))
         loading_spinner.stop()
         
         print(dataframe)
         print()
         return dca_accounts
+    
+    async def get_position_value(self, position: dict) -> float:
+        """Returns the raw quote amount the position held amount sells for, None if there is no route."""
+        amount = int(position['AMOUNT'])
+        if amount == 0:
+            return 0
+        try:
+            quote_response = await Quote_Service.get_quote(
+                input_mint=position['MINT'],
+                output_mint=position['QUOTE_MINT'],
+                amount=amount,
+                slippage_bps=50,
+                exact=False
+            )
+            return float(quote_response['outAmount'])
+        except (httpx.HTTPError, KeyError, ValueError):
+            return None
+    
+    async def display_trades_pnl(self):
+        """Synchronizes the trades ledger of the wallet then prints its positions with realized & unrealized PnL."""
+        wallet_address = self.wallet.pubkey().__str__()
+        loading_spinner = yaspin(text=f"{c.BLUE}Synchronizing trades{c.RESET}", color="blue")
+        loading_spinner.start()
+        try:
+            await Trade_Ledger.sync_limit_fills(wallet_address)
+        except (httpx.HTTPError, KeyError, ValueError):
+            # Stored trades are still displayed
+            pass
+        positions = Trade_Ledger.get_positions(wallet_address)
+        values = await asyncio.gather(*[self.get_position_value(position) for position in positions])
+        dataframe = History_Table.render(await History_Table.build_positions(positions, values))
+        loading_spinner.stop()
+        
+        print("[TRADES PNL] (limit orders, DCA & sniper trades against SOL/USDC/USDT)")
+        print(dataframe)
+        print()
 
 
     # TOKEN SNIPER #
@@ -1204,9 +3072,17 @@ class Jupiter_CLI(Wallet):
         
         await Jupiter_CLI.display_tokens_snipe()
 
+        engine_status = Sniper_Supervisor.get_engine_status()
+        if engine_status['running']:
+            print(f"Sniper engine: {c.GREEN}RUNNING{c.RESET} (PID {engine_status['pid']} - {engine_status['restarts']} restarts)")
+        else:
+            print(f"Sniper engine: {c.RED}STOPPED{c.RESET}")
+        print()
+
         choices = [
             "Add a token to snipe",
             "Watch token",
+            "Snipers health",
             "Edit tokens",
             "Back to main menu",
         ]
@@ -1225,18 +3101,17 @@ class Jupiter_CLI(Wallet):
                         choices.append(f"ID {token_id}")
                 choices.append("Back to main menu")
                 
-                prompt_select_token = await inquirer.select(message="Select token to watch:", choices=choices).execute_async()
+                prompt_select_tokens = await inquirer.checkbox(message="Select token(s) to watch with SPACEBAR or press ENTER to watch all:", choices=choices).execute_async()
                 
-                if prompt_select_token != "Back to main menu":
-                    selected_token = re.search(r'\d+', prompt_select_token).group()
-                    watch_process = Process(target=Jupiter_CLI.start_watch_async, args=(selected_token,))
-                    
-                    watch_process.start()
-                    
-                    prompt_select_token = await inquirer.text(message="").execute_async()
-                    watch_process.terminate()
-                    watch_process.join()
+                if "Back to main menu" not in prompt_select_tokens:
+                    selected_tokens = [re.search(r'\d+', choice).group() for choice in (prompt_select_tokens or choices[:-1])]
+                    if selected_tokens:
+                        await Jupiter_CLI.watch(selected_tokens)
                 
+                await self.token_sniper_menu()
+                return
+            case "Snipers health":
+                await Jupiter_CLI.watch_snipers_health()
                 await self.token_sniper_menu()
                 return
             case "Edit tokens":
@@ -1284,6 +3159,59 @@ class Jupiter_CLI(Wallet):
         print(dataframe)
         print()
 
+    @staticmethod
+    async def display_snipers_health():
+        tokens_snipe = await Config_CLI.get_tokens_data()
+        snipers_health = Tokens_Store.get_snipers_health()
+        
+        data = {
+            'ID': [],
+            'NAME': [],
+            'STATE': [],
+            'HEARTBEAT': [],
+            'QUOTE LATENCY': [],
+            'LOOPS/S': [],
+            'ERRORS': [],
+            'RESTARTS': [],
+        }
+        
+        now = time.time()
+        for token_id, health in snipers_health.items():
+            data['ID'].append(token_id)
+            data['NAME'].append(tokens_snipe[token_id]['NAME'] if token_id in tokens_snipe else "-")
+            # Report not refreshed: the engine is not running
+            if now - health['updated_at'] > Sniper_Supervisor.HEALTH_INTERVAL * 5:
+                data['STATE'].append(f"{c.RED}NO REPORT{c.RESET}")
+            elif health['state'] == "CRASHED":
+                data['STATE'].append(f"{c.RED}{health['state']}{c.RESET}")
+            else:
+                data['STATE'].append(health['state'])
+            data['HEARTBEAT'].append(f"{round(now - health['heartbeat'])}s ago")
+            data['QUOTE LATENCY'].append(f"{round(health['quote_latency'] * 1000)} ms" if health['quote_latency'] is not None else "-")
+            data['LOOPS/S'].append(round(health['loop_rate'], 2))
+            data['ERRORS'].append(health['errors'])
+            data['RESTARTS'].append(health['restarts'])
+        
+        dataframe = tabulate(pd.DataFrame(data), headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
+        
+        print(dataframe)
+        print()
+    
+    @staticmethod
+    async def watch_snipers_health():
+        """Redraws snipers health table every HEALTH_INTERVAL seconds until ENTER is pressed."""
+        wait_enter_task = asyncio.create_task(asyncio.to_thread(input))
+        while not wait_enter_task.done():
+            f.display_logo()
+            print("[JUPITER CLI] [SNIPERS HEALTH]")
+            print()
+            engine_status = Sniper_Supervisor.get_engine_status()
+            print(f"Sniper engine: {'RUNNING' if engine_status['running'] else 'STOPPED'} - {engine_status['restarts']} restarts")
+            print()
+            await Jupiter_CLI.display_snipers_health()
+            print("Press ENTER to go back")
+            await asyncio.wait([wait_enter_task], timeout=Sniper_Supervisor.HEALTH_INTERVAL)
+    
     async def add_token_snipe(self):
         """PROMPT ADD TOKEN TO SNIPE."""
         f.display_logo()
@@ -1303,12 +3231,11 @@ class Jupiter_CLI(Wallet):
                 print(f"{c.RED}! Please enter a valid token address")
         
         config_data = await Config_CLI.get_config_data()
-        client = AsyncClient(endpoint=config_data['RPC_URL'])
         wallet_id, wallet_private_key = await Wallets_CLI.prompt_select_wallet()
         # wallet_id = 1
         wallet = Wallet(rpc_url=config_data['RPC_URL'], private_key=wallet_private_key)
-        get_wallet_sol_balance =  await client.get_balance(pubkey=wallet.wallet.pubkey())
-        sol_price = f.get_crypto_price("SOL")
+        get_wallet_sol_balance =  await wallet.client.get_balance(pubkey=wallet.wallet.pubkey())
+        sol_price = await f.get_crypto_price_async("SOL")
         sol_balance = round(get_wallet_sol_balance.value / 10 ** 9, 4)
         sol_balance_usd = round(sol_balance * sol_price, 2) - 0.05
         
@@ -1361,7 +3288,6 @@ class Jupiter_CLI(Wallet):
             
         confirm = await inquirer.select(message="Confirm token?", choices=["Yes", "No"]).execute_async()
         if confirm == "Yes":
-            tokens_data = await Config_CLI.get_tokens_data()
             token_data = {
                 'NAME': token_name,
                 'ADDRESS': token_address,
@@ -1373,15 +3299,11 @@ class Jupiter_CLI(Wallet):
                 'TIMESTAMP': timestamp,
                 'STATUS': 'NOT IN',
             }
-            tokens_data[len(tokens_data) + 1] = token_data
-            await Config_CLI.edit_tokens_file(tokens_data)
+            Tokens_Store.add_token(token_data)
             await inquirer.text(message="\nPress ENTER to continue").execute_async()
         
-        # Restart Token Snipers processes to apply the changes
-        for p in snipers_processes:
-            p.terminate()
-        snipers_processes.clear()
-        await Token_Sniper.run()
+        # Only the added/edited snipers are started or updated
+        await Token_Sniper.reload()
         return
     
     async def edit_tokens_snipe(self):
@@ -1395,10 +3317,9 @@ class Jupiter_CLI(Wallet):
         
         config_data = await Config_CLI.get_config_data()
         wallets_data = await Wallets_CLI.get_wallets()
-        client = AsyncClient(endpoint=config_data['RPC_URL'])
-        wallet = Wallet(rpc_url=config_data['RPC_URL'], private_key=wallets_data[str(tokens_snipe[token_id]['WALLET'])]['private_key'])
-        get_wallet_sol_balance =  await client.get_balance(pubkey=wallet.wallet.pubkey())
-        sol_price = f.get_crypto_price("SOL")
+        wallet = Wallet(rpc_url=config_data['RPC_URL'], private_key=wallets_data[str(tokens_snipe[selected_token]['WALLET'])]['private_key'])
+        get_wallet_sol_balance =  await wallet.client.get_balance(pubkey=wallet.wallet.pubkey())
+        sol_price = await f.get_crypto_price_async("SOL")
         sol_balance = round(get_wallet_sol_balance.value / 10 ** 9, 4)
         sol_balance_usd = round(sol_balance * sol_price, 2) - 0.05
         
@@ -1424,7 +3345,7 @@ class Jupiter_CLI(Wallet):
                 case "Name":
                     token_name = await inquirer.text(message="Enter name for this project/token:").execute_async()
                     tokens_snipe[selected_token]['NAME'] = token_name
-                    await Config_CLI.edit_tokens_file(tokens_snipe)
+                    Tokens_Store.update_token(selected_token, {'NAME': token_name})
                     print(f"{c.GREEN}Token ID {selected_token}: Name changed!{c.RESET}")
                 case "Address":
                     while True:
@@ -1435,35 +3356,33 @@ class Jupiter_CLI(Wallet):
                         except:
                             print(f"{c.RED}! Please enter a valid token address")
                     tokens_snipe[selected_token]['ADDRESS'] = token_address
-                    await Config_CLI.edit_tokens_file(tokens_snipe)
+                    Tokens_Store.update_token(selected_token, {'ADDRESS': token_address})
                     print(f"{c.GREEN}Token ID {selected_token}: Address changed{c.RESET}")
                 case "Selected Wallet":
-                    config_data = await Config_CLI.get_config_data()
-                    client = AsyncClient(endpoint=config_data['RPC_URL'])
                     wallet_id, wallet_private_key = await Wallets_CLI.prompt_select_wallet()
                     tokens_snipe[selected_token]['WALLET'] = int(wallet_id)
-                    await Config_CLI.edit_tokens_file(tokens_snipe)
+                    Tokens_Store.update_token(selected_token, {'WALLET': int(wallet_id)})
                     print(f"{c.GREEN}Token ID {selected_token}: Selected Wallet {wallet_id}{c.RESET}")
                 case "Buy Amount":
                     amount_usd_to_buy = await inquirer.number(message="Enter amount $ to buy:", float_allowed=True, max_allowed=sol_balance_usd).execute_async()
                     tokens_snipe[selected_token]['BUY_AMOUNT'] = float(amount_usd_to_buy)
-                    await Config_CLI.edit_tokens_file(tokens_snipe)
+                    Tokens_Store.update_token(selected_token, {'BUY_AMOUNT': float(amount_usd_to_buy)})
                     print(f"{c.GREEN}Token ID {selected_token}: Buy Amount ${amount_usd_to_buy}{c.RESET}")
                 case "Take Profit":
                     take_profit_usd = await inquirer.number(message="Enter Take Profit ($) or press ENTER:", float_allowed=True, min_allowed=float(tokens_snipe[selected_token]['BUY_AMOUNT'])).execute_async()
                     tokens_snipe[selected_token]['TAKE_PROFIT'] = float(take_profit_usd)
-                    await Config_CLI.edit_tokens_file(tokens_snipe)
+                    Tokens_Store.update_token(selected_token, {'TAKE_PROFIT': float(take_profit_usd)})
                     print(f"{c.GREEN}Token ID {selected_token}: Take Profit ${take_profit_usd}{c.RESET}")
                 case "Stop Loss":
                     stop_loss_usd = await inquirer.number(message="Enter Stop Loss ($) or press ENTER:", float_allowed=True, max_allowed=float(tokens_snipe[selected_token]['BUY_AMOUNT'])).execute_async()
                     tokens_snipe[selected_token]['STOP_LOSS'] = float(stop_loss_usd)
-                    await Config_CLI.edit_tokens_file(tokens_snipe)
+                    Tokens_Store.update_token(selected_token, {'STOP_LOSS': float(stop_loss_usd)})
                     print(f"{c.GREEN}Token ID {selected_token}: Stop Loss ${stop_loss_usd}{c.RESET}")
                 case "Slippage":
                     slippage_bps = await inquirer.number(message="Enter Slippage (%) or press ENTER:", float_allowed=True, max_allowed=100.0, min_allowed=0.01, default=1).execute_async()
                     slippage_bps = float(slippage_bps) * 100
                     tokens_snipe[selected_token]['SLIPPAGE_BPS'] = int(slippage_bps)
-                    await Config_CLI.edit_tokens_file(tokens_snipe)
+                    Tokens_Store.update_token(selected_token, {'SLIPPAGE_BPS': int(slippage_bps)})
                     print(f"{c.GREEN}Token ID {selected_token}: Slippage {slippage_bps}%{c.RESET}")
                 case "Timestamp":
                     while True:
@@ -1489,121 +3408,136 @@ class Jupiter_CLI(Wallet):
                             break
                             
                     tokens_snipe[selected_token]['TIMESTAMP'] = timestamp
-                    await Config_CLI.edit_tokens_file(tokens_snipe)
+                    Tokens_Store.update_token(selected_token, {'TIMESTAMP': timestamp})
                     print(f"{c.GREEN}Token ID {selected_token}: Timestamp changed{c.RESET}")
                 case "Delete":
                     confirm = await inquirer.select(message=f"Confirm delete token ID {selected_token}?", choices=["Yes", "No"]).execute_async()
                     if confirm == "Yes":
                         del tokens_snipe[selected_token]
-                        await Config_CLI.edit_tokens_file(tokens_snipe)
+                        Tokens_Store.delete_token(selected_token)
                         break
                 case "Back to main menu":
                     break
             
-        # Restart Token Snipers processes to apply the changes
-        for p in snipers_processes:
-            p.terminate()
-        snipers_processes.clear()
-        await Token_Sniper.run()
-    
-    def start_watch_async(token_id):
-        asyncio.run(Jupiter_CLI.watch(token_id))
+        # Only the added/edited snipers are started or updated
+        await Token_Sniper.reload()
     
     @staticmethod
-    async def watch(token_id):
+    async def watch(token_ids: list):
+        """Jupiter CLI - TOKEN SNIPER WATCH: live dashboard of several sniped tokens until ENTER is pressed.
+        
+        Balances are pushed by the account subscriber (unsubscribed on exit), price and quotes are fetched concurrently
+        every WATCH_REFRESH_RATE seconds (config.json) and only the cells whose value changed are redrawn."""
         tokens_snipe = await Config_CLI.get_tokens_data()
         config_data = await Config_CLI.get_config_data()
         wallets = await Wallets_CLI.get_wallets()
-        
-        token_name = tokens_snipe[token_id]['NAME']
-        token_address = tokens_snipe[token_id]['ADDRESS']
-        wallet = Wallet(rpc_url=config_data['RPC_URL'], private_key=wallets[token_id]['private_key'])
-        token_account = await wallet.get_token_mint_account(token_address)
-        buy_amount = tokens_snipe[token_id]['BUY_AMOUNT']
-        take_profit = tokens_snipe[token_id]['TAKE_PROFIT']
-        stop_loss = tokens_snipe[token_id]['STOP_LOSS']
-        slippage_bps = tokens_snipe[token_id]['SLIPPAGE_BPS']
-        timestamp = tokens_snipe[token_id]['TIMESTAMP']
-        
-        async_client = AsyncClient(config_data['RPC_URL'])
-        jupiter = Jupiter(async_client, wallets[token_id]['private_key'])
-        
-        while True:
-            """Jupiter CLI - TOKEN SNIPER WATCH"""
+        refresh_rate = float(config_data.get('WATCH_REFRESH_RATE', 2))
+        
+        snipers_wallets = {}
+        for token_id in token_ids:
+            wallet_id = str(tokens_snipe[token_id]['WALLET'])
+            if wallet_id not in snipers_wallets:
+                snipers_wallets[wallet_id] = Wallet(rpc_url=config_data['RPC_URL'], private_key=wallets[wallet_id]['private_key'])
+        token_accounts = await asyncio.gather(*[
+            snipers_wallets[str(tokens_snipe[token_id]['WALLET'])].get_token_mint_account(tokens_snipe[token_id]['ADDRESS'])
+            for token_id in token_ids
+        ])
+        token_accounts = dict(zip(token_ids, token_accounts))
+        token_balances = await asyncio.gather(*[
+            snipers_wallets[str(tokens_snipe[token_id]['WALLET'])].get_token_balance(token_mint_account=token_accounts[token_id])
+            for token_id in token_ids
+        ])
+        account_subscriber = Account_Subscriber.get_subscriber()
+        for token_id, token_balance in zip(token_ids, token_balances):
+            await account_subscriber.subscribe(token_account=token_accounts[token_id], balance=token_balance)
+        
+        try:
+            async def get_value_sol(token_id: str, token_balance: dict) -> float:
+                if token_balance is None or int(token_balance['balance']['int']) == 0:
+                    return None
+                quote_response = await Quote_Service.get_quote(
+                    input_mint=tokens_snipe[token_id]['ADDRESS'],
+                    output_mint='So11111111111111111111111111111111111111112',
+                    amount=token_balance['balance']['int'],
+                    slippage_bps=int(tokens_snipe[token_id]['SLIPPAGE_BPS']),
+                    exact=False
+                )
+                return int(quote_response['outAmount']) / 10 ** 9
+        
+            dashboard = Watch_Dashboard(columns={
+                'ID': 4,
+                'NAME': 16,
+                'STATUS': 19,
+                'BALANCE': 14,
+                'VALUE USD': 11,
+                'BUY AMOUNT': 11,
+                'TAKE PROFIT': 11,
+                'STOP LOSS': 11,
+                'PnL $': 10,
+                'PnL %': 9,
+                'DATE LAUNCH': 14,
+            }, rows=token_ids, footer_lines=3)
             f.display_logo()
-            print("[JUPITER CLI] [TOKEN SNIPER MENU]")
+            print("[JUPITER CLI] [TOKEN SNIPER WATCH]")
             print()
-            
-            wallet_token_info = await wallet.get_token_balance(token_mint_account=token_account)
-            print(f"WATCHING {token_name} ({token_address})")
-            loading_spinner = yaspin(text=f"{c.BLUE}Loading token data{c.RESET}", color="blue")
-            loading_spinner.start()
-        
-            sol_price = f.get_crypto_price('SOL')
-            
-            if timestamp is None:
-                launch_date = "NO DATE LAUNCH"
-            else:
-                launch_date = datetime.fromtimestamp(int(timestamp)).strftime('%m-%d-%y %H:%M')
-            
-            if int(wallet_token_info['balance']['int']) == 0:
-                
-                data = {
-                    f'{c.BLUE}BUY AMOUNT{c.RESET}': [f"{c.BLUE}${buy_amount}{c.RESET}"],
-                    f'{c.GREEN}TAKE PROFIT{c.RESET}': [f"{c.GREEN}${take_profit}{c.RESET}"],
-                    f'{c.RED}STOP LOSS{c.RESET}': [f"{c.RED}${stop_loss}{c.RESET}"],
-                    'SLIPPAGE': [f"{slippage_bps/100}%"],
-                    'DATE LAUNCH': [launch_date],
-                    'STATUS': ['NOT IN']
-                }
-                dataframe = tabulate(pd.DataFrame(data), headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
-                
-            elif int(wallet_token_info['balance']['int']) > 0:
-                
-                get_out_amount = await jupiter.quote(
-                    input_mint=token_address,
-                    output_mint='So11111111111111111111111111111111111111112',
-                    amount=wallet_token_info['balance']['int'],
-                    slippage_bps=int(slippage_bps)
+            dashboard.draw()
+        
+            wait_enter_task = asyncio.create_task(asyncio.to_thread(input))
+            while not wait_enter_task.done():
+                # Status is written by the sniper engine
+                tokens_status = await Config_CLI.get_tokens_data()
+                token_balances = {token_id: account_subscriber.get_balance(token_accounts[token_id]) for token_id in token_ids}
+                sol_price, values_sol = await asyncio.gather(
+                    f.get_crypto_price_async('SOL'),
+                    asyncio.gather(*[get_value_sol(token_id, token_balances[token_id]) for token_id in token_ids], return_exceptions=True)
                 )
-                out_amount = int(get_out_amount['outAmount']) / 10 ** 9 * sol_price
-                
-                amount_token = round(wallet_token_info['balance']['float'], 5)
-                amount_usd = round(out_amount, 2)
-                pnl_usd = round(amount_usd - buy_amount, 2)
-                if pnl_usd >= 0:
-                    pnl_usd_title = f"{c.GREEN}PnL ${c.RESET}"
-                    pnl_usd = f"{c.GREEN}${pnl_usd}{c.RESET}"
-                else:
-                    pnl_usd_title = f"{c.RED}PnL ${c.RESET}"
-                    pnl_usd = f"{c.RED}${pnl_usd}{c.RESET}"
-                    
-                pnl_percentage = round((amount_usd - buy_amount)/buy_amount*100, 2)
-                if pnl_percentage >= 0:
-                    pnl_percentage_title = f"{c.GREEN}PnL %{c.RESET}"
-                    pnl_percentage = f"{c.GREEN}{pnl_percentage}%{c.RESET}"
-                else:
-                    pnl_percentage_title = f"{c.RED}PnL %{c.RESET}"
-                    pnl_percentage = f"{c.RED}{pnl_percentage}%{c.RESET}"
-                
-                data = {
-                    f'{c.BLUE}AMOUNT ${token_name}{c.RESET}': [f"{c.BLUE}{amount_token}{c.RESET}"],
-                    f'{c.BLUE}VALUE USD{c.RESET}': [f"{c.BLUE}${amount_usd}{c.RESET}"],
-                    f'{c.GREEN}TAKE PROFIT{c.RESET}': [f"{c.GREEN}${take_profit}{c.RESET}"],
-                    f'{c.RED}STOP LOSS{c.RESET}': [f"{c.RED}${stop_loss}{c.RESET}"],
-                    'SLIPPAGE': [f"{slippage_bps/100}%"],
-                    f'{pnl_usd_title}': [f'{pnl_usd}'],
-                    f'{pnl_percentage_title}': [f'{pnl_percentage}']
-                    
-                }
-                dataframe = tabulate(pd.DataFrame(data), headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center")
-                
             
-            loading_spinner.stop()
-            sleep_time = random.uniform(5, 10)
-            print(dataframe)
-            print(f"\nRefresh in {round(sleep_time, 2)} secs\nPress ENTER to stop watching ")
-            time.sleep(sleep_time)
+                for token_id, value_sol in zip(token_ids, values_sol):
+                    token_data = tokens_snipe[token_id]
+                    token_balance = token_balances[token_id]
+                    status = tokens_status[token_id]['STATUS'] if token_id in tokens_status else "DELETED"
+                    cells = {
+                        'ID': token_id,
+                        'NAME': token_data['NAME'],
+                        'STATUS': status,
+                        'BALANCE': round(token_balance['balance']['float'], 5) if token_balance is not None else "-",
+                        'BUY AMOUNT': f"{c.BLUE}${token_data['BUY_AMOUNT']}{c.RESET}",
+                        'TAKE PROFIT': f"{c.GREEN}${token_data['TAKE_PROFIT']}{c.RESET}",
+                        'STOP LOSS': f"{c.RED}${token_data['STOP_LOSS']}{c.RESET}",
+                        'DATE LAUNCH': datetime.fromtimestamp(int(token_data['TIMESTAMP'])).strftime('%m-%d-%y %H:%M') if token_data['TIMESTAMP'] else "NO DATE LAUNCH",
+                    }
+                    # Quote failed: previous values are kept
+                    if isinstance(value_sol, Exception):
+                        pass
+                    elif value_sol is None:
+                        cells.update({'VALUE USD': "-", 'PnL $': "-", 'PnL %': "-"})
+                    else:
+                        value_usd = value_sol * sol_price
+                        pnl_usd = round(value_usd - token_data['BUY_AMOUNT'], 2)
+                        pnl_percentage = round((value_usd - token_data['BUY_AMOUNT']) / token_data['BUY_AMOUNT'] * 100, 2)
+                        pnl_color = c.GREEN if pnl_usd >= 0 else c.RED
+                        cells.update({
+                            'VALUE USD': f"{c.BLUE}${round(value_usd, 2)}{c.RESET}",
+                            'PnL $': f"{pnl_color}${pnl_usd}{c.RESET}",
+                            'PnL %': f"{pnl_color}{pnl_percentage}%{c.RESET}",
+                        })
+                    for column, value in cells.items():
+                        dashboard.set_cell(token_id, column, value)
+            
+                dashboard.set_footer([
+                    "",
+                    f"SOL: ${round(sol_price, 2)} | Updated at {datetime.now().strftime('%H:%M:%S')} | Refresh every {refresh_rate} secs",
+                    "Press ENTER to stop watching",
+                ])
+                dashboard.flush()
+                # Balance changes are displayed right away
+                wait_tasks = [wait_enter_task] + [asyncio.create_task(account_subscriber.wait_for_change(token_account=token_accounts[token_id], timeout=refresh_rate)) for token_id in token_ids]
+                await asyncio.wait(wait_tasks, timeout=refresh_rate, return_when=asyncio.FIRST_COMPLETED)
+                for wait_task in wait_tasks[1:]:
+                    wait_task.cancel()
+        finally:
+            for token_id in token_ids:
+                await account_subscriber.unsubscribe(token_accounts[token_id])
 
 
 class Wallets_CLI():
@@ -1611,15 +3545,8 @@ class Wallets_CLI():
     @staticmethod
     async def get_wallets() -> dict:
         """Returns all wallets stored in wallets.json."""
-        with open('wallets.json', 'r') as wallets_file:
-            return json.load(wallets_file) 
+        return f.get_json_file('wallets.json')
 
-    @staticmethod
-    def get_wallets_no_async() -> dict:
-        """Returns all wallets stored in wallets.json."""
-        with open('wallets.json', 'r') as wallets_file:
-            return json.load(wallets_file)
-    
     @staticmethod
     async def prompt_select_wallet() -> str:
         """Prompts user to select a wallet."""
@@ -1663,8 +3590,7 @@ class Wallets_CLI():
                 wallet_name = await inquirer.text(message="Enter wallet name:").execute_async()
                 # wallet_name = "DEGEN 1"
                 
-                with open('wallets.json', 'r') as wallets_file:
-                    wallets_data = json.load(wallets_file)
+                wallets_data = await Wallets_CLI.get_wallets()
                 
                 wallet_data = {
                         'wallet_name': wallet_name,
@@ -1673,8 +3599,7 @@ class Wallets_CLI():
                 }
                 wallets_data[len(wallets_data) + 1] = wallet_data
                 
-                with open('wallets.json', 'w') as wallets_file:
-                    json.dump(wallets_data, wallets_file, indent=4)
+                f.set_json_file('wallets.json', wallets_data)
                     
             elif confirm == "No":
                 await Wallets_CLI.prompt_add_wallet()
@@ -1699,8 +3624,7 @@ class Wallets_CLI():
             if confirm == "Yes":
                 wallet_id = re.search(r'ID (\d+) -', prompt_select_wallet_to_edit_name).group(1)
                 wallets[wallet_id]['wallet_name'] = new_wallet_name
-                with open('wallets.json', 'w') as wallets_file:
-                    json.dump(wallets, wallets_file, indent=4)
+                f.set_json_file('wallets.json', wallets)
                 return 
             elif confirm == "No":
                 await Wallets_CLI.prompt_edit_wallet_name()
@@ -1731,14 +3655,32 @@ class Wallets_CLI():
                     wallet_id = re.search(r'ID (\d+) -', wallet_to_delete).group(1)
                     del wallets[wallet_id]
 
-                with open('wallets.json', 'w') as wallets_file:
-                    json.dump(wallets, wallets_file, indent=4)
+                f.set_json_file('wallets.json', wallets)
                 return
             
             elif confirm == "No":
                 await Wallets_CLI.main_menu()
                 return
             
+    @staticmethod
+    async def get_sol_balances(client: AsyncClient, pubkeys: list) -> dict:
+        """Returns lamports of every pubkey: {pubkey: lamports}.
+        
+        Balances are fetched with getMultipleAccounts, chunks of RPC_Manager.MULTIPLE_ACCOUNTS_LIMIT pubkeys are sent concurrently."""
+        chunk_size = RPC_Manager.MULTIPLE_ACCOUNTS_LIMIT
+        chunks = [pubkeys[i:i + chunk_size] for i in range(0, len(pubkeys), chunk_size)]
+        get_chunks_accounts = await asyncio.gather(*[
+            client.get_multiple_accounts(pubkeys=[Pubkey.from_string(pubkey) for pubkey in chunk])
+            for chunk in chunks
+        ])
+        
+        sol_balances = {}
+        for chunk, get_chunk_accounts in zip(chunks, get_chunks_accounts):
+            for pubkey, account in zip(chunk, get_chunk_accounts.value):
+                # Accounts never funded do not exist on-chain
+                sol_balances[pubkey] = account.lamports if account is not None else 0
+        return sol_balances
+    
     @staticmethod
     async def display_wallets():
         print()
@@ -1752,15 +3694,17 @@ class Wallets_CLI():
         }
         wallets = await Wallets_CLI.get_wallets()
         get_rpc_url = await Config_CLI.get_config_data()
-        client = AsyncClient(endpoint=get_rpc_url['RPC_URL'])
-        sol_price = f.get_crypto_price(crypto='SOL')
+        client = RPC_Manager.get_client(get_rpc_url['RPC_URL'])
+        sol_balances, sol_price = await asyncio.gather(
+            Wallets_CLI.get_sol_balances(client=client, pubkeys=[wallet_data['pubkey'] for wallet_data in wallets.values()]),
+            f.get_crypto_price_async(crypto='SOL')
+        )
         
         for wallet_id, wallet_data in wallets.items():
             data['ID'].append(wallet_id)
             data['NAME'].append(wallet_data['wallet_name'])
             data['ADDRESS'].append(wallet_data['pubkey'])
-            get_wallet_sol_balance = await client.get_balance(pubkey=Pubkey.from_string(wallet_data['pubkey']))
-            sol_balance = round(get_wallet_sol_balance.value / 10 ** 9, 4)
+            sol_balance = round(sol_balances[wallet_data['pubkey']] / 10 ** 9, 4)
             sol_balance_usd = round(sol_balance * sol_price, 2)
             data['SOL BALANCE'].append(f"{sol_balance} (${sol_balance_usd})")
             
@@ -1770,6 +3714,27 @@ class Wallets_CLI():
         print()
         return wallets
 
+    @staticmethod
+    async def display_portfolio():
+        """Displays holdings of all the wallets, consolidated by token then totaled by wallet."""
+        f.display_logo()
+        print("[MANAGE WALLETS] [PORTFOLIO]")
+        print()
+        loading_spinner = yaspin(text=f"{c.BLUE}Scanning wallets{c.RESET}", color="blue")
+        loading_spinner.start()
+        start_time = time.perf_counter()
+        wallets = await Wallets_CLI.get_wallets()
+        holdings = await Portfolio_Scanner.scan(wallets)
+        tokens_table, wallets_table = Portfolio_Scanner.build_tables(holdings)
+        scan_time = time.perf_counter() - start_time
+        loading_spinner.stop()
+        
+        print(tabulate(tokens_table, headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center"))
+        print()
+        print(tabulate(wallets_table, headers="keys", tablefmt="fancy_grid", showindex="never", numalign="center"))
+        print(f"Total: ${holdings['value'].sum():,.2f} - {len(wallets)} wallets scanned in {round(scan_time, 2)} s")
+        print()
+    
     @staticmethod
     async def display_selected_wallet():
         print()
@@ -1779,11 +3744,11 @@ class Wallets_CLI():
         
         config_data = await Config_CLI.get_config_data()
         wallets = await Wallets_CLI.get_wallets()
-        client = AsyncClient(endpoint=config_data['RPC_URL'])
+        client = RPC_Manager.get_client(config_data['RPC_URL'])
         
         get_sol_balance = await client.get_balance(pubkey=Pubkey.from_string(wallets[config_data['LAST_WALLET_SELECTED']]['pubkey']))
         sol_balance = round(get_sol_balance.value / 10 ** 9, 4)
-        sol_price = f.get_crypto_price(crypto='SOL')
+        sol_price = await f.get_crypto_price_async(crypto='SOL')
         sol_balance_usd = round(sol_balance * sol_price, 2)
         data = {
             'NAME': [wallets[config_data['LAST_WALLET_SELECTED']]['wallet_name']],
@@ -1805,6 +3770,7 @@ class Wallets_CLI():
         await Wallets_CLI.display_wallets()
 
         wallets_cli_prompt_main_menu = await inquirer.select(message="Select choice:", choices=[
+            "Portfolio",
             "Add wallet",
             "Edit wallet name",
             "Delete wallet(s)",
@@ -1812,6 +3778,11 @@ class Wallets_CLI():
         ]).execute_async()
         
         match wallets_cli_prompt_main_menu:
+            case "Portfolio":
+                await Wallets_CLI.display_portfolio()
+                await inquirer.text(message="Press ENTER to go back").execute_async()
+                await Wallets_CLI.main_menu()
+                return
             case "Add wallet":
                 await Wallets_CLI.prompt_add_wallet()
                 await Wallets_CLI.main_menu()
@@ -1832,6 +3803,8 @@ class Wallets_CLI():
 class Main_CLI():
     
     async def start_CLI():
+        Token_Registry.start_background_refresh()
+        RPC_Manager.start_prober()
         config_data = await Config_CLI.get_config_data()
         
         if config_data['FIRST_LOGIN'] is True:
@@ -1924,13 +3897,13 @@ class Main_CLI():
                 
                 if confirm_make_donation == "Yes":
                     config_data = await Config_CLI.get_config_data()
-                    client = AsyncClient(endpoint=config_data['RPC_URL'])
+                    client = RPC_Manager.get_client(config_data['RPC_URL'])
                     
                     wallet_id, wallet_private_key = await Wallets_CLI.prompt_select_wallet()
                     wallet = Wallet(rpc_url=config_data['RPC_URL'], private_key=wallet_private_key)
                 
                     get_wallet_sol_balance =  await client.get_balance(pubkey=wallet.wallet.pubkey())
-                    sol_price = f.get_crypto_price("SOL")
+                    sol_price = await f.get_crypto_price_async("SOL")
                     sol_balance = round(get_wallet_sol_balance.value / 10 ** 9, 4)
                     sol_balance_usd = round(sol_balance * sol_price, 2) - 0.05
 
@@ -1956,10 +3929,12 @@ class Main_CLI():
                 await Main_CLI.main_menu()
                 return
             case "Exit CLI":
+                loading_spinner = yaspin(text=f"{c.BLUE}Waiting for swaps in flight{c.RESET}", color="blue")
+                loading_spinner.start()
+                await Sniper_Supervisor.drain()
+                loading_spinner.stop()
                 print("\nBye!")
-                for p in snipers_processes:
-                    p.terminate()
-                time.sleep(1)
+                await RPC_Manager.close()
                 exit()
         
 
@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import functions as f
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Runs every test in an empty directory, files (config, databases, caches) are created there."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(f, '_store', {})
+    return tmp_path
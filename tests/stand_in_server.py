@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+import websockets
+
+
+class Stand_In_Server():
+    """Local stand-in of a Solana RPC websocket: answers accountSubscribe/accountUnsubscribe and pushes
+    accountNotification of token accounts balances set with set_balance."""
+    
+    def __init__(self):
+        self.server = None
+        self.websockets = set()
+        self.subscription_id = 0
+        self.subscriptions = {} # {subscription id: (websocket, token account)}
+        self.requests = [] # Methods received, in order
+    
+    @property
+    def url(self) -> str:
+        port = self.server.sockets[0].getsockname()[1]
+        return f"ws://127.0.0.1:{port}"
+    
+    async def start(self):
+        self.server = await websockets.serve(self.handler, '127.0.0.1', 0)
+    
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+    
+    async def __aenter__(self) -> 'Stand_In_Server':
+        await self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+    
+    @staticmethod
+    def get_account_value(amount: int, decimals: int) -> dict:
+        """Returns a jsonParsed token account value."""
+        return {'data': {'parsed': {'info': {'tokenAmount': {'amount': str(amount), 'decimals': decimals}}}}}
+    
+    async def handler(self, websocket):
+        self.websockets.add(websocket)
+        try:
+            async for raw_message in websocket:
+                message = json.loads(raw_message)
+                self.requests.append(message['method'])
+                match message['method']:
+                    case 'accountSubscribe':
+                        self.subscription_id += 1
+                        self.subscriptions[self.subscription_id] = (websocket, message['params'][0])
+                        result = self.subscription_id
+                    case 'accountUnsubscribe':
+                        result = self.subscriptions.pop(message['params'][0], None) is not None
+                    case _:
+                        await websocket.send(json.dumps({'jsonrpc': "2.0", 'id': message['id'], 'error': {'code': -32601, 'message': "Method not found"}}))
+                        continue
+                await websocket.send(json.dumps({'jsonrpc': "2.0", 'id': message['id'], 'result': result}))
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            self.websockets.discard(websocket)
+            self.subscriptions = {subscription_id: subscription for subscription_id, subscription in self.subscriptions.items() if subscription[0] is not websocket}
+    
+    def get_subscribed_accounts(self) -> list:
+        return [token_account for _, token_account in self.subscriptions.values()]
+    
+    async def wait_for_subscription(self, token_account: str, timeout: float=5):
+        async def wait():
+            while token_account not in self.get_subscribed_accounts():
+                await asyncio.sleep(0.01)
+        await asyncio.wait_for(wait(), timeout=timeout)
+    
+    async def set_balance(self, token_account: str, amount: int, decimals: int=6):
+        """Pushes the new balance of a token account to its subscribers."""
+        for subscription_id, (websocket, subscribed_account) in list(self.subscriptions.items()):
+            if subscribed_account == token_account:
+                await websocket.send(json.dumps({
+                    'jsonrpc': "2.0",
+                    'method': "accountNotification",
+                    'params': {
+                        'subscription': subscription_id,
+                        'result': {'context': {'slot': 1}, 'value': Stand_In_Server.get_account_value(amount, decimals)}
+                    }
+                }))
+    
+    async def drop_connections(self):
+        """Closes every client connection, as a restarting RPC node would."""
+        for websocket in list(self.websockets):
+            await websocket.close()
@@ -0,0 +1,117 @@
+import asyncio
+
+import main
+from stand_in_server import Stand_In_Server
+
+TOKEN_ACCOUNT = "9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM"
+
+
+def test_notifications_update_balance():
+    async def run():
+        async with Stand_In_Server() as server:
+            subscriber = main.Account_Subscriber(ws_url=server.url)
+            await subscriber.subscribe(TOKEN_ACCOUNT, balance={'decimals': 6, 'balance': {'int': 0, 'float': 0}})
+            assert subscriber.get_balance(TOKEN_ACCOUNT)['balance']['int'] == 0
+            await server.wait_for_subscription(TOKEN_ACCOUNT)
+            
+            change = asyncio.create_task(subscriber.wait_for_change(TOKEN_ACCOUNT, timeout=5))
+            await asyncio.sleep(0)
+            await server.set_balance(TOKEN_ACCOUNT, 2_500_000, decimals=6)
+            balance = await change
+            await subscriber.unsubscribe(TOKEN_ACCOUNT)
+            return balance
+    
+    balance = asyncio.run(run())
+    assert balance == {'decimals': 6, 'balance': {'int': 2_500_000, 'float': 2.5}}
+
+
+def test_unsubscribe_after_last_reference():
+    async def run():
+        async with Stand_In_Server() as server:
+            subscriber = main.Account_Subscriber(ws_url=server.url)
+            await subscriber.subscribe(TOKEN_ACCOUNT)
+            await subscriber.subscribe(TOKEN_ACCOUNT)
+            await server.wait_for_subscription(TOKEN_ACCOUNT)
+            
+            await subscriber.unsubscribe(TOKEN_ACCOUNT)
+            await asyncio.sleep(0.1)
+            still_subscribed = server.get_subscribed_accounts()
+            
+            await subscriber.unsubscribe(TOKEN_ACCOUNT)
+            await asyncio.sleep(0.1)
+            return still_subscribed, server.get_subscribed_accounts(), server.requests, subscriber.task
+    
+    still_subscribed, subscribed, requests, task = asyncio.run(run())
+    assert still_subscribed == [TOKEN_ACCOUNT]
+    assert subscribed == []
+    assert requests == ['accountSubscribe', 'accountUnsubscribe']
+    assert task is None
+
+
+def test_resubscribe_after_disconnection(monkeypatch):
+    monkeypatch.setattr(main.Account_Subscriber, 'RECONNECT_DELAY', 0.05)
+    
+    async def run():
+        async with Stand_In_Server() as server:
+            subscriber = main.Account_Subscriber(ws_url=server.url)
+            await subscriber.subscribe(TOKEN_ACCOUNT)
+            await server.wait_for_subscription(TOKEN_ACCOUNT)
+            await server.drop_connections()
+            await server.wait_for_subscription(TOKEN_ACCOUNT)
+            
+            await server.set_balance(TOKEN_ACCOUNT, 7, decimals=0)
+            balance = await subscriber.wait_for_change(TOKEN_ACCOUNT, timeout=5)
+            await subscriber.unsubscribe(TOKEN_ACCOUNT)
+            return balance, server.requests
+    
+    balance, requests = asyncio.run(run())
+    assert balance['balance']['int'] == 7
+    assert requests.count('accountSubscribe') == 2
+
+
+def test_parse_closed_account():
+    assert main.Account_Subscriber.parse_balance(None) == {'decimals': 0, 'balance': {'int': 0, 'float': 0}}
+
+
+class Stub_Wallet():
+    
+    async def get_token_mint_account(self, token_mint: str) -> str:
+        return TOKEN_ACCOUNT
+    
+    async def get_token_balance(self, token_mint_account: str) -> dict:
+        return {'decimals': 6, 'balance': {'int': 0, 'float': 0}}
+
+
+def test_stopped_sniper_unsubscribes(monkeypatch):
+    monkeypatch.setattr(main.Account_Subscriber, 'subscribers', {})
+    monkeypatch.setattr(main.Launch_Scheduler, 'DISCOVERY_INTERVAL', 0.01)
+    
+    async def get_buy_quote(self):
+        return None
+    monkeypatch.setattr(main.Token_Sniper, 'get_buy_quote', get_buy_quote)
+    
+    async def run():
+        async with Stand_In_Server() as server:
+            monkeypatch.setattr(main.Account_Subscriber, 'get_ws_url', staticmethod(lambda: server.url))
+            token_data = {'ADDRESS': "token", 'STATUS': "NOT IN", 'TIMESTAMP': None}
+            snipers_tasks = [
+                asyncio.create_task(main.Token_Sniper(str(token_id), dict(token_data), Stub_Wallet(), http_client=None, semaphore=None).snipe_token())
+                for token_id in range(2)
+            ]
+            await server.wait_for_subscription(TOKEN_ACCOUNT)
+            subscriber = main.Account_Subscriber.get_subscriber()
+            
+            # Restarted sniper: the other one still watches the account
+            snipers_tasks[0].cancel()
+            await asyncio.gather(snipers_tasks[0], return_exceptions=True)
+            references = dict(subscriber.references)
+            
+            snipers_tasks[1].cancel()
+            await asyncio.gather(snipers_tasks[1], return_exceptions=True)
+            await asyncio.sleep(0.1)
+            return references, subscriber.references, server.get_subscribed_accounts()
+    
+    references, final_references, subscribed = asyncio.run(run())
+    assert references == {TOKEN_ACCOUNT: 1}
+    assert final_references == {}
+    assert subscribed == []
@@ -0,0 +1,65 @@
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+import functions as f
+
+
+@pytest.fixture
+def webhook():
+    """Local Discord webhook, returns (url, posted messages)."""
+    posted = []
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            posted.append(json.loads(self.rfile.read(int(self.headers['Content-Length'])))['content'])
+            self.send_response(204)
+            self.end_headers()
+        
+        def log_message(self, *args):
+            pass
+    
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/webhook", posted
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fast_batches(monkeypatch):
+    monkeypatch.setattr(f, 'ALERTS_BATCH_WINDOW', 0.05)
+
+
+def set_webhook(url: str):
+    f.set_json_file('config.json', {'DISCORD_WEBHOOK': url, 'TELEGRAM_BOT_TOKEN': None, 'TELEGRAM_CHAT_ID': None})
+
+
+def test_alerts_batched(webhook):
+    url, posted = webhook
+    set_webhook(url)
+    f.send_discord_alert("first")
+    f.send_discord_alert("second")
+    f.flush_alerts(timeout=5)
+    assert posted == ["first\nsecond"]
+    assert not os.path.exists(f.ALERTS_BUFFER_FILE)
+
+
+def test_dispatcher_survives_invalid_webhook(webhook):
+    url, posted = webhook
+    set_webhook("http://127.0.0.1/\x00webhook")
+    f.send_discord_alert("lost")
+    f.flush_alerts(timeout=5)
+    
+    set_webhook(url)
+    f.send_discord_alert("delivered")
+    f.flush_alerts(timeout=5)
+    assert posted == ["delivered"]
+    assert f._alerts_thread.is_alive()
+
+
+def test_test_alert_invalid_webhook():
+    set_webhook("http://127.0.0.1/\x00webhook")
+    assert f.send_test_alert('discord', "test") is False
@@ -0,0 +1,126 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+
+import base58
+import pytest
+from solders.hash import Hash
+from solders.keypair import Keypair
+from solders.message import MessageV0
+from solders.signature import Signature
+from solders.system_program import transfer, TransferParams
+from solders.transaction import VersionedTransaction
+from solders.transaction_status import TransactionConfirmationStatus
+
+import main
+
+LAST_VALID_BLOCK_HEIGHT = 100
+
+
+class Stub_Client():
+    """RPC client whose block height grows by one per call, every transaction has the given status (None: not landed)."""
+    
+    def __init__(self, status=None, block_height: int=LAST_VALID_BLOCK_HEIGHT - 2):
+        self.status = status
+        self.block_height = block_height
+        self.sent = 0
+        self.failures = 0
+    
+    async def get_signature_statuses(self, signatures: list):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("RPC unreachable")
+        return SimpleNamespace(value=[self.status for _ in signatures])
+    
+    async def get_latest_blockhash(self):
+        return SimpleNamespace(value=SimpleNamespace(blockhash=Hash.default(), last_valid_block_height=LAST_VALID_BLOCK_HEIGHT))
+    
+    async def get_block_height(self):
+        self.block_height += 1
+        return SimpleNamespace(value=self.block_height)
+    
+    async def send_raw_transaction(self, txn: bytes, opts=None):
+        self.sent += 1
+
+
+def get_status(err=None, confirmation_status=TransactionConfirmationStatus.Confirmed):
+    return SimpleNamespace(err=err, confirmation_status=confirmation_status, slot=7)
+
+
+@pytest.fixture(autouse=True)
+def fast_ticks(monkeypatch):
+    monkeypatch.setattr(main.Confirmation_Tracker, 'TICK_INTERVAL', 0.01)
+    monkeypatch.setattr(main.Wallet, 'BROADCAST_INTERVAL', 0.01)
+
+
+def track(client: Stub_Client, timeout: float=2, **track_kwargs) -> dict:
+    async def run():
+        tracker = main.Confirmation_Tracker(client=client)
+        outcome = await asyncio.wait_for(tracker.track(signature=Signature.new_unique(), **track_kwargs), timeout=timeout)
+        return outcome, tracker.pending
+    return asyncio.run(run())
+
+
+def test_confirmed():
+    outcome, pending = track(Stub_Client(status=get_status()), blockhash=Hash.default())
+    assert outcome == {'status': "confirmed", 'err': None, 'slot': 7}
+    assert pending == {}
+
+
+def test_failed():
+    outcome, _ = track(Stub_Client(status=get_status(err="InstructionError")), blockhash=Hash.default())
+    assert outcome['status'] == "failed"
+    assert outcome['err'] == "InstructionError"
+
+
+def test_expired_once_blockhash_block_height_passed():
+    client = Stub_Client()
+    outcome, pending = track(client, blockhash=Hash.default())
+    assert outcome['status'] == "expired"
+    assert client.block_height == LAST_VALID_BLOCK_HEIGHT + 1
+    assert pending == {}
+
+
+def test_expired_with_known_last_valid_block_height():
+    client = Stub_Client(block_height=10)
+    outcome, _ = track(client, last_valid_block_height=12)
+    assert outcome['status'] == "expired"
+    assert client.block_height == 13
+
+
+def test_expired_without_blockhash(monkeypatch):
+    monkeypatch.setattr(main.Confirmation_Tracker, 'MAX_PENDING_TIME', 0.05)
+    outcome, _ = track(Stub_Client())
+    assert outcome['status'] == "expired"
+
+
+def test_failed_check_retried():
+    client = Stub_Client()
+    client.failures = 3
+    outcome, _ = track(client, blockhash=Hash.default())
+    assert outcome['status'] == "expired"
+    assert client.failures == 0
+
+
+def get_transaction_data(keypair: Keypair) -> str:
+    instruction = transfer(TransferParams(from_pubkey=keypair.pubkey(), to_pubkey=Keypair().pubkey(), lamports=1))
+    transaction_message = MessageV0.try_compile(keypair.pubkey(), [instruction], [], Hash.default())
+    return base64.b64encode(bytes(VersionedTransaction(transaction_message, [keypair]))).decode()
+
+
+def test_broadcast_stops_when_blockhash_expires(monkeypatch):
+    client = Stub_Client()
+    monkeypatch.setattr(main.RPC_Manager, 'get_endpoints', lambda: ["http://rpc-1", "http://rpc-2"])
+    monkeypatch.setattr(main.RPC_Manager, 'get_client', lambda endpoint=None: client)
+    monkeypatch.setattr(main.Confirmation_Tracker, 'trackers', {})
+    keypair = Keypair()
+    wallet = main.Wallet(rpc_url="http://rpc-1", private_key=base58.b58encode(bytes(keypair)).decode(), client=client)
+    
+    async def run():
+        return await asyncio.wait_for(wallet.sign_broadcast_transaction(transaction_data=get_transaction_data(keypair)), timeout=5)
+    report = asyncio.run(run())
+    
+    assert report['status'] == "expired"
+    assert report['confirmation'] < 1
+    assert all(endpoint_report['sends'] >= 1 and endpoint_report['first_ack'] is not None for endpoint_report in report['endpoints'].values())
+    assert client.sent == sum(endpoint_report['sends'] for endpoint_report in report['endpoints'].values())
@@ -0,0 +1,96 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+URL = main.History_Fetcher.TRADES_HISTORY_URL
+WALLET = "wallet"
+
+
+class Fake_History():
+    """Jupiter history of records ids, newest first, served by pages."""
+    
+    def __init__(self, ids: list):
+        self.ids = ids
+        self.cursors = []
+        self.offline = False
+    
+    async def fetch_page(self, http_client, url, wallet_address, cursor=None):
+        if self.offline:
+            raise httpx.ConnectError("Offline")
+        self.cursors.append(cursor)
+        ids = [record_id for record_id in self.ids if cursor is None or record_id < cursor]
+        return [{'id': record_id} for record_id in ids[:main.History_Fetcher.PAGE_SIZE]]
+
+
+@pytest.fixture
+def history(monkeypatch):
+    history = Fake_History(ids=list(range(10, 0, -1)))
+    monkeypatch.setattr(main.History_Fetcher, 'PAGE_SIZE', 3)
+    monkeypatch.setattr(main.History_Fetcher, 'fetch_page', history.fetch_page)
+    return history
+
+
+def read_ids(max_pages: int=None, state: dict=None) -> list:
+    async def read():
+        ids = []
+        pages = main.History_Fetcher.stream(URL, wallet_address=WALLET, state=state)
+        try:
+            pages_count = 0
+            async for page in pages:
+                ids.extend(record['id'] for record in page)
+                pages_count += 1
+                if pages_count == max_pages:
+                    break
+        finally:
+            await pages.aclose()
+        return ids
+    return asyncio.run(read())
+
+
+def get_cache() -> dict:
+    return main.History_Fetcher.read_cache()[f"{URL}:{WALLET}"]
+
+
+def test_full_history_cached(history):
+    assert read_ids() == list(range(10, 0, -1))
+    assert get_cache() == {'records': [{'id': record_id} for record_id in range(10, 0, -1)], 'complete': True}
+
+
+def test_new_records_merged_with_cache(history):
+    read_ids()
+    history.ids = [12, 11] + history.ids
+    history.cursors.clear()
+    
+    assert read_ids() == list(range(12, 0, -1))
+    # Only the newest page is requested, older records come from the cache
+    assert history.cursors == [None]
+    assert [record['id'] for record in get_cache()['records']] == list(range(12, 0, -1))
+    assert get_cache()['complete']
+
+
+def test_partial_read_resumed(history):
+    assert read_ids(max_pages=2) == [10, 9, 8, 7, 6, 5]
+    assert get_cache() == {'records': [{'id': record_id} for record_id in range(10, 4, -1)], 'complete': False}
+    
+    history.ids = [11] + history.ids
+    history.cursors.clear()
+    assert read_ids() == list(range(11, 0, -1))
+    assert history.cursors == [None, 5, 2]
+    assert get_cache()['complete']
+
+
+def test_offline_serves_cache(history):
+    read_ids()
+    history.offline = True
+    state = {'offline': False}
+    assert read_ids(state=state) == list(range(10, 0, -1))
+    assert state['offline']
+
+
+def test_offline_without_cache_raises(history):
+    history.offline = True
+    with pytest.raises(httpx.ConnectError):
+        read_ids()
@@ -0,0 +1,117 @@
+import asyncio
+import email.utils
+import time
+
+import httpx
+import pytest
+
+import functions as f
+
+get_backoff_delay = f.get_backoff_delay
+
+
+@pytest.fixture(autouse=True)
+def rate_limits(monkeypatch):
+    monkeypatch.setattr(f, '_rate_buckets', {})
+    monkeypatch.setattr(f, 'RATE_LIMITS', {'limited.host': 2})
+    monkeypatch.setattr(f, 'get_backoff_delay', lambda attempt, retry_after=None: 0)
+
+
+@pytest.mark.parametrize('retry_after, seconds', [
+    ("3", 3),
+    ("0.5", 0.5),
+    ("-1", 0),
+    ("soon", None),
+    ("", None),
+    (None, None),
+])
+def test_parse_retry_after(retry_after, seconds):
+    assert f.parse_retry_after(retry_after) == seconds
+
+
+def test_parse_retry_after_http_date():
+    retry_after = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 <= f.parse_retry_after(retry_after) <= 60
+    assert f.parse_retry_after(email.utils.formatdate(time.time() - 60, usegmt=True)) == 0
+
+
+def test_take_rate_token(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(f.time, 'monotonic', lambda: now[0])
+    # Burst of the host rate, then waiting requests are queued
+    assert [f.take_rate_token('limited.host') for _ in range(4)] == [0, 0, 0.5, 1]
+    # Tokens refill at the host rate: 1 of the 2 queued requests is served after 0.5s
+    now[0] += 0.5
+    assert f.take_rate_token('limited.host') == 1
+    now[0] += 3
+    assert f.take_rate_token('limited.host') == 0
+    assert f.take_rate_token('other.host') == 0
+
+
+def get_transport_attempts(monkeypatch, method: str, outcome, headers: dict=None) -> int:
+    """Returns how many times Rate_Limited_Transport sends a request always getting outcome (status code or exception)."""
+    attempts = []
+    async def handle_async_request(self, request):
+        attempts.append(request)
+        if isinstance(outcome, int):
+            return httpx.Response(outcome, headers=headers)
+        raise outcome("Failed", request=request)
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, 'handle_async_request', handle_async_request)
+    
+    async def send():
+        transport = f.Rate_Limited_Transport(max_retries=2)
+        try:
+            await transport.handle_async_request(httpx.Request(method, "http://other.host/"))
+        except httpx.TransportError:
+            pass
+    asyncio.run(send())
+    return len(attempts)
+
+
+@pytest.mark.parametrize('method, outcome, attempts', [
+    ('GET', 503, 3),
+    ('GET', 502, 3),
+    ('GET', 400, 1),
+    ('GET', httpx.ReadTimeout, 3),
+    ('POST', 429, 3),
+    ('POST', 503, 3),
+    ('POST', 502, 1),
+    ('POST', httpx.ConnectError, 3),
+    ('POST', httpx.ReadTimeout, 1),
+])
+def test_transport_retries(monkeypatch, method, outcome, attempts):
+    assert get_transport_attempts(monkeypatch, method, outcome) == attempts
+
+
+def test_request_does_not_repeat_sent_post(monkeypatch):
+    attempts = []
+    def request(method, url, **kwargs):
+        attempts.append(method)
+        raise httpx.ReadTimeout("Failed")
+    monkeypatch.setattr(httpx, 'request', request)
+    
+    with pytest.raises(httpx.ReadTimeout):
+        f.request('POST', "http://other.host/webhook", json={})
+    assert attempts == ['POST']
+
+
+@pytest.mark.parametrize('retry_after, attempts', [("1", 3), ("3600", 1)])
+def test_transport_retry_after_limit(monkeypatch, retry_after, attempts):
+    assert get_transport_attempts(monkeypatch, 'GET', 429, headers={'Retry-After': retry_after}) == attempts
+
+
+def test_request_retry_after_limit(monkeypatch):
+    attempts = []
+    def request(method, url, **kwargs):
+        attempts.append(method)
+        return httpx.Response(503, headers={'Retry-After': "3600"})
+    monkeypatch.setattr(httpx, 'request', request)
+    
+    assert f.request('GET', "http://other.host/").status_code == 503
+    assert attempts == ['GET']
+
+
+def test_backoff_delay_limit():
+    assert get_backoff_delay(0, retry_after=2) == 2
+    assert get_backoff_delay(0, retry_after=3600) == f.RETRY_AFTER_MAX
+    assert 0 <= get_backoff_delay(10) <= f.BACKOFF_MAX
@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+import main
+
+
+class Fake_Sniper():
+    """Sniper whose token gets a route after routeless_quotes quotes, failing ones count as errors."""
+    
+    def __init__(self, timestamp: float, routeless_quotes: int, failing: bool=False):
+        self.token_data = {'TIMESTAMP': timestamp}
+        self.health = {'errors': 0}
+        self.routeless_quotes = routeless_quotes
+        self.failing = failing
+        self.quotes = 0
+    
+    async def get_buy_quote(self) -> dict:
+        self.quotes += 1
+        if self.quotes > self.routeless_quotes:
+            return {'outAmount': "1"}
+        if self.failing:
+            self.health['errors'] += 1
+        return None
+
+
+def test_launches_wake_up_in_timestamp_order():
+    async def run():
+        scheduler = main.Launch_Scheduler()
+        woken_up = []
+        async def wait(delay: float):
+            await scheduler.wait_for_launch(start + delay, advance=0)
+            woken_up.append(delay)
+        
+        start = time.time()
+        tasks = []
+        for delay in (0.3, 0.1, 0.2):
+            tasks.append(asyncio.create_task(wait(delay)))
+            # The earlier launch is scheduled while the timer already sleeps until the later one
+            await asyncio.sleep(0.01)
+        await asyncio.gather(*tasks)
+        return woken_up, time.time() - start
+    
+    woken_up, elapsed = asyncio.run(run())
+    assert woken_up == [0.1, 0.2, 0.3]
+    assert elapsed < 1
+
+
+def test_past_launch_does_not_wait():
+    async def run():
+        await asyncio.wait_for(main.Launch_Scheduler().wait_for_launch(time.time() - 10), timeout=0.1)
+    asyncio.run(run())
+
+
+@pytest.fixture
+def probe_intervals(monkeypatch):
+    """Records the max interval of every probe, probes are not delayed."""
+    probe_intervals = []
+    def uniform(low, high):
+        probe_intervals.append(high)
+        return 0
+    monkeypatch.setattr(main.random, 'uniform', uniform)
+    return probe_intervals
+
+
+def get_route(sniper: Fake_Sniper) -> dict:
+    async def run():
+        return await main.Launch_Scheduler().wait_for_route(sniper)
+    return asyncio.run(run())
+
+
+def test_probe_rate_held_during_launch_grace(probe_intervals):
+    assert get_route(Fake_Sniper(timestamp=time.time(), routeless_quotes=5)) == {'outAmount': "1"}
+    assert probe_intervals == [main.Launch_Scheduler.PROBE_MIN_INTERVAL] * 5
+
+
+def test_probe_backoff_after_launch_grace(probe_intervals):
+    get_route(Fake_Sniper(timestamp=time.time() - main.Launch_Scheduler.LAUNCH_GRACE - 1, routeless_quotes=5))
+    min_interval = main.Launch_Scheduler.PROBE_MIN_INTERVAL
+    assert probe_intervals == [min_interval * 2, min_interval * 4, min_interval * 8, main.Launch_Scheduler.PROBE_MAX_INTERVAL, main.Launch_Scheduler.PROBE_MAX_INTERVAL]
+
+
+def test_probe_backoff_on_errors(probe_intervals):
+    get_route(Fake_Sniper(timestamp=time.time(), routeless_quotes=3, failing=True))
+    min_interval = main.Launch_Scheduler.PROBE_MIN_INTERVAL
+    assert probe_intervals == [min_interval * 2, min_interval * 4, min_interval * 8]
+
+
+def test_undated_snipers_discovered_together(monkeypatch):
+    monkeypatch.setattr(main.Launch_Scheduler, 'DISCOVERY_INTERVAL', 0.01)
+    
+    async def run():
+        scheduler = main.Launch_Scheduler()
+        snipers = [Fake_Sniper(timestamp=None, routeless_quotes=routeless_quotes) for routeless_quotes in (0, 2)]
+        quotes = await asyncio.gather(*[scheduler.wait_for_route(sniper) for sniper in snipers])
+        return quotes, snipers, scheduler.undated_snipers
+    
+    quotes, snipers, undated_snipers = asyncio.run(run())
+    assert quotes == [{'outAmount': "1"}] * 2
+    assert [sniper.quotes for sniper in snipers] == [1, 3]
+    assert undated_snipers == {}
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+
+
+@pytest.fixture(autouse=True)
+def quote_service(monkeypatch):
+    monkeypatch.setattr(main.Quote_Service, 'cache', {})
+    monkeypatch.setattr(main.Quote_Service, 'inflight', {})
+
+
+def get_quotes(requests: list, status_code: int=200) -> tuple:
+    """Requests quotes concurrently, returns (results, amounts requested to the quote API)."""
+    requested_amounts = []
+    async def handler(request):
+        requested_amounts.append(int(request.url.params['amount']))
+        await asyncio.sleep(0.05)
+        return httpx.Response(status_code, json={'outAmount': request.url.params['amount']})
+    
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            return await asyncio.gather(*[
+                main.Quote_Service.get_quote("input", "output", amount, 50, exact=exact, http_client=http_client)
+                for amount, exact in requests
+            ], return_exceptions=True)
+    return asyncio.run(run()), requested_amounts
+
+
+def test_concurrent_requests_share_one_fetch():
+    quotes, requested_amounts = get_quotes([(1000, True)] * 5)
+    assert requested_amounts == [1000]
+    assert quotes == [{'outAmount': "1000"}] * 5
+
+
+def test_inexact_amounts_share_bucket():
+    quotes, requested_amounts = get_quotes([(123456, False), (123999, False), (123456, True)])
+    assert sorted(requested_amounts) == [123000, 123456]
+    assert quotes[0] is quotes[1]
+
+
+def test_cached_until_ttl(monkeypatch):
+    get_quotes([(1000, True)])
+    _, requested_amounts = get_quotes([(1000, True)])
+    assert requested_amounts == []
+    
+    monkeypatch.setattr(main.Quote_Service, 'TTL', 0)
+    _, requested_amounts = get_quotes([(1000, True)])
+    assert requested_amounts == [1000]
+
+
+def test_throttled_quote_not_cached():
+    quotes, requested_amounts = get_quotes([(1000, True)] * 2, status_code=429)
+    assert requested_amounts == [1000]
+    assert all(isinstance(quote, httpx.HTTPStatusError) for quote in quotes)
+    assert main.Quote_Service.cache == {}
+    assert main.Quote_Service.inflight == {}
@@ -0,0 +1,62 @@
+import asyncio
+
+from solders.keypair import Keypair
+
+import main
+from stand_in_server import Stand_In_Server
+
+TOKEN_ACCOUNT = "9WzDXwBbmkg8ZTbNMqUxvQRAyrZzDsGYdLVL9zYtAWWM"
+
+
+class Stub_Wallet():
+    
+    def __init__(self):
+        self.wallet = Keypair()
+    
+    async def get_token_mint_account(self, token_mint: str) -> str:
+        return TOKEN_ACCOUNT
+    
+    async def get_token_balance(self, token_mint_account: str) -> dict:
+        return {'decimals': 6, 'balance': {'int': 0, 'float': 0}}
+
+
+def test_buy_retry_quotes_again(monkeypatch):
+    monkeypatch.setattr(main.Account_Subscriber, 'subscribers', {})
+    monkeypatch.setattr(main.Trade_Ledger, 'connections', {})
+    monkeypatch.setattr(main.f, 'get_backoff_delay', lambda attempt, retry_after=None: 0)
+    monkeypatch.setattr(main.f, 'send_alert', lambda message: None)
+    monkeypatch.setattr(main.Tokens_Store, 'update_token', lambda token_id, fields: None)
+    
+    quotes = iter({'inputMint': "So11111111111111111111111111111111111111112", 'inAmount': "1000", 'outputMint': "token", 'outAmount': str(out_amount)} for out_amount in (100, 90, 80))
+    async def get_buy_quote(self):
+        return next(quotes)
+    monkeypatch.setattr(main.Token_Sniper, 'get_buy_quote', get_buy_quote)
+    
+    swapped_quotes = []
+    bought = asyncio.Event()
+    async def swap(self, quote_response):
+        swapped_quotes.append(quote_response['outAmount'])
+        if len(swapped_quotes) == 3:
+            bought.set()
+            return {'status': "confirmed", 'transaction_hash': "hash", 'critical_path': None}
+        return {'status': "expired", 'transaction_hash': "hash", 'critical_path': None}
+    monkeypatch.setattr(main.Token_Sniper, 'swap', swap)
+    
+    async def run():
+        async with Stand_In_Server() as server:
+            monkeypatch.setattr(main.Account_Subscriber, 'get_ws_url', staticmethod(lambda: server.url))
+            token_data = {'NAME': "Token", 'ADDRESS': "token", 'STATUS': "NOT IN", 'TIMESTAMP': None}
+            sniper = main.Token_Sniper("1", token_data, Stub_Wallet(), http_client=None, semaphore=None)
+            sniper_task = asyncio.create_task(sniper.snipe_token())
+            await asyncio.wait_for(bought.wait(), timeout=5)
+            await asyncio.sleep(0.05)
+            sniper_task.cancel()
+            await asyncio.gather(sniper_task, return_exceptions=True)
+            return sniper
+    
+    sniper = asyncio.run(run())
+    assert swapped_quotes == ["100", "90", "80"]
+    assert sniper.success is True
+    assert sniper.token_data['STATUS'] == "IN"
+    trade, = main.Trade_Ledger.get_trades(sniper.wallet.wallet.pubkey().__str__())
+    assert trade['OUTPUT_AMOUNT'] == 80
@@ -0,0 +1,129 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+import main
+
+WALLET = "wallet"
+SOL = "So11111111111111111111111111111111111111112"
+TOKEN = "token"
+
+
+@pytest.fixture(autouse=True)
+def ledger(monkeypatch):
+    monkeypatch.setattr(main.Trade_Ledger, 'connections', {})
+    yield
+    for connection in main.Trade_Ledger.connections.values():
+        connection.close()
+
+
+def get_trade(trade_id: int, timestamp: float, side: str, amount: float, quote_amount: float) -> dict:
+    if side == 'BUY':
+        input_mint, input_amount, output_mint, output_amount = SOL, quote_amount, TOKEN, amount
+    else:
+        input_mint, input_amount, output_mint, output_amount = TOKEN, amount, SOL, quote_amount
+    return {
+        'ID': f"swap:{trade_id}", 'SOURCE': 'swap', 'WALLET': WALLET, 'TIMESTAMP': timestamp,
+        'INPUT_MINT': input_mint, 'INPUT_AMOUNT': input_amount, 'OUTPUT_MINT': output_mint, 'OUTPUT_AMOUNT': output_amount,
+        'TXID': str(trade_id),
+    }
+
+
+TRADES = [
+    get_trade(1, 100, 'BUY', 100, 1000),
+    get_trade(2, 200, 'BUY', 100, 3000),
+    get_trade(3, 300, 'SELL', 50, 1500),
+]
+
+
+def test_average_cost_pnl():
+    assert main.Trade_Ledger.add_trades(TRADES) == 3
+    position, = main.Trade_Ledger.get_positions(WALLET)
+    assert position['AMOUNT'] == 150
+    assert position['COST'] == 3000
+    assert position['REALIZED_PNL'] == 500
+    assert position['BOUGHT'] == 4000
+    assert position['SOLD'] == 1500
+    assert position['TRADES'] == 3
+    assert position['LAST_TIMESTAMP'] == 300
+
+
+def test_duplicate_trades_ignored():
+    main.Trade_Ledger.add_trades(TRADES)
+    assert main.Trade_Ledger.add_trades(TRADES) == 0
+    assert main.Trade_Ledger.get_positions(WALLET)[0]['TRADES'] == 3
+
+
+def test_older_trade_recomputes_position():
+    main.Trade_Ledger.add_trades(TRADES[1:])
+    main.Trade_Ledger.add_trades(TRADES[:1])
+    out_of_order_position, = main.Trade_Ledger.get_positions(WALLET)
+    
+    connection = main.Trade_Ledger.get_connection()
+    connection.execute("DELETE FROM positions")
+    main.Trade_Ledger.rebuild_positions(connection)
+    assert main.Trade_Ledger.get_positions(WALLET) == [out_of_order_position]
+    assert out_of_order_position['REALIZED_PNL'] == 500
+
+
+def test_unknown_cost_sale():
+    main.Trade_Ledger.add_trades([get_trade(1, 100, 'BUY', 10, 100), get_trade(2, 200, 'SELL', 20, 400)])
+    position, = main.Trade_Ledger.get_positions(WALLET)
+    assert position['AMOUNT'] == 0
+    assert position['REALIZED_PNL'] == 100
+    assert position['UNKNOWN_COST_SOLD'] == 200
+    assert position['SOLD'] == 400
+
+
+def test_outdated_positions_table_rebuilt():
+    connection = sqlite3.connect(main.Trade_Ledger.DATABASE_FILE)
+    connection.executescript(f"""
+        CREATE TABLE trades ({', '.join(main.Trade_Ledger.COLUMNS)}, PRIMARY KEY (ID));
+        CREATE TABLE positions (WALLET, MINT, QUOTE_MINT, AMOUNT, COST, REALIZED_PNL);
+    """)
+    connection.executemany(f"INSERT INTO trades VALUES ({', '.join('?' * len(main.Trade_Ledger.COLUMNS))})", [
+        [trade[column] for column in main.Trade_Ledger.COLUMNS] for trade in TRADES
+    ])
+    connection.commit()
+    connection.close()
+    
+    position, = main.Trade_Ledger.get_positions(WALLET)
+    assert position['REALIZED_PNL'] == 500
+    assert position['UNKNOWN_COST_SOLD'] == 0
+
+
+def get_limit_fill(fill_id: int) -> dict:
+    return {
+        'id': fill_id, 'createdAt': "2024-01-01T00:00:00.000Z", 'inAmount': "1000", 'outAmount': "10", 'txid': str(fill_id),
+        'order': {'inputMint': SOL, 'outputMint': TOKEN},
+    }
+
+
+def get_last_id() -> int:
+    row = main.Trade_Ledger.get_connection().execute("SELECT LAST_ID FROM sync_state WHERE WALLET = ?", (WALLET,)).fetchone()
+    return row['LAST_ID'] if row is not None else None
+
+
+@pytest.mark.parametrize('offline', [False, True])
+def test_limit_fills_sync_state(monkeypatch, offline):
+    async def stream(url, wallet_address, state=None):
+        if offline:
+            state['offline'] = True
+        yield [get_limit_fill(3), get_limit_fill(2)]
+    monkeypatch.setattr(main.History_Fetcher, 'stream', stream)
+    
+    assert asyncio.run(main.Trade_Ledger.sync_limit_fills(WALLET)) == 2
+    assert get_last_id() == (None if offline else 3)
+
+
+def test_limit_fills_failed_page_keeps_sync_state(monkeypatch):
+    async def stream(url, wallet_address, state=None):
+        yield [get_limit_fill(3)]
+        raise OSError("Connection lost")
+    monkeypatch.setattr(main.History_Fetcher, 'stream', stream)
+    
+    with pytest.raises(OSError):
+        asyncio.run(main.Trade_Ledger.sync_limit_fills(WALLET))
+    assert len(main.Trade_Ledger.get_trades(WALLET)) == 1
+    assert get_last_id() is None